@@ -16,7 +16,7 @@ def readme():
 
 
 setup(name='Sider',
-      packages=['sider', 'sider.ext', "sidertests"],
+      packages=['sider', 'sider.ext', "sidertests", "siderbench"],
       py_modules=["sider__exttest"],
       version=VERSION,
       description='A persistent object library based on Redis',
@@ -0,0 +1,1153 @@
+""":mod:`sider.asyncio` --- :mod:`asyncio` support
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module provides :class:`AsyncSession` and asynchronous counterparts
+of :class:`~sider.hash.Hash`, :class:`~sider.list.List`,
+:class:`~sider.set.Set` and :class:`~sider.sortedset.SortedSet` that
+don't block the event loop.  These are built on the :mod:`redis.asyncio`
+client::
+
+    from redis.asyncio import StrictRedis
+    from sider.asyncio import AsyncSession
+    from sider.types import Hash, List
+
+    session = AsyncSession(StrictRedis())
+    hash_ = await session.get('my_hash', Hash)
+    value = await hash_.get('key')
+    await hash_.set('key', 'value')
+    async for element in await session.get('my_list', List):
+        print(element)
+
+The same value types of :mod:`sider.types` are used, so values stored by
+synchronous :class:`~sider.session.Session` can be read by
+:class:`AsyncSession` and vice versa.
+
+Transactions follow the same rules of :mod:`sider.transaction`: query
+operations can't be used after manipulative operations.  Transaction
+blocks are coroutine functions::
+
+    async def block(trial, transaction):
+        current_value = await hash_.get('my_key')    # [query]
+        await hash_.set('my_key', '(' + current_value + ')')  # [manipulative]
+    await session.transaction(block)
+
+Each :mod:`asyncio` task has its own transaction context, so concurrent
+tasks can run transactions on the same session at a time.
+
+.. note::
+
+   This module requires Python 3.7 or higher and redis-py 4.2 or higher
+   which provides :mod:`redis.asyncio`.  Other modules of Sider don't
+   depend on this module.
+
+"""
+import collections.abc
+import contextvars
+import functools
+import numbers
+import traceback
+import weakref
+
+from redis.asyncio import StrictRedis
+from redis.exceptions import ResponseError, WatchError
+
+from . import utils
+from .exceptions import CommitError, ConflictError, DoubleTransactionError
+from .types import (Bulk, ByteString, Hash, List, Set, SortedSet, String,
+                    Value)
+
+__all__ = ('AsyncHash', 'AsyncList', 'AsyncSession', 'AsyncSet',
+           'AsyncSortedSet', 'AsyncTransaction', 'manipulative', 'query')
+
+
+def manipulative(function):
+    """The decorator that marks the coroutine method manipulative.
+    Asynchronous version of :func:`sider.transaction.manipulative()`.
+
+    :param function: the coroutine method to mark
+    :type function: :class:`collections.abc.Callable`
+    :returns: the marked coroutine method
+    :rtype: :class:`collections.abc.Callable`
+
+    """
+    @functools.wraps(function)
+    async def marked(self, *args, **kwargs):
+        await self.session.mark_manipulative([self.key])
+        return await function(self, *args, **kwargs)
+    return marked
+
+
+def query(function):
+    """The decorator that marks the coroutine method query.
+    Asynchronous version of :func:`sider.transaction.query()`.
+
+    :param function: the coroutine method to mark
+    :type function: :class:`collections.abc.Callable`
+    :returns: the marked coroutine method
+    :rtype: :class:`collections.abc.Callable`
+
+    """
+    @functools.wraps(function)
+    async def marked(self, *args, **kwargs):
+        await self.session.mark_query([self.key])
+        return await function(self, *args, **kwargs)
+    return marked
+
+
+class AsyncSession(object):
+    """The asynchronous version of :class:`sider.session.Session`.
+
+    :param client: the asynchronous Redis client
+    :type client: :class:`redis.asyncio.StrictRedis`
+
+    """
+
+    #: (:class:`bool`) If it is set to ``True``, error messages raised by
+    #: transactions will contain tracebacks where they started query/commit
+    #: phase.
+    verbose_transaction_error = None
+
+    #: (:class:`weakref.WeakValueDictionary`) The identity map of
+    #: Python objects loaded by the session.
+    #: See also :attr:`Session.identity_map
+    #: <sider.session.Session.identity_map>`.
+    identity_map = None
+
+    def __init__(self, client):
+        if not isinstance(client, StrictRedis):
+            raise TypeError('client must be a redis.asyncio.StrictRedis '
+                            'object, not ' + repr(client))
+        self.basic_client = client
+        self.context = contextvars.ContextVar('sider.asyncio.transaction',
+                                              default=None)
+        self.verbose_transaction_error = False
+        self.identity_map = weakref.WeakValueDictionary()
+
+    @property
+    def client(self):
+        """(:class:`redis.asyncio.StrictRedis`) The Redis client.
+        It becomes a pipeline during transactions of the current task.
+
+        """
+        transaction = self.context.get()
+        if transaction is None:
+            return self.basic_client
+        return transaction.pipeline
+
+    @property
+    def current_transaction(self):
+        """(:class:`AsyncTransaction`) The transaction of the current
+        task.  It could be ``None`` when it's not on any transaction.
+
+        """
+        return self.context.get()
+
+    @property
+    def transaction(self):
+        """(:class:`AsyncTransaction`) The transaction object for
+        the session.  It's awaitable callable::
+
+            async def block(trial, transaction):
+                await list_.set(0, (await list_.get(0)).upper())
+            await session.transaction(block)
+
+        """
+        return AsyncTransaction(self)
+
+    async def get(self, key, value_type=ByteString):
+        """Loads the value from the ``key``.  The asynchronous version
+        of :meth:`Session.get() <sider.session.Session.get>`.
+
+        :param key: the Redis key to load
+        :type key: :class:`str`
+        :param value_type: the type of the value to load.  default is
+                           :class:`~sider.types.ByteString`
+        :type value_type: :class:`~sider.types.Value`, :class:`type`
+        :returns: the loaded value.  :class:`AsyncHash`, :class:`AsyncList`,
+                  :class:`AsyncSet` or :class:`AsyncSortedSet` for
+                  container types
+
+        """
+        value_type = Value.ensure_value_type(value_type,
+                                             parameter='value_type')
+        if isinstance(value_type, Bulk):
+            await self.mark_query([key])
+            bulk = await self.client.get(key)
+            return value_type.decode(bulk)
+        ident = key, value_type
+        try:
+            return self.identity_map[ident]
+        except KeyError:
+            value = self.make_proxy(key, value_type)
+            return self.identity_map.setdefault(ident, value)
+
+    async def set(self, key, value, value_type=ByteString):
+        """Stores the ``value`` into the ``key``.  The asynchronous
+        version of :meth:`Session.set() <sider.session.Session.set>`.
+
+        :param key: the Redis key to save the value into
+        :type key: :class:`str`
+        :param value: the value to be saved
+        :param value_type: the type of the ``value``.  default is
+                           :class:`~sider.types.ByteString`
+        :type value_type: :class:`~sider.types.Value`, :class:`type`
+        :returns: the Python representation of the saved value
+
+        """
+        value_type = Value.ensure_value_type(value_type,
+                                             parameter='value_type')
+        if isinstance(value_type, Bulk):
+            bulk = value_type.encode(value)
+            await self.mark_manipulative([key])
+            await self.client.set(key, bulk)
+            return value
+        obj = self.make_proxy(key, value_type)
+        await self.mark_manipulative([key])
+        if self.current_transaction is None:
+            async with self.basic_client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                obj.save(value, pipe)
+                await pipe.execute()
+        else:
+            self.client.delete(key)
+            obj.save(value, self.client)
+        return self.identity_map.setdefault((key, value_type), obj)
+
+    def make_proxy(self, key, value_type):
+        if isinstance(value_type, Hash):
+            return AsyncHash(self, key, key_type=value_type.key_type,
+                             value_type=value_type.value_type)
+        elif isinstance(value_type, List):
+            return AsyncList(self, key, value_type=value_type.value_type)
+        elif isinstance(value_type, SortedSet):
+            return AsyncSortedSet(self, key, value_type=value_type.value_type)
+        elif isinstance(value_type, Set):
+            return AsyncSet(self, key, value_type=value_type.value_type)
+        cls = type(value_type)
+        raise TypeError('{0}.{1} is not supported by {2}.{3}'.format(
+            cls.__module__, cls.__name__,
+            type(self).__module__, type(self).__name__
+        ))
+
+    async def mark_manipulative(self, keys=frozenset()):
+        """Marks it is manipulative.
+
+        :param keys: optional set of keys to watch
+        :type keys: :class:`collections.abc.Iterable`
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        transaction = self.current_transaction
+        if transaction is None:
+            return
+        await transaction.watch(keys)
+        if not transaction.commit_phase:
+            transaction.begin_commit()
+
+    async def mark_query(self, keys=frozenset()):
+        """Marks it is querying.
+
+        :param keys: optional set of keys to watch
+        :type keys: :class:`collections.abc.Iterable`
+        :raises sider.exceptions.CommitError:
+           when it is tried during commit phase
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        transaction = self.current_transaction
+        if transaction is None:
+            return
+        if transaction.commit_phase:
+            raise CommitError('query operation was tried during commit phase' +
+                              transaction.format_commit_stack())
+        await transaction.watch(keys)
+
+
+class AsyncTransaction(object):
+    """The asynchronous version of :class:`sider.transaction.Transaction`.
+    It can be used as an asynchronous context manager which tries
+    the block only once::
+
+        async with AsyncTransaction(session, [key]) as t:
+            value = await hash_.get('a')
+            await hash_.set('b', value)
+
+    It raises :exc:`~sider.exceptions.ConflictError` if the transaction
+    has met conflicts.  To retry automatically, call it with a coroutine
+    function instead (see :meth:`__call__()`).
+
+    :param session: a session object
+    :type session: :class:`AsyncSession`
+    :param keys: the list of keys
+    :type keys: :class:`collections.abc.Iterable`
+
+    """
+
+    def __init__(self, session, keys=frozenset()):
+        if not isinstance(session, AsyncSession):
+            raise TypeError('session must be a sider.asyncio.AsyncSession '
+                            'instance, not ' + repr(session))
+        self.session = session
+        self.keys = set()
+        self.initial_keys = frozenset(keys)
+        self.commit_phase = False
+        self.pipeline = None
+        self.token = None
+
+    async def __aenter__(self):
+        transaction = self.session.current_transaction
+        if transaction is not None:
+            raise DoubleTransactionError(
+                'there is already a transaction for the session ' +
+                repr(self.session) + transaction.format_enter_stack()
+            )
+        self.pipeline = self.session.basic_client.pipeline(transaction=True)
+        self.keys = set()
+        self.commit_phase = False
+        self.token = self.session.context.set(self)
+        if self.session.verbose_transaction_error:
+            self.enter_stack = traceback.format_stack()
+        await self.watch(self.initial_keys)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_value is None:
+                try:
+                    await self.pipeline.execute()
+                except WatchError:
+                    raise ConflictError('the transaction has met conflicts; '
+                                        'retry')
+        finally:
+            self.commit_phase = False
+            self.session.context.reset(self.token)
+            self.token = None
+            await self.pipeline.reset()
+
+    async def __call__(self, block, keys=frozenset(), ignore_double=False):
+        """Executes a coroutine function ``block`` in the transaction,
+        and retries it until it doesn't face any conflicts::
+
+            async def block(trial, transaction):
+                await list_.set(0, (await list_.get(0)).upper())
+            await transaction(block)
+
+        :param block: a coroutine function to execute in a transaction.
+                      it takes the same arguments to :func:`block()
+                      <sider.transaction.Transaction.__call__>` of
+                      synchronous transactions
+        :type block: :class:`collections.abc.Callable`
+        :param keys: a list of keys to watch
+        :type keys: :class:`collections.abc.Iterable`
+        :param ignore_double: don't raise any error even
+                              if any transaction has already being
+                              executed for a task.
+                              default is ``False``
+        :type ignore_double: :class:`bool`
+        :returns: what the ``block`` returned
+        :raises sider.exceptions.DoubleTransactionError:
+           when any transaction has already being executed for a task
+           and ``ignore_double`` is ``False``
+
+        """
+        current = self.session.current_transaction
+        if current is not None:
+            if not ignore_double:
+                raise DoubleTransactionError(
+                    'transactions are tried doubly for a session at a time' +
+                    current.format_enter_stack()
+                )
+            await current.watch(keys)
+            return await block(0, None)
+        initial_keys = self.initial_keys
+        self.initial_keys = initial_keys.union(keys)
+        try:
+            trial = 0
+            while True:
+                try:
+                    async with self:
+                        result = await block(trial, self)
+                except ConflictError:
+                    trial += 1
+                    continue
+                return result
+        finally:
+            self.initial_keys = initial_keys
+
+    async def watch(self, keys):
+        """Watches more ``keys``.
+
+        :param keys: a set of keys to watch more
+        :type keys: :class:`collections.abc.Iterable`
+
+        """
+        keys = set(keys) - self.keys
+        if keys:
+            # Keys written during the commit phase can't be watched anymore
+            # but are only remembered, as synchronous transactions do.
+            if not self.commit_phase:
+                await self.pipeline.watch(*keys)
+            self.keys |= keys
+
+    def begin_commit(self):
+        """Explicitly marks the transaction beginning to commit from this.
+        From this to end of a transaction, any query operations will raise
+        :exc:`~sider.exceptions.CommitError`.
+
+        """
+        if self.commit_phase:
+            return
+        self.commit_phase = True
+        if self.session.verbose_transaction_error:
+            self.commit_stack = traceback.format_stack()
+        self.pipeline.multi()
+
+    def format_enter_stack(self, indent=4,
+                           title='Traceback where the transaction entered:'):
+        """Makes :attr:`enter_stack` text readable.
+        See also :meth:`Transaction.format_enter_stack()
+        <sider.transaction.Transaction.format_enter_stack>`.
+
+        """
+        return self._format_stack('enter_stack', indent, title)
+
+    def format_commit_stack(self, indent=4,
+                            title='Traceback of previous begin_commit() call:'):
+        """Makes :attr:`commit_stack` text readable.
+        See also :meth:`Transaction.format_commit_stack()
+        <sider.transaction.Transaction.format_commit_stack>`.
+
+        """
+        return self._format_stack('commit_stack', indent, title)
+
+    def _format_stack(self, attr, indent, title):
+        if self.session.verbose_transaction_error:
+            try:
+                stack = getattr(self, attr)
+            except AttributeError:
+                return ''
+            indent_str = ' ' * indent
+            tb = '\n'.join(indent_str + line
+                           for frame in stack
+                           for line in frame.splitlines())
+            return '\n{0}{1}\n{2}'.format(indent_str, title, tb)
+        return ''
+
+
+class AsyncProxy(object):
+    """The base class of asynchronous container proxies.
+
+    :param session: the session object
+    :type session: :class:`AsyncSession`
+    :param key: the Redis key
+    :type key: :class:`str`
+    :param value_type: the type of values
+    :type value_type: :class:`~sider.types.Bulk`, :class:`type`
+
+    """
+
+    #: (:class:`sider.types.Bulk`) The type of values.
+    value_type = None
+
+    def __init__(self, session, key, value_type=String):
+        if not isinstance(session, AsyncSession):
+            raise TypeError('session must be a sider.asyncio.AsyncSession '
+                            'instance, not ' + repr(session))
+        self.session = session
+        self.key = key
+        self.value_type = Bulk.ensure_value_type(value_type,
+                                                 parameter='value_type')
+
+    @manipulative
+    async def clear(self):
+        """Removes all values.
+
+        .. note::
+
+           Under the hood it simply :redis:`DEL` the key.
+
+        """
+        await self.session.client.delete(self.key)
+
+    def __repr__(self):
+        cls = type(self)
+        return '<{0}.{1} ({2!r})>'.format(cls.__module__, cls.__name__,
+                                          self.key)
+
+
+class AsyncHash(AsyncProxy):
+    """The asynchronous version of :class:`sider.hash.Hash`.
+
+    :param session: the session object
+    :type session: :class:`AsyncSession`
+    :param key: the Redis key
+    :type key: :class:`str`
+    :param key_type: the type of hash keys
+    :type key_type: :class:`~sider.types.Bulk`, :class:`type`
+    :param value_type: the type of hash values
+    :type value_type: :class:`~sider.types.Bulk`, :class:`type`
+
+    """
+
+    #: (:class:`sider.types.Bulk`) The type of hash keys.
+    key_type = None
+
+    def __init__(self, session, key, key_type=String, value_type=String):
+        super(AsyncHash, self).__init__(session, key, value_type)
+        self.key_type = Bulk.ensure_value_type(key_type, parameter='key_type')
+
+    async def __aiter__(self):
+        """Iterates over its keys (:redis:`HKEYS`)."""
+        for key in await self.keys():
+            yield key
+
+    @query
+    async def length(self):
+        """Gets the number of items (:redis:`HLEN`).
+
+        :rtype: :class:`numbers.Integral`
+
+        """
+        return await self.session.client.hlen(self.key)
+
+    @query
+    async def contains(self, key):
+        """Tests whether the given ``key`` exists (:redis:`HEXISTS`).
+
+        :param key: the key
+        :rtype: :class:`bool`
+
+        """
+        try:
+            field = self.key_type.encode(key)
+        except TypeError:
+            return False
+        return bool(await self.session.client.hexists(self.key, field))
+
+    @query
+    async def getitem(self, key):
+        """Gets the value of the given ``key`` (:redis:`HGET`).
+
+        :param key: the key to get its value
+        :returns: the value of the ``key``
+        :raises exceptions.KeyError: if there's no such ``key``
+
+        """
+        field = self.key_type.encode(key)
+        value = await self.session.client.hget(self.key, field)
+        if value is None:
+            raise KeyError(key)
+        return self.value_type.decode(value)
+
+    async def get(self, key, default=None):
+        """Gets the value of the given ``key``, or ``default`` if it
+        doesn't exist (:redis:`HGET`).
+
+        :param key: the key to get its value
+        :param default: the value to return if there's no such ``key``
+        :returns: the value of the ``key``
+
+        """
+        try:
+            return await self.getitem(key)
+        except KeyError:
+            return default
+
+    @manipulative
+    async def set(self, key, value):
+        """Sets the ``key`` with the ``value`` (:redis:`HSET`).
+
+        :param key: the key to set
+        :param value: the value to set
+
+        """
+        field = self.key_type.encode(key)
+        data = self.value_type.encode(value)
+        await self.session.client.hset(self.key, field, data)
+
+    async def delete(self, key):
+        """Removes the ``key`` (:redis:`HDEL`).
+
+        :param key: the key to delete
+        :raises exceptions.KeyError: if there's no such ``key``
+
+        """
+        session = self.session
+        field = self.key_type.encode(key)
+        if session.current_transaction is None:
+            ok = await session.client.hdel(self.key, field)
+        else:
+            await session.mark_query([self.key])
+            ok = await session.client.hexists(self.key, field)
+            if ok:
+                await session.mark_manipulative()
+                await session.client.hdel(self.key, field)
+        if not ok:
+            raise KeyError(key)
+
+    @query
+    async def keys(self):
+        """Gets its all keys (:redis:`HKEYS`).
+
+        :rtype: :class:`frozenset`
+
+        """
+        keys = await self.session.client.hkeys(self.key)
+        return frozenset(self.key_type.decode_many(keys))
+
+    @query
+    async def values(self):
+        """Gets its all values (:redis:`HVALS`).
+
+        :rtype: :class:`list`
+
+        """
+        values = await self.session.client.hvals(self.key)
+        return self.value_type.decode_many(values)
+
+    @query
+    async def items(self):
+        """Gets its all ``(key, value)`` pairs (:redis:`HGETALL`).
+
+        :rtype: :class:`frozenset`
+
+        """
+        items = await self.session.client.hgetall(self.key)
+        keys = self.key_type.decode_many(items)
+        values = self.value_type.decode_many(items.values())
+        return frozenset(zip(keys, values))
+
+    async def setdefault(self, key, default=None):
+        """Sets the given ``default`` value to the ``key`` if it doesn't
+        exist and then returns the current value of the ``key``.
+        It's atomic (:redis:`HSETNX`).
+
+        :param key: the key to get or set
+        :param default: the value to be set if the ``key`` doesn't exist
+        :returns: the current value of the ``key``
+
+        """
+        async def block(trial, transaction):
+            try:
+                return await self.getitem(key)
+            except KeyError:
+                await self.set(key, default)
+                return default
+        return await self.session.transaction(block, [self.key],
+                                              ignore_double=True)
+
+    @manipulative
+    async def update(self, mapping={}, **keywords):
+        """Updates the hash from the given ``mapping`` and keyword
+        arguments (:redis:`HSET`).
+
+        :param mapping: a mapping object or an iterable of pairs
+        :type mapping: :class:`collections.abc.Mapping`
+
+        """
+        value = dict(mapping)
+        value.update(keywords)
+        if not value:
+            return
+        if self.session.current_transaction is None:
+            async with self.session.basic_client.pipeline() as pipe:
+                self.save(value, pipe)
+                await pipe.execute()
+        else:
+            self.save(value, self.session.client)
+
+    def save(self, value, pipe):
+        if not isinstance(value, collections.abc.Mapping):
+            raise TypeError('expected a mapping object, not ' + repr(value))
+        keys = list(value)
+        items = zip(self.key_type.encode_many(keys),
+                    self.value_type.encode_many(value[k] for k in keys))
+        for chunk in utils.chunk(items, 100):
+            pipe.hset(self.key, mapping=dict(chunk))
+
+
+class AsyncList(AsyncProxy):
+    """The asynchronous version of :class:`sider.list.List`.
+
+    :param session: the session object
+    :type session: :class:`AsyncSession`
+    :param key: the Redis key
+    :type key: :class:`str`
+    :param value_type: the type of list values
+    :type value_type: :class:`~sider.types.Bulk`, :class:`type`
+
+    """
+
+    async def __aiter__(self):
+        """Iterates over its elements.  It fetches elements by chunks
+        of :redis:`LRANGE`.
+
+        """
+        step = 100
+        decode_many = self.value_type.decode_many
+        await self.session.mark_query([self.key])
+        i = 0
+        chunk = None
+        while chunk is None or len(chunk) >= step:
+            chunk = await self.session.client.lrange(self.key, i, i + step - 1)
+            for value in decode_many(chunk):
+                yield value
+            i += step
+
+    @query
+    async def length(self):
+        """Gets the number of the list elements (:redis:`LLEN`).
+
+        :rtype: :class:`numbers.Integral`
+
+        """
+        return await self.session.client.llen(self.key)
+
+    @query
+    async def get(self, index):
+        """Gets or slices the element of the given ``index``
+        (:redis:`LINDEX` or :redis:`LRANGE`).
+
+        :param index: the index of the element to get,
+                      or the slice of a range to get
+        :type index: :class:`numbers.Integral`, :class:`slice`
+        :returns: the element value, or the sliced new list
+        :raises exceptions.IndexError: when ``index`` is out of range
+
+        """
+        if isinstance(index, numbers.Integral):
+            result = await self.session.client.lindex(self.key, index)
+            if result is None:
+                raise IndexError(index)
+            return self.value_type.decode(result)
+        elif isinstance(index, slice):
+            bounds = utils.lrange_bounds(index)
+            if bounds is None:
+                return []
+            result = await self.session.client.lrange(self.key, *bounds)
+            if index.step is not None:
+                result = result[::index.step]
+            return self.value_type.decode_many(result)
+        raise TypeError('indices must be integers, not ' + repr(index))
+
+    async def set(self, index, value):
+        """Sets the element of the given ``index`` (:redis:`LSET`).
+
+        :param index: the index of the element to set
+        :type index: :class:`numbers.Integral`
+        :param value: the value to set
+        :raises exceptions.IndexError: when ``index`` is out of range
+
+        """
+        if not isinstance(index, numbers.Integral):
+            raise TypeError('index must be an integer, not ' + repr(index))
+        data = self.value_type.encode(value)
+        session = self.session
+        if session.current_transaction is None:
+            await session.mark_manipulative([self.key])
+            try:
+                await session.client.lset(self.key, index, data)
+            except ResponseError:
+                raise IndexError(index)
+        else:
+            await session.mark_query([self.key])
+            length = await session.client.llen(self.key)
+            if not (0 <= index < length or -length <= index < 0):
+                raise IndexError(index)
+            await session.mark_manipulative([self.key])
+            await session.client.lset(self.key, index, data)
+
+    @manipulative
+    async def append(self, value):
+        """Inserts the ``value`` at the tail of the list (:redis:`RPUSH`).
+
+        :param value: an value to insert
+
+        """
+        await self.session.client.rpush(self.key,
+                                        self.value_type.encode(value))
+
+    @manipulative
+    async def extend(self, iterable):
+        """Extends the list with the ``iterable`` (:redis:`RPUSH`).
+
+        :param iterable: an iterable object that extend the list with
+        :type iterable: :class:`collections.abc.Iterable`
+
+        """
+        encoded = self.value_type.encode_many(iterable)
+        chunks = list(utils.chunk(encoded, 100))
+        if not chunks:
+            return
+        if self.session.current_transaction is None:
+            async with self.session.basic_client.pipeline() as pipe:
+                for chunk in chunks:
+                    pipe.rpush(self.key, *chunk)
+                await pipe.execute()
+        else:
+            for chunk in chunks:
+                await self.session.client.rpush(self.key, *chunk)
+
+    def save(self, value, pipe):
+        if not isinstance(value, collections.abc.Sequence):
+            raise TypeError('expected a list-like sequence, not ' +
+                            repr(value))
+        for chunk in utils.chunk(self.value_type.encode_many(value), 100):
+            pipe.rpush(self.key, *chunk)
+
+    async def pop(self, index=-1):
+        """Removes and returns an item at ``index`` which is 0 or -1
+        (:redis:`LPOP` or :redis:`RPOP`).
+
+        :param index: 0 or -1.  default is -1
+        :type index: :class:`numbers.Integral`
+        :returns: the removed element
+        :raises exceptions.IndexError: if the list is empty
+
+        """
+        if index not in (0, -1):
+            raise ValueError('only 0 or -1 can be popped, not ' +
+                             repr(index))
+        session = self.session
+        client = session.client
+        if session.current_transaction is None:
+            pop = client.lpop if index == 0 else client.rpop
+            popped = await pop(self.key)
+        else:
+            await session.mark_query([self.key])
+            popped = await client.lindex(self.key, index)
+            await session.mark_manipulative()
+            if index == 0:
+                await client.ltrim(self.key, 1, -1)
+            else:
+                await client.ltrim(self.key, 0, -2)
+        if popped is None:
+            raise IndexError(index)
+        return self.value_type.decode(popped)
+
+
+class AsyncSet(AsyncProxy):
+    """The asynchronous version of :class:`sider.set.Set`.
+
+    :param session: the session object
+    :type session: :class:`AsyncSession`
+    :param key: the Redis key
+    :type key: :class:`str`
+    :param value_type: the type of set elements
+    :type value_type: :class:`~sider.types.Bulk`, :class:`type`
+
+    """
+
+    async def __aiter__(self):
+        """Iterates over its members (:redis:`SMEMBERS`)."""
+        for member in await self.members():
+            yield member
+
+    @query
+    async def members(self):
+        """Gets its all members (:redis:`SMEMBERS`).
+
+        :rtype: :class:`frozenset`
+
+        """
+        members = await self.session.client.smembers(self.key)
+        return frozenset(self.value_type.decode_many(members))
+
+    @query
+    async def length(self):
+        """Gets the cardinality of the set (:redis:`SCARD`).
+
+        :rtype: :class:`numbers.Integral`
+
+        """
+        return await self.session.client.scard(self.key)
+
+    @query
+    async def contains(self, member):
+        """Tests whether the set contains the given ``member``
+        (:redis:`SISMEMBER`).
+
+        :param member: the value to test
+        :rtype: :class:`bool`
+
+        """
+        try:
+            data = self.value_type.encode(member)
+        except TypeError:
+            return False
+        return bool(await self.session.client.sismember(self.key, data))
+
+    @manipulative
+    async def add(self, element):
+        """Adds an ``element`` to the set (:redis:`SADD`).
+
+        :param element: an element to add
+
+        """
+        data = self.value_type.encode(element)
+        await self.session.client.sadd(self.key, data)
+
+    @manipulative
+    async def discard(self, element):
+        """Removes an ``element`` from the set if it is a member
+        (:redis:`SREM`).
+
+        :param element: an element to remove
+
+        """
+        try:
+            data = self.value_type.encode(element)
+        except TypeError:
+            return
+        await self.session.client.srem(self.key, data)
+
+    @manipulative
+    async def update(self, *sets):
+        """Adds all elements of the given ``sets`` (:redis:`SADD`).
+
+        :param \\*sets: zero or more iterables
+
+        """
+        members = self.value_type.encode_many(member for set_ in sets
+                                              for member in set_)
+        for chunk in utils.chunk(members, 100):
+            await self.session.client.sadd(self.key, *chunk)
+
+    def save(self, value, pipe):
+        if not isinstance(value, collections.abc.Set):
+            raise TypeError('expected a set-like object, not ' + repr(value))
+        for chunk in utils.chunk(self.value_type.encode_many(value), 100):
+            pipe.sadd(self.key, *chunk)
+
+    async def pop(self):
+        """Removes an arbitrary element from the set and returns it
+        (:redis:`SPOP`).
+
+        :returns: a removed arbitrary element
+        :raises exceptions.KeyError: if the set is empty
+
+        """
+        session = self.session
+        if session.current_transaction is None:
+            popped = await session.client.spop(self.key)
+        else:
+            await session.mark_query([self.key])
+            popped = await session.client.srandmember(self.key)
+            if popped is not None:
+                await session.mark_manipulative()
+                await session.client.srem(self.key, popped)
+        if popped is None:
+            raise KeyError('pop from an empty set')
+        return self.value_type.decode(popped)
+
+
+class AsyncSortedSet(AsyncProxy):
+    """The asynchronous version of :class:`sider.sortedset.SortedSet`.
+
+    :param session: the session object
+    :type session: :class:`AsyncSession`
+    :param key: the Redis key
+    :type key: :class:`str`
+    :param value_type: the type of set elements
+    :type value_type: :class:`~sider.types.Bulk`, :class:`type`
+
+    """
+
+    async def __aiter__(self):
+        """Iterates over its members ordered by their scores
+        (:redis:`ZRANGE`).
+
+        """
+        for member, _ in await self.items():
+            yield member
+
+    @query
+    async def length(self):
+        """Gets the cardinality of the sorted set (:redis:`ZCARD`).
+
+        :rtype: :class:`numbers.Integral`
+
+        """
+        return await self.session.client.zcard(self.key)
+
+    @query
+    async def score(self, member):
+        """Gets the score of the given ``member`` (:redis:`ZSCORE`).
+
+        :param member: the member to get its score
+        :returns: the score of the ``member``
+        :rtype: :class:`numbers.Real`
+        :raises exceptions.KeyError: if there's no such ``member``
+
+        """
+        element = self.value_type.encode(member)
+        score = await self.session.client.zscore(self.key, element)
+        if score is None:
+            raise KeyError(member)
+        return score
+
+    async def get(self, member, default=None):
+        """Gets the score of the given ``member``, or ``default``
+        if it doesn't exist (:redis:`ZSCORE`).
+
+        :param member: the member to get its score
+        :param default: the value to return if there's no such ``member``
+
+        """
+        try:
+            return await self.score(member)
+        except KeyError:
+            return default
+
+    async def contains(self, member):
+        """Tests whether the set contains the given ``member``
+        (:redis:`ZSCORE`).
+
+        :param member: the value to test
+        :rtype: :class:`bool`
+
+        """
+        try:
+            await self.score(member)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    @manipulative
+    async def set(self, member, score):
+        """Sets the ``score`` of the ``member`` (:redis:`ZADD`).
+
+        :param member: the member to set its ``score``
+        :param score: the score to set
+        :type score: :class:`numbers.Real`
+
+        """
+        if not isinstance(score, numbers.Real):
+            raise TypeError('score must be a float, not ' + repr(score))
+        element = self.value_type.encode(member)
+        await self.session.client.zadd(self.key, {element: score})
+
+    @manipulative
+    async def add(self, member, score=1):
+        """Adds a new ``member`` or increases its ``score``
+        (:redis:`ZINCRBY`).
+
+        :param member: the member to add or increase its score
+        :param score: the amount to increase the score.  default is 1
+        :type score: :class:`numbers.Real`
+
+        """
+        if not isinstance(score, numbers.Real):
+            raise TypeError('score must be a numbers.Real, not ' + repr(score))
+        element = self.value_type.encode(member)
+        await self.session.client.zincrby(self.key, score, element)
+
+    async def discard(self, member, score=1, remove=0):
+        """Decreases the ``score`` of the ``member`` and removes it
+        when its score gets the ``remove`` number or less.
+        See also :meth:`SortedSet.discard()
+        <sider.sortedset.SortedSet.discard>`.
+
+        :param member: the member to decrease its score
+        :param score: the amount to decrease the score.  default is 1
+        :type score: :class:`numbers.Real`
+        :param remove: the threshold score to be removed.
+                       if ``None`` is passed, it doesn't remove
+                       the member.  default is 0
+        :type remove: :class:`numbers.Real`
+
+        """
+        if remove is None:
+            await self.add(member, -score)
+            return
+        element = self.value_type.encode(member)
+        async def block(trial, transaction):
+            session = self.session
+            await session.mark_query([self.key])
+            current = await session.client.zscore(self.key, element)
+            if current is None:
+                return
+            await session.mark_manipulative()
+            if current - score > remove:
+                await session.client.zincrby(self.key, -score, element)
+            else:
+                await session.client.zrem(self.key, element)
+        await self.session.transaction(block, [self.key], ignore_double=True)
+
+    async def delete(self, member):
+        """Removes the ``member`` (:redis:`ZREM`).
+
+        :param member: the member to delete
+        :raises exceptions.KeyError: if there's no such ``member``
+
+        """
+        element = self.value_type.encode(member)
+        session = self.session
+        if session.current_transaction is None:
+            exists = await session.client.zrem(self.key, element)
+        else:
+            await session.mark_query([self.key])
+            exists = await session.client.zscore(self.key,
+                                                 element) is not None
+            if exists:
+                await session.mark_manipulative()
+                await session.client.zrem(self.key, element)
+        if not exists:
+            raise KeyError(member)
+
+    @query
+    async def items(self, reverse=False):
+        """Returns an ordered list of pairs of elements and these scores
+        (:redis:`ZRANGE` ``WITHSCORES``).
+
+        :param reverse: order result descendingly if it's ``True``
+        :type reverse: :class:`bool`
+        :rtype: :class:`list`
+
+        """
+        return await self.least_common(reverse=reverse)
+
+    async def most_common(self, n=None, reverse=False):
+        """Returns a list of the ``n`` most common members and their
+        scores.  See also :meth:`SortedSet.most_common()
+        <sider.sortedset.SortedSet.most_common>`.
+
+        """
+        return await self.least_common(n, reverse=not reverse)
+
+    @query
+    async def least_common(self, n=None, reverse=False):
+        """Returns a list of the ``n`` least common members and their
+        scores.  See also :meth:`SortedSet.least_common()
+        <sider.sortedset.SortedSet.least_common>`.
+
+        """
+        if n is None:
+            n = 0
+        elif not isinstance(n, numbers.Integral):
+            raise TypeError('n must be an integer, not ' + repr(n))
+        client = self.session.client
+        zrange = client.zrevrange if reverse else client.zrange
+        pairs = await zrange(self.key, 0, n - 1, withscores=True)
+        values = self.value_type.decode_many(value for value, _ in pairs)
+        return [(value, score) for value, (_, score) in zip(values, pairs)]
+
+    def save(self, value, pipe):
+        if isinstance(value, collections.abc.Mapping):
+            pairs = value.items()
+        elif isinstance(value, collections.abc.Set):
+            pairs = ((member, 1) for member in value)
+        else:
+            raise TypeError('expected a set-like or mapping object, not ' +
+                            repr(value))
+        pairs = list(pairs)
+        members = self.value_type.encode_many(member for member, _ in pairs)
+        mapping = dict(zip(members, (score for _, score in pairs)))
+        if mapping:
+            pipe.zadd(self.key, mapping)
@@ -0,0 +1,234 @@
+""":mod:`sider.autopipeline` --- Auto-pipelining of fire-and-forget writes
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Manipulative operations like :meth:`List.append()
+<sider.list.List.append>` or :meth:`Set.add() <sider.set.Set.add>` don't
+need their replies.  If a session has an :class:`AutoPipeline`, these
+operations outside of transactions are not sent immediately but queued
+into a shared pipeline::
+
+    from sider.autopipeline import AutoPipeline
+    session = Session(client, autopipeline=AutoPipeline(size=100,
+                                                        window=0.005))
+
+The queued commands are sent at once in a round trip when one of
+the following conditions is met:
+
+- The number of queued commands reaches the ``size`` limit.
+- The time ``window`` has passed since the first command was queued.
+- Any other command is going to be sent through :attr:`Session.client
+  <sider.session.Session.client>` e.g. query operations, so that it can
+  read its own writes.
+- :meth:`AutoPipeline.flush()` is explicitly called.
+
+Errors replied to queued commands are raised only to the threads (or
+greenlets) which queued them, by their next :meth:`flush()` call or
+their next queued command.  Flushes by other threads, including the flusher
+thread of the time ``window``, don't raise these.
+
+Since the flusher thread keeps running while the auto-pipeline is alive,
+close it by :meth:`AutoPipeline.close()` when it's no more used.
+
+"""
+from __future__ import absolute_import
+import threading
+import time
+from .threadlocal import get_ident
+
+
+class AutoPipeline(object):
+    """The shared pipeline which queues fire-and-forget commands.
+    It's thread-safe.
+
+    It behaves like a Redis client for command methods e.g.
+    :meth:`~redis.client.StrictRedis.rpush()` except these return nothing.
+
+    :param size: the maximum number of queued commands.  default is 100
+    :type size: :class:`numbers.Integral`
+    :param window: the maximum seconds to keep commands queued.
+                   if ``None`` commands are kept until any other
+                   condition is met.  default is 0.005 (5 milliseconds)
+    :type window: :class:`numbers.Real`
+
+    """
+
+    #: (:class:`numbers.Integral`) The maximum number of queued commands.
+    size = None
+
+    #: (:class:`numbers.Real`) The maximum seconds to keep commands queued.
+    window = None
+
+    #: (:class:`numbers.Integral`) The number of queued commands.
+    pending = 0
+
+    #: (:class:`bool`) Whether it's closed by :meth:`close()`.
+    closed = False
+
+    def __init__(self, size=100, window=0.005):
+        if size < 1:
+            raise ValueError('size must be greater than 0, not ' + repr(size))
+        elif window is not None and window < 0:
+            raise ValueError('window must not be negative, not ' +
+                             repr(window))
+        self.size = size
+        self.window = window
+        self.pipeline = None
+        self.take_written = None
+        self.invalidate = None
+        self.writers = []
+        self.written_keys = set()
+        self.errors = {}
+        self.deadline = None
+        self.condition = threading.Condition()
+        self.flusher = None
+
+    def bind(self, client, take_written=None, invalidate=None):
+        """Makes the pipeline to send commands through the ``client``.
+        :class:`~sider.session.Session` calls this method.
+
+        Since queued commands can be sent by any thread, keys written by
+        them are taken by ``take_written`` from the thread which queues
+        each command, and then passed to ``invalidate`` after they have
+        been sent.
+
+        :param client: the Redis client
+        :type client: :class:`redis.client.StrictRedis`
+        :param take_written: the function which takes keys written by
+                             the current thread, and returns them.
+                             it's called with no arguments every time
+                             a command is queued
+        :type take_written: :class:`collections.Callable`
+        :param invalidate: the function which is called with the set of
+                           written keys after queued commands are sent
+        :type invalidate: :class:`collections.Callable`
+
+        """
+        with self.condition:
+            if self.pipeline is not None:
+                raise RuntimeError('the auto-pipeline is already bound')
+            self.pipeline = client.pipeline(transaction=False)
+            self.take_written = take_written
+            self.invalidate = invalidate
+            if self.window is not None:
+                self.flusher = threading.Thread(
+                    target=self.run_flusher,
+                    name='sider.autopipeline.AutoPipeline.flusher'
+                )
+                self.flusher.daemon = True
+                self.flusher.start()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        pipeline = self.__dict__.get('pipeline')
+        if pipeline is None:
+            raise AttributeError(name)
+        command = getattr(pipeline, name)
+        def queue(*args, **kwargs):
+            with self.condition:
+                if self.closed:
+                    raise RuntimeError('the auto-pipeline is closed')
+                ident = get_ident()
+                error = self.errors.pop(ident, None)
+                if error is not None:
+                    raise error
+                command(*args, **kwargs)
+                self.writers.append(ident)
+                if self.take_written is not None:
+                    keys = self.take_written()
+                    if keys:
+                        self.written_keys.update(keys)
+                self.pending += 1
+                if self.pending >= self.size:
+                    self.flush()
+                elif self.pending == 1 and self.window is not None:
+                    self.deadline = time.time() + self.window
+                    self.condition.notify()
+        queue.__name__ = name
+        return queue
+
+    def flush(self):
+        """Sends all queued commands in a round trip.
+
+        :raises redis.exceptions.ResponseError:
+           when any command queued by the current thread has been
+           replied an error, including errors from previous flushes
+           e.g. by the time ``window``
+        :raises redis.exceptions.ConnectionError:
+           when commands queued by the current thread couldn't be sent
+
+        """
+        with self.condition:
+            self.send()
+            error = self.errors.pop(get_ident(), None)
+        if error is not None:
+            raise error
+
+    def send(self):
+        """Sends all queued commands in a round trip, and then keeps
+        errors for the threads which queued the failed commands.
+        It has to be called while the :attr:`condition` is held.
+
+        .. note::
+
+           It's totally for internal use.
+
+        """
+        if not self.pending:
+            return
+        writers = self.writers
+        self.writers = []
+        written_keys = self.written_keys
+        self.written_keys = set()
+        self.deadline = None
+        errors = self.errors
+        try:
+            results = self.pipeline.execute(raise_on_error=False)
+        except Exception as e:
+            for ident in writers:
+                errors.setdefault(ident, e)
+        else:
+            for ident, result in zip(writers, results):
+                if isinstance(result, Exception):
+                    errors.setdefault(ident, result)
+        finally:
+            # It becomes zero after commands are sent so that readers
+            # which check it without the lock wait for these.
+            self.pending = 0
+            if written_keys and self.invalidate is not None:
+                self.invalidate(written_keys)
+
+    def close(self):
+        """Sends queued commands and stops the flusher thread.
+        Commands can't be queued anymore after it's closed.
+
+        :raises redis.exceptions.ResponseError:
+           when any command queued by the current thread has been
+           replied an error
+
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        flusher = self.flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        self.flush()
+
+    def run_flusher(self):
+        condition = self.condition
+        with condition:
+            while not self.closed:
+                if self.deadline is None:
+                    condition.wait()
+                    continue
+                remaining = self.deadline - time.time()
+                if remaining > 0:
+                    condition.wait(remaining)
+                    continue
+                self.send()
+
+    def __repr__(self):
+        cls = type(self)
+        return '<{0}.{1} {2}/{3}>'.format(cls.__module__, cls.__name__,
+                                          self.pending, self.size)
@@ -0,0 +1,402 @@
+""":mod:`sider.cache` --- Client-side read cache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Sessions can optionally keep the results of query operations in
+the process so that reading the same values again doesn't need any
+round trips::
+
+    from sider.cache import Cache
+    session = Session(client, cache=Cache(maxsize=4096))
+
+The cache is coherent with manipulative operations done through
+the same session: these invalidate cached results of the keys they
+touch.  To be also aware of changes made by other clients, turn on
+``tracking`` option.  It subscribes invalidation messages from
+the server using :redis:`CLIENT TRACKING` (Redis 6.0 or higher)::
+
+    session = Session(client, cache=Cache(tracking=True))
+
+Query operations inside transactions never use the cache.
+
+.. seealso::
+
+   `Redis server-assisted client side caching
+   <http://redis.io/topics/client-side-caching>`_
+      The Redis documentation that explains about :redis:`CLIENT TRACKING`
+      and invalidation messages.
+
+"""
+from __future__ import absolute_import
+import copy
+import socket
+import threading
+import time
+import warnings
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+from .warnings import SiderWarning
+
+
+try:
+    _string_type = unicode
+except NameError:
+    _string_type = str
+
+
+def normalize_key(key):
+    """Makes the given Redis ``key`` a byte string, the same form to
+    keys that invalidation messages contain.
+
+    :param key: the Redis key
+    :type key: :class:`str`, :class:`unicode`
+    :returns: the byte string key
+    :rtype: :class:`bytes`
+
+    """
+    if isinstance(key, _string_type):
+        return key.encode('utf-8')
+    return key
+
+
+def invalidating_client(client, invalidate):
+    """Makes a copy of the Redis ``client`` which calls ``invalidate``
+    every time a command sent through it or a pipeline made from it
+    has been executed, whether it succeeded or not.
+
+    :class:`~sider.session.Session` uses it to invalidate cached results
+    of written keys again after writes have been done, so that results
+    read by other threads in the middle of writes can't be cached.
+
+    :param client: the Redis client to wrap
+    :type client: :class:`redis.client.StrictRedis`
+    :param invalidate: the function to call with no arguments
+    :type invalidate: :class:`collections.Callable`
+    :returns: the wrapped copy of the ``client``
+    :rtype: :class:`redis.client.StrictRedis`
+
+    """
+    wrapped = copy.copy(client)
+    wrapped.execute_command = _invalidate_after(client.execute_command,
+                                                invalidate)
+    make_pipeline = client.pipeline
+    def pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        pipe.execute = _invalidate_after(pipe.execute, invalidate)
+        return pipe
+    wrapped.pipeline = pipeline
+    return wrapped
+
+
+def _invalidate_after(function, invalidate):
+    def wrapped(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        finally:
+            invalidate()
+    return wrapped
+
+
+class Cache(object):
+    """The bounded LRU cache of query results.  It's thread-safe.
+
+    Entries are tuples of which the first element is a Redis key
+    e.g. ``('my_hash', 'hget', ('my_hash', 'field'), ())``.  All entries
+    of the same key are invalidated at once by :meth:`invalidate()`.
+
+    :param maxsize: the maximum number of entries to keep.
+                    the least recently used entry is evicted first.
+                    default is 1024
+    :type maxsize: :class:`numbers.Integral`
+    :param tracking: whether to subscribe invalidation messages
+                     from the server.  default is ``False``
+    :type tracking: :class:`bool`
+    :param prefixes: key prefixes to subscribe invalidation messages
+                     of when ``tracking`` is ``True``.  all keys by
+                     default
+    :type prefixes: :class:`collections.Iterable`
+
+    """
+
+    #: (:class:`numbers.Integral`) The maximum number of entries.
+    maxsize = None
+
+    #: (:class:`bool`) Whether it subscribes invalidation messages
+    #: from the server.
+    tracking = None
+
+    #: (:class:`tuple`) Key prefixes to subscribe invalidation messages of.
+    prefixes = None
+
+    #: (:class:`InvalidationListener`) The running listener of invalidation
+    #: messages.  It's ``None`` if it's not :attr:`tracking`.
+    listener = None
+
+    def __init__(self, maxsize=1024, tracking=False, prefixes=()):
+        if maxsize < 1:
+            raise ValueError('maxsize must be greater than 0, not ' +
+                             repr(maxsize))
+        self.maxsize = maxsize
+        self.tracking = bool(tracking)
+        self.prefixes = tuple(prefixes)
+        # Entries are doubly linked in the LRU order by
+        # [prev, next, entry, value] links.  (OrderedDict isn't available
+        # in Python 2.6.)
+        self.entries = {}
+        self.root = root = []
+        root[:] = [root, root, None, None]
+        self.index = {}
+        self.reservations = {}
+        self.lock = threading.Lock()
+        self.available = not self.tracking
+
+    def track(self, client):
+        """Starts to subscribe invalidation messages through a new
+        connection of the given ``client``.  :class:`~sider.session.Session`
+        calls this method if :attr:`tracking` is ``True``.
+
+        :param client: the Redis client
+        :type client: :class:`redis.client.StrictRedis`
+
+        """
+        if self.listener is not None:
+            return
+        self.listener = InvalidationListener(self, client)
+        self.listener.start()
+
+    def close(self):
+        """Stops subscribing invalidation messages and clears all entries."""
+        listener = self.listener
+        if listener is not None:
+            self.listener = None
+            listener.stop()
+        self.clear()
+
+    def get(self, entry):
+        """Gets the cached result of the ``entry``.
+
+        :param entry: the entry to find
+        :type entry: :class:`tuple`
+        :returns: the cached result
+        :raises exceptions.KeyError: when there's no such ``entry``
+
+        """
+        with self.lock:
+            if not self.available:
+                raise KeyError(entry)
+            link = self.entries[entry]
+            _unlink(link)
+            self.append(link)
+            return link[3]
+
+    def reserve(self, key):
+        """Marks the ``key`` as being fetched.  Results fetched after
+        this call can be stored by :meth:`store()` only if the ``key``
+        hasn't been invalidated in the meantime.
+
+        :param key: the Redis key going to be fetched
+        :type key: :class:`str`
+        :returns: the reservation token to pass to :meth:`store()`
+
+        """
+        token = object()
+        with self.lock:
+            self.reservations[normalize_key(key)] = token
+        return token
+
+    def store(self, token, entry, value):
+        """Stores the ``value`` for the ``entry`` if the reservation
+        ``token`` is still valid.
+
+        :param token: the token :meth:`reserve()` returned
+        :param entry: the entry of which the first element is its key
+        :type entry: :class:`tuple`
+        :param value: the result to store
+        :returns: ``True`` if it's stored or ``False``
+        :rtype: :class:`bool`
+
+        """
+        key = normalize_key(entry[0])
+        with self.lock:
+            if not self.available or self.reservations.get(key) is not token:
+                return False
+            del self.reservations[key]
+            entries = self.entries
+            if entry in entries:
+                _unlink(entries.pop(entry))
+            link = [None, None, entry, value]
+            entries[entry] = link
+            self.append(link)
+            self.index.setdefault(key, set()).add(entry)
+            while len(entries) > self.maxsize:
+                oldest = self.root[1]
+                _unlink(oldest)
+                old = oldest[2]
+                del entries[old]
+                old_key = normalize_key(old[0])
+                keyed = self.index[old_key]
+                keyed.discard(old)
+                if not keyed:
+                    del self.index[old_key]
+        return True
+
+    def invalidate(self, keys):
+        """Discards all entries of the given ``keys``.
+
+        :param keys: Redis keys to invalidate
+        :type keys: :class:`collections.Iterable`
+
+        """
+        with self.lock:
+            entries = self.entries
+            for key in keys:
+                key = normalize_key(key)
+                self.reservations.pop(key, None)
+                for entry in self.index.pop(key, ()):
+                    _unlink(entries.pop(entry))
+
+    def clear(self):
+        """Discards all entries."""
+        with self.lock:
+            self.entries.clear()
+            root = self.root
+            root[:] = [root, root, None, None]
+            self.index.clear()
+            self.reservations.clear()
+
+    def append(self, link):
+        """Links the ``link`` as the most recently used one.  It has to
+        be called while the :attr:`lock` is held.
+
+        .. note::
+
+           It's totally for internal use.
+
+        """
+        root = self.root
+        last = root[0]
+        link[0] = last
+        link[1] = root
+        last[1] = root[0] = link
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        cls = type(self)
+        return '<{0}.{1} {2}/{3}{4}>'.format(
+            cls.__module__, cls.__name__, len(self), self.maxsize,
+            ' tracking' if self.tracking else ''
+        )
+
+
+def _unlink(link):
+    prev, next_ = link[0], link[1]
+    prev[1] = next_
+    next_[0] = prev
+
+
+class InvalidationListener(threading.Thread):
+    """The daemon thread which subscribes invalidation messages from
+    the server and then invalidates entries of the ``cache``.
+
+    It uses a dedicated connection that redirects its own
+    :redis:`CLIENT TRACKING` messages to itself in ``BCAST`` mode,
+    so changes of any keys (or keys matching :attr:`Cache.prefixes`)
+    are notified.  While the connection is lost, the ``cache`` becomes
+    unavailable and it keeps reconnecting.  If the server refuses
+    the subscription e.g. Redis older than 6.0, it warns
+    :class:`~sider.warnings.SiderWarning` and then stops, and
+    the ``cache`` stays unavailable.
+
+    :param cache: the cache to invalidate
+    :type cache: :class:`Cache`
+    :param client: the Redis client to make a connection from
+    :type client: :class:`redis.client.StrictRedis`
+
+    """
+
+    #: (:class:`str`) The channel of invalidation messages.
+    CHANNEL = b'__redis__:invalidate'
+
+    #: (:class:`numbers.Real`) Seconds to wait before reconnecting.
+    RECONNECT_DELAY = 0.5
+
+    #: (:exc:`redis.exceptions.ResponseError`) The error the server
+    #: replied to the subscription, if it refused.  Otherwise ``None``.
+    error = None
+
+    def __init__(self, cache, client):
+        super(InvalidationListener, self).__init__(
+            name='sider.cache.InvalidationListener'
+        )
+        self.daemon = True
+        self.cache = cache
+        self.client = client
+        self.connection = None
+        self.ready = threading.Event()
+        self.running = True
+
+    def connect(self):
+        conn = self.client.connection_pool.make_connection()
+        try:
+            conn.send_command('CLIENT', 'ID')
+            client_id = conn.read_response()
+            args = ['CLIENT', 'TRACKING', 'on', 'REDIRECT', client_id,
+                    'BCAST']
+            for prefix in self.cache.prefixes:
+                args.extend(('PREFIX', prefix))
+            conn.send_command(*args)
+            conn.read_response()
+            conn.send_command('SUBSCRIBE', self.CHANNEL)
+            conn.read_response()
+        except:
+            conn.disconnect()
+            raise
+        return conn
+
+    def run(self):
+        cache = self.cache
+        while self.running:
+            try:
+                self.connection = self.connect()
+            except ResponseError as e:
+                # Reconnecting doesn't help if the server doesn't support
+                # CLIENT TRACKING or refuses its options.
+                self.error = e
+                self.running = False
+                warnings.warn('the cache cannot subscribe invalidation '
+                              'messages, so it stays unavailable: ' + str(e),
+                              category=SiderWarning)
+                return
+            except (ConnectionError, TimeoutError, socket.error):
+                time.sleep(self.RECONNECT_DELAY)
+                continue
+            with cache.lock:
+                cache.available = True
+            self.ready.set()
+            try:
+                while self.running:
+                    message = self.connection.read_response()
+                    if message[0] != b'message':
+                        continue
+                    if message[2] is None:
+                        cache.clear()
+                    else:
+                        cache.invalidate(message[2])
+            except (ConnectionError, TimeoutError, AttributeError,
+                    ValueError, socket.error):
+                # AttributeError and ValueError can be raised when
+                # stop() has disconnected the connection.
+                pass
+            finally:
+                with cache.lock:
+                    cache.available = False
+                cache.clear()
+                self.ready.clear()
+                self.connection.disconnect()
+
+    def stop(self):
+        """Stops the listener."""
+        self.running = False
+        connection = self.connection
+        if connection is not None:
+            connection.disconnect()
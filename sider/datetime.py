@@ -170,6 +170,36 @@ class FixedOffset(datetime.tzinfo):
         return '{0}.{1}({2!r})'.format(cls.__module__, cls.__name__, min)
 
 
+#: (:class:`dict`) The cache of :class:`FixedOffset` instances for each
+#: offset in minutes.  See also :func:`fixed_offset()`.
+fixed_offsets = {}
+
+
+def fixed_offset(minutes):
+    """Gets the :class:`FixedOffset` of the given ``minutes``.
+    Unlike the constructor of :class:`FixedOffset` it returns the same
+    instance for the same offset, so that decoding many values with
+    offsets doesn't make a new instance for each.
+
+    .. sourcecode:: pycon
+
+       >>> fixed_offset(540)
+       sider.datetime.FixedOffset(540)
+       >>> fixed_offset(540) is fixed_offset(540)
+       True
+
+    :param minutes: the offset in minutes east from :const:`UTC`
+    :type minutes: :class:`numbers.Integral`
+    :returns: the cached :class:`FixedOffset` instance
+    :rtype: :class:`FixedOffset`
+
+    """
+    try:
+        return fixed_offsets[minutes]
+    except KeyError:
+        return fixed_offsets.setdefault(minutes, FixedOffset(minutes))
+
+
 def total_seconds(timedelta):
     """For Python 2.6 compatibility.  Equivalent to
     :meth:`timedelta.total_seconds() <datetime.timedelta.total_seconds>`
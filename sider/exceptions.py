@@ -25,3 +25,17 @@ class CommitError(TransactionError):
 class ConflictError(TransactionError):
     """Error rasied when the transaction has met conflicts."""
 
+
+class RetryLimitError(ConflictError):
+    """Error raised when the transaction has met conflicts and
+    its :class:`~sider.transaction.RetryPolicy` gives up retrying.
+
+    """
+
+
+class NotCommittedError(TransactionError):
+    """Error raised when the result of a command queued in a transaction
+    is accessed before the transaction is committed.  See also
+    :class:`~sider.transaction.Future`.
+
+    """
@@ -0,0 +1,262 @@
+""":mod:`sider.groupcommit` --- Group commit of write-only batches
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Every :meth:`Session.atomic() <sider.session.Session.atomic>` batch
+takes a round trip for its :redis:`MULTI`/:redis:`EXEC`.  If a session
+has a :class:`GroupCommit`, batches committed by many threads at nearly
+the same time are merged and sent together in a round trip instead::
+
+    from sider.groupcommit import GroupCommit
+    session = Session(client, group_commit=GroupCommit(size=100,
+                                                       window=0.002))
+
+    with session.atomic():
+        counter['hits'] += 1  # HINCRBY
+
+Each batch is still wrapped by its own :redis:`MULTI`/:redis:`EXEC`,
+so it's committed atomically and independently from the others.
+Committing threads are blocked until the merged batches are sent,
+and then each of them is told whether its own batch has succeeded:
+errors replied to a batch are raised only to its thread.
+
+Merged batches are sent when one of the following conditions is met:
+
+- The number of waiting batches reaches the ``size`` limit.
+- The time ``window`` has passed since the first batch waited.
+
+Since batches can't read anything, compare-and-set operations have to be
+done on the server side e.g. by :redis:`EVAL` in the batch.
+
+"""
+from __future__ import absolute_import
+import threading
+import time
+from timeit import default_timer
+from redis.exceptions import ResponseError
+from .instrumentation import Command
+
+
+class GroupCommit(object):
+    """The executor which merges write-only batches committed by
+    many threads and sends them in a round trip.  It's thread-safe.
+
+    :param size: the maximum number of batches to merge.  default is 100
+    :type size: :class:`numbers.Integral`
+    :param window: the maximum seconds to let batches wait.
+                   default is 0.002 (2 milliseconds)
+    :type window: :class:`numbers.Real`
+
+    """
+
+    #: (:class:`numbers.Integral`) The maximum number of batches to merge.
+    size = None
+
+    #: (:class:`numbers.Real`) The maximum seconds to let batches wait.
+    window = None
+
+    def __init__(self, size=100, window=0.002):
+        if size < 1:
+            raise ValueError('size must be greater than 0, not ' + repr(size))
+        elif window < 0:
+            raise ValueError('window must not be negative, not ' +
+                             repr(window))
+        self.size = size
+        self.window = window
+        self.client = None
+        self.batches = []
+        self.deadline = None
+        self.condition = threading.Condition()
+        self.flusher = None
+
+    @property
+    def pending(self):
+        """(:class:`numbers.Integral`) The number of waiting batches."""
+        return len(self.batches)
+
+    def bind(self, client):
+        """Makes it to send batches through the ``client``.
+        :class:`~sider.session.Session` calls this method.
+
+        :param client: the Redis client
+        :type client: :class:`redis.client.StrictRedis`
+
+        """
+        with self.condition:
+            if self.client is not None:
+                raise RuntimeError('the group commit is already bound')
+            self.client = client
+            self.flusher = threading.Thread(
+                target=self.run_flusher,
+                name='sider.groupcommit.GroupCommit.flusher'
+            )
+            self.flusher.daemon = True
+            self.flusher.start()
+
+    def commit(self, commands):
+        """Commits the batch of ``commands`` atomically together with
+        batches of other threads, and waits until it's done.
+
+        :param commands: ``(args, options)`` pairs of commands
+                         e.g. :attr:`~redis.client.BasePipeline.command_stack`
+                         of a pipeline
+        :type commands: :class:`collections.Sequence`
+        :returns: the list of replies of the ``commands``
+        :rtype: :class:`list`
+        :raises redis.exceptions.ResponseError:
+           when any of the ``commands`` has been replied an error
+        :raises redis.exceptions.ConnectionError:
+           when the merged batches couldn't be sent
+
+        """
+        if not commands:
+            return []
+        elif self.client is None:
+            raise RuntimeError('the group commit is not bound to any client')
+        batch = _Batch(commands)
+        with self.condition:
+            self.batches.append(batch)
+            if len(self.batches) >= self.size:
+                batches = self.take()
+            else:
+                batches = None
+                if len(self.batches) == 1:
+                    self.deadline = time.time() + self.window
+                    self.condition.notify()
+        if batches is not None:
+            self.send(batches)
+        batch.event.wait()
+        if batch.error is not None:
+            raise batch.error
+        return batch.results
+
+    def flush(self):
+        """Sends all waiting batches in a round trip right now."""
+        with self.condition:
+            batches = self.take()
+        if batches:
+            self.send(batches)
+
+    def take(self):
+        """Takes all waiting batches out.  It has to be called while
+        the :attr:`condition` is held.
+
+        .. note::
+
+           It's totally for internal use.
+
+        """
+        batches = self.batches
+        self.batches = []
+        self.deadline = None
+        return batches
+
+    def send(self, batches):
+        """Sends ``batches`` in a round trip, and then tells each of
+        them its own result.
+
+        .. note::
+
+           It's totally for internal use.
+
+        """
+        pipe = self.client.pipeline(transaction=False)
+        packed = []
+        for batch in batches:
+            packed.append(('MULTI',))
+            packed.extend(args for args, _ in batch.commands)
+            packed.append(('EXEC',))
+        record = getattr(pipe, 'sider_record', None)
+        if record is not None and record.instruments:
+            started_at = default_timer()
+        else:
+            record = None
+        connection = None
+        try:
+            connection = pipe.connection_pool.get_connection('MULTI')
+            connection.send_packed_command(connection.pack_commands(packed))
+            for batch in batches:
+                batch.read(pipe, connection)
+        except Exception as e:
+            # Errors are raised to waiting threads instead.
+            if connection is not None:
+                connection.disconnect()
+            for batch in batches:
+                if not batch.event.is_set():
+                    batch.error = e
+                    batch.event.set()
+        finally:
+            # Nothing must be left waiting even for KeyboardInterrupt
+            # and the like.
+            for batch in batches:
+                if not batch.event.is_set():
+                    batch.error = RuntimeError('the batch has not been sent')
+                    batch.event.set()
+            if connection is not None:
+                pipe.connection_pool.release(connection)
+            if record is not None:
+                record([Command.from_args(args) for args in packed],
+                       default_timer() - started_at)
+
+    def run_flusher(self):
+        condition = self.condition
+        while True:
+            with condition:
+                if self.deadline is None:
+                    condition.wait()
+                    continue
+                remaining = self.deadline - time.time()
+                if remaining > 0:
+                    condition.wait(remaining)
+                    continue
+                batches = self.take()
+            try:
+                self.send(batches)
+            except Exception:
+                # The batches have been told the error anyway; the flusher
+                # has to survive for later ones.
+                pass
+
+    def __repr__(self):
+        cls = type(self)
+        return '<{0}.{1} {2}/{3}>'.format(cls.__module__, cls.__name__,
+                                          self.pending, self.size)
+
+
+class _Batch(object):
+    """The batch waiting for :class:`GroupCommit`."""
+
+    __slots__ = 'commands', 'results', 'error', 'event'
+
+    def __init__(self, commands):
+        self.commands = list(commands)
+        self.results = None
+        self.error = None
+        self.event = threading.Event()
+
+    def read(self, pipe, connection):
+        """Reads replies of :redis:`MULTI`, queued commands and
+        :redis:`EXEC` in order.
+
+        """
+        error = None
+        for _ in range(len(self.commands) + 1):
+            try:
+                connection.read_response()
+            except ResponseError as e:
+                error = error or e
+        try:
+            replies = connection.read_response()
+        except ResponseError as e:
+            # EXECABORT; prefer the error which caused it.
+            self.error = error or e
+        else:
+            callbacks = pipe.response_callbacks
+            results = []
+            for (args, options), reply in zip(self.commands, replies):
+                if isinstance(reply, ResponseError):
+                    self.error = self.error or reply
+                elif args[0] in callbacks:
+                    reply = callbacks[args[0]](reply, **options)
+                results.append(reply)
+            self.results = results
+        self.event.set()
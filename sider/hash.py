@@ -12,9 +12,21 @@ import collections
 from .session import Session
 from .types import Bulk, String
 from .transaction import query, manipulative
+from .script import Script
 from . import utils
 
 
+#: (:class:`~sider.script.Script`) Sets the field ``ARGV[1]`` to
+#: ``ARGV[2]`` if it doesn't exist.  It returns the current value
+#: if it exists, or nothing.
+SETDEFAULT_SCRIPT = Script('''
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    return redis.call('HGET', KEYS[1], ARGV[1])
+end
+return false
+''', 'sider.hash.SETDEFAULT_SCRIPT')
+
+
 class Hash(collections.MutableMapping):
     """The Python-side representaion of Redis hash value.  It behaves
     such as built-in Python :class:`dict` object.  More exactly, it
@@ -77,9 +89,8 @@ class Hash(collections.MutableMapping):
 
         """
         keys = self.session.client.hkeys(self.key)
-        decode = self.key_type.decode
-        for key in keys:
-            yield decode(key)
+        for key in self.key_type.decode_many(keys):
+            yield key
 
     @query
     def __len__(self):
@@ -133,7 +144,7 @@ class Hash(collections.MutableMapping):
 
         """
         field = self.key_type.encode(key)
-        value = self.session.client.hget(self.key, field)
+        value = self.session.cached_query(self.key, 'hget', self.key, field)
         if value is None:
             raise KeyError(key)
         return self.value_type.decode(value)
@@ -156,7 +167,7 @@ class Hash(collections.MutableMapping):
         """
         encoded_key = self.key_type.encode(key)
         encoded_val = self.value_type.encode(value)
-        self.session.client.hset(self.key, encoded_key, encoded_val)
+        self.session.deferred_client.hset(self.key, encoded_key, encoded_val)
 
     def __delitem__(self, key):
         """Removes the ``key``.
@@ -176,6 +187,7 @@ class Hash(collections.MutableMapping):
         session = self.session
         encoded = self.key_type.encode(key)
         if session.current_transaction is None:
+            session.mark_manipulative([self.key])
             ok = session.client.hdel(self.key, encoded)
         else:
             session.mark_query([self.key])
@@ -217,10 +229,7 @@ class Hash(collections.MutableMapping):
 
         """
         values = self.session.client.hvals(self.key)
-        decode = self.value_type.decode
-        for i, val in enumerate(values):
-            values[i] = decode(val)
-        return values
+        return self.value_type.decode_many(values)
 
     @query
     def items(self):
@@ -235,11 +244,10 @@ class Hash(collections.MutableMapping):
            This method is mapped to Redis :redis:`HGETALL` command.
 
         """
-        items = self.session.client.hgetall(self.key)
-        decode_key = self.key_type.decode
-        decode_value = self.value_type.decode
-        return frozenset((decode_key(k), decode_value(items[k]))
-                         for k in items)
+        items = self.session.cached_query(self.key, 'hgetall', self.key)
+        keys = self.key_type.decode_many(items)
+        values = self.value_type.decode_many(items.values())
+        return frozenset(zip(keys, values))
 
     @manipulative
     def clear(self):
@@ -281,10 +289,17 @@ class Hash(collections.MutableMapping):
         .. note::
 
            This method internally uses Redis :redis:`HSETNX`
-           command which is atomic.
+           command which is atomic.  If the field already exists,
+           :redis:`HGET` follows in the same Lua script
+           (:data:`SETDEFAULT_SCRIPT`) when :meth:`Session.prefers_script()
+           <sider.session.Session.prefers_script>` says so.  Otherwise,
+           i.e. on Redis older than 2.6, with ``scripting=False``, or
+           when the key isn't hot for the session's
+           :attr:`~sider.session.Session.adaptive_scripting`, it follows
+           in a :redis:`WATCH`-ed transaction instead.
 
         """
-        if self.session.transaction is not None:
+        if self.session.current_transaction is not None:
             self.session.mark_query()
             try:
                 val = self[key]
@@ -294,6 +309,11 @@ class Hash(collections.MutableMapping):
             return val
         encoded_key = self.key_type.encode(key)
         encoded_val = self.value_type.encode(default)
+        if self.session.prefers_script(self.key):
+            self.session.mark_manipulative([self.key])
+            value = self.session.run_script(SETDEFAULT_SCRIPT, [self.key],
+                                            [encoded_key, encoded_val])
+            return default if value is None else self.value_type.decode(value)
         result = [None]
         def block(pipe):
             ok = pipe.hsetnx(self.key, encoded_key, encoded_val)
@@ -303,6 +323,7 @@ class Hash(collections.MutableMapping):
                 value = pipe.hget(self.key, encoded_key)
                 result[0] = self.value_type.decode(value)
             pipe.multi()
+        self.session.mark_manipulative([self.key])
         self.session.client.transaction(block, self.key)
         return result[0]
 
@@ -363,10 +384,14 @@ class Hash(collections.MutableMapping):
         if encoded:
             flatten = (val for k, v in items for val in (k, v))
         else:
-            encode_key = self.key_type.encode
-            encode_value = self.value_type.encode
-            flatten = (val for k, v in items
-                           for val in (encode_key(k), encode_value(v)))
+            keys = []
+            values = []
+            for k, v in items:
+                keys.append(k)
+                values.append(v)
+            flatten = (val for pair in zip(self.key_type.encode_many(keys),
+                                           self.value_type.encode_many(values))
+                           for val in pair)
         n = 100  # FIXME: it is an arbitarary magic number.
         for chunk in utils.chunk(flatten, n * 2):
             pipe.execute_command('HMSET', self.key, *chunk)
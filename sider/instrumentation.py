@@ -0,0 +1,395 @@
+""":mod:`sider.instrumentation` --- Instrumentation of commands
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Sessions can report every Redis command they send, including commands
+sent through pipelines and transactions, to :class:`Instrument` objects.
+Each command is reported with the Sider operation which sent it, e.g.
+``'sider.hash.Hash.__getitem__'``, so that you can find which operations
+generate your Redis load::
+
+    session = Session(client, stats=True)
+    hash_ = session.get('my_hash', Hash)
+    hash_['a']
+    stats = session.stats
+    stats.round_trips  # 1
+    stats.operations[('sider.hash.Hash.__getitem__', 'HGET')]
+    # CommandStats(calls=1, size=18, latency=0.0001...)
+
+To send commands to other monitoring systems, subclass
+:class:`Instrument` and pass it to the session::
+
+    class LoggingInstrument(Instrument):
+        def record(self, commands, latency):
+            for command in commands:
+                logger.debug('%s %s by %s', command.name, command.key,
+                             command.caller)
+
+    session = Session(client, instruments=[LoggingInstrument()])
+
+"""
+from __future__ import absolute_import
+import collections
+import copy
+import sys
+import threading
+from timeit import default_timer
+
+
+try:
+    _string_type = unicode
+except NameError:
+    _string_type = str
+
+
+#: (:class:`frozenset`) The names of commands of which the first argument
+#: is not a key.
+KEYLESS_COMMANDS = frozenset([
+    'CLIENT', 'CONFIG', 'DBSIZE', 'DISCARD', 'ECHO', 'EXEC', 'FLUSHALL',
+    'FLUSHDB', 'INFO', 'MULTI', 'PING', 'PUBLISH', 'SCRIPT', 'SELECT',
+    'TIME', 'UNWATCH'
+])
+
+#: (:class:`frozenset`) The names of commands which take a script and
+#: the number of keys before keys.
+SCRIPT_COMMANDS = frozenset(['EVAL', 'EVALSHA'])
+
+#: (:class:`frozenset`) ``(module, function)`` pairs of frames that aren't
+#: Sider operations but wrappers of them, e.g. decorators.
+WRAPPER_FRAMES = frozenset([
+    ('sider.transaction', 'marked'),
+    ('sider.transaction', '_routed'),
+    ('sider.transaction', 'wrapped_execute_command'),
+    ('sider.transaction', '_execute_command'),
+    ('sider.transaction', '_execute_watching'),
+    ('sider.autopipeline', 'queue'),
+])
+
+#: (:class:`frozenset`) The modules which provide mixin methods of
+#: abstract base classes, e.g. :meth:`collections.Sequence.index()`.
+MIXIN_MODULES = frozenset(['_abcoll', '_collections_abc', 'collections.abc'])
+
+
+class Command(collections.namedtuple('Command',
+                                     'name key size caller site')):
+    """The record of a command sent to Redis.
+
+    .. attribute:: name
+
+       (:class:`str`) The upper-cased command name e.g. ``'HGET'``.
+
+    .. attribute:: key
+
+       The key the command deals with.  It could be ``None`` for commands
+       which don't take any key e.g. :redis:`PING`.
+
+    .. attribute:: size
+
+       (:class:`numbers.Integral`) The payload size of arguments in bytes.
+
+    .. attribute:: caller
+
+       (:class:`str`) The qualified name of the Sider operation which sent
+       the command e.g. ``'sider.hash.Hash.__getitem__'``.  It's ``None``
+       if it was sent directly through :attr:`Session.client
+       <sider.session.Session.client>`.
+
+    .. attribute:: site
+
+       (:class:`str`) The ``'filename:lineno'`` string of the code which
+       called the :attr:`caller`.  It could be ``None``.
+
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_args(cls, args, depth=1):
+        """Makes a record from the arguments of
+        :meth:`~redis.client.StrictRedis.execute_command()`.
+
+        :param args: the command name and its arguments
+        :type args: :class:`tuple`
+        :param depth: the number of frames to skip to find the caller
+        :type depth: :class:`numbers.Integral`
+        :returns: the command record
+        :rtype: :class:`Command`
+
+        """
+        name = args[0]
+        if not isinstance(name, _string_type):
+            name = name.decode('utf-8')
+        name = name.upper()
+        if name in SCRIPT_COMMANDS:
+            key = args[3] if len(args) > 3 and int(args[2]) > 0 else None
+        elif len(args) > 1 and name not in KEYLESS_COMMANDS:
+            key = args[1]
+        else:
+            key = None
+        size = sum(map(measure, args))
+        caller, site = find_caller(sys._getframe(depth + 1))
+        return cls(name, key, size, caller, site)
+
+
+class CommandStats(collections.namedtuple('CommandStats',
+                                          'calls size latency')):
+    """Aggregated numbers of a command sent by an operation.
+
+    .. attribute:: calls
+
+       (:class:`numbers.Integral`) The number of commands sent.
+
+    .. attribute:: size
+
+       (:class:`numbers.Integral`) The total payload size in bytes.
+
+    .. attribute:: latency
+
+       (:class:`numbers.Real`) The total seconds taken.  The latency
+       of a round trip which sent several commands is evenly divided.
+
+    """
+
+    __slots__ = ()
+
+
+class StatsSnapshot(collections.namedtuple('StatsSnapshot',
+                                           'round_trips commands size latency '
+                                           'operations')):
+    """The snapshot of :class:`Stats`.
+
+    .. attribute:: round_trips
+
+       (:class:`numbers.Integral`) The number of round trips.
+
+    .. attribute:: commands
+
+       (:class:`numbers.Integral`) The number of commands.
+
+    .. attribute:: size
+
+       (:class:`numbers.Integral`) The total payload size in bytes.
+
+    .. attribute:: latency
+
+       (:class:`numbers.Real`) The total seconds taken by round trips.
+
+    .. attribute:: operations
+
+       (:class:`dict`) The mapping of ``(caller, name)`` pairs to
+       :class:`CommandStats`.  See also :attr:`Command.caller` and
+       :attr:`Command.name`.
+
+    """
+
+    __slots__ = ()
+
+
+class Instrument(object):
+    """The base class of instruments.  Subclasses have to implement
+    :meth:`record()` method.
+
+    """
+
+    def record(self, commands, latency):
+        """Called every round trip.  By default it raises
+        :exc:`~exceptions.NotImplementedError`.
+
+        :param commands: the commands sent in the round trip.
+                         there are two or more commands if they were
+                         sent through a pipeline
+        :type commands: :class:`collections.Sequence`
+        :param latency: the seconds the round trip took
+        :type latency: :class:`numbers.Real`
+
+        """
+        cls = type(self)
+        raise NotImplementedError(
+            '{0}.{1}.record() method must be '
+            'implemented'.format(cls.__module__, cls.__name__)
+        )
+
+
+class Stats(Instrument):
+    """The instrument which aggregates numbers of commands for
+    each operation.  It's thread-safe.
+
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def record(self, commands, latency):
+        share = latency / len(commands)
+        with self.lock:
+            self.round_trips += 1
+            self.latency += latency
+            operations = self.operations
+            for command in commands:
+                self.commands += 1
+                self.size += command.size
+                ident = command.caller, command.name
+                try:
+                    calls, size, total = operations[ident]
+                except KeyError:
+                    calls = size = total = 0
+                operations[ident] = CommandStats(calls + 1,
+                                                 size + command.size,
+                                                 total + share)
+
+    def snapshot(self):
+        """Makes the snapshot of the current numbers.
+
+        :returns: the snapshot
+        :rtype: :class:`StatsSnapshot`
+
+        """
+        with self.lock:
+            return StatsSnapshot(self.round_trips, self.commands, self.size,
+                                 self.latency, dict(self.operations))
+
+    def reset(self):
+        """Resets all numbers to zero.
+
+        :returns: the snapshot of the numbers before reset
+        :rtype: :class:`StatsSnapshot`
+
+        """
+        snapshot = None
+        with self.lock:
+            if hasattr(self, 'operations'):
+                snapshot = StatsSnapshot(self.round_trips, self.commands,
+                                         self.size, self.latency,
+                                         self.operations)
+            self.round_trips = self.commands = self.size = 0
+            self.latency = 0.0
+            self.operations = {}
+        return snapshot
+
+
+def measure(arg):
+    """Gets the payload size of a command argument in bytes."""
+    if isinstance(arg, bytes):
+        return len(arg)
+    elif isinstance(arg, _string_type):
+        return len(arg.encode('utf-8'))
+    return len(str(arg))
+
+
+def find_caller(frame):
+    """Finds the outermost Sider operation which called the ``frame``,
+    and the call site of the operation.  Frames of redis-py between
+    operations are skipped.  Methods inherited from :mod:`collections`
+    ABCs e.g. :meth:`List.index() <collections.Sequence.index>` are
+    also treated as Sider operations.
+
+    :param frame: the innermost frame to find from
+    :returns: a pair of the qualified name of the operation and
+              the ``'filename:lineno'`` string of the call site.
+              both can be ``None``
+    :rtype: :class:`tuple`
+
+    """
+    caller = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        name = frame.f_code.co_name
+        if module.startswith('sider.'):
+            if module != __name__ and (module, name) not in WRAPPER_FRAMES:
+                try:
+                    cls = type(frame.f_locals['self'])
+                except KeyError:
+                    caller = module + '.' + name
+                else:
+                    caller = '.'.join((cls.__module__, cls.__name__, name))
+        elif module in MIXIN_MODULES:
+            cls = type(frame.f_locals.get('self'))
+            if cls.__module__.startswith('sider.'):
+                caller = '.'.join((cls.__module__, cls.__name__, name))
+        elif not module.startswith('redis'):
+            site = '{0}:{1}'.format(frame.f_code.co_filename, frame.f_lineno)
+            return caller, site
+        frame = frame.f_back
+    return caller, None
+
+
+def instrument_client(client, instruments):
+    """Makes a copy of the Redis ``client`` which reports every command
+    sent through it and pipelines made from it to the ``instruments``.
+
+    :param client: the Redis client to instrument
+    :type client: :class:`redis.client.StrictRedis`
+    :param instruments: the list of :class:`Instrument` objects.
+                        it can be changed later, and commands aren't
+                        recorded at all while it's empty
+    :type instruments: :class:`list`
+    :returns: the instrumented copy of the ``client``
+    :rtype: :class:`redis.client.StrictRedis`
+
+    """
+    def record(commands, latency):
+        for instrument in instruments:
+            instrument.record(commands, latency)
+    record.instruments = instruments
+    instrumented = copy.copy(client)
+    instrumented.execute_command = _instrument_execute(client.execute_command,
+                                                       record)
+    instrumented.pipeline = _instrument_pipeline(client.pipeline, record)
+    return instrumented
+
+
+def _instrument_execute(execute_command, record):
+    instruments = record.instruments
+    def instrumented(*args, **options):
+        if not instruments:
+            return execute_command(*args, **options)
+        command = Command.from_args(args)
+        started_at = default_timer()
+        try:
+            return execute_command(*args, **options)
+        finally:
+            record([command], default_timer() - started_at)
+    return instrumented
+
+
+def _instrument_pipeline(make_pipeline, record):
+    instruments = record.instruments
+    def instrumented(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        queued = []
+        queue_command = pipe.pipeline_execute_command
+        execute = pipe.execute
+        reset = pipe.reset
+        def pipeline_execute_command(*args, **options):
+            if instruments:
+                queued.append(Command.from_args(args))
+            return queue_command(*args, **options)
+        def instrumented_execute(*args, **kwargs):
+            commands = queued[:]
+            del queued[:]
+            if not commands:
+                return execute(*args, **kwargs)
+            if pipe.transaction or pipe.explicit_transaction:
+                first = commands[0]
+                commands.insert(0, Command('MULTI', None, 5,
+                                           first.caller, first.site))
+                commands.append(Command('EXEC', None, 4,
+                                        first.caller, first.site))
+            started_at = default_timer()
+            try:
+                return execute(*args, **kwargs)
+            finally:
+                record(commands, default_timer() - started_at)
+        def instrumented_reset():
+            del queued[:]
+            reset()
+        pipe.immediate_execute_command = _instrument_execute(
+            pipe.immediate_execute_command, record
+        )
+        pipe.pipeline_execute_command = pipeline_execute_command
+        pipe.execute = instrumented_execute
+        pipe.reset = instrumented_reset
+        pipe.pipeline = instrumented
+        pipe.sider_record = record
+        return pipe
+    return instrumented
@@ -35,12 +35,33 @@ class DeferredModule(types.ModuleType):
 #: (:class:`DeferredModule`) Alias of :mod:`sider.session`.
 session = DeferredModule('sider.session')
 
+#: (:class:`DeferredModule`) Alias of :mod:`sider.cache`.
+cache = DeferredModule('sider.cache')
+
+#: (:class:`DeferredModule`) Alias of :mod:`sider.autopipeline`.
+autopipeline = DeferredModule('sider.autopipeline')
+
+#: (:class:`DeferredModule`) Alias of :mod:`sider.groupcommit`.
+groupcommit = DeferredModule('sider.groupcommit')
+
+#: (:class:`DeferredModule`) Alias of :mod:`sider.replica`.
+replica = DeferredModule('sider.replica')
+
+#: (:class:`DeferredModule`) Alias of :mod:`sider.instrumentation`.
+instrumentation = DeferredModule('sider.instrumentation')
+
+#: (:class:`DeferredModule`) Alias of :mod:`sider.profiler`.
+profiler = DeferredModule('sider.profiler')
+
 #: (:class:`DeferredModule`) Alias of :mod:`sider.types`.
 types = DeferredModule('sider.types')
 
 #: (:class:`DeferredModule`) Alias of :mod:`sider.transaction`.
 transaction = DeferredModule('sider.transaction')
 
+#: (:class:`DeferredModule`) Alias of :mod:`sider.script`.
+script = DeferredModule('sider.script')
+
 #: (:class:`DeferredModule`) Alias of :mod:`sider.hash`.
 hash = DeferredModule('sider.hash')
 
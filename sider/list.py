@@ -17,9 +17,51 @@ from .types import Bulk, String
 from .session import Session
 from .transaction import manipulative, query
 from .warnings import PerformanceWarning
+from .script import Script
 from . import utils
 
 
+#: (:class:`~sider.script.Script`) Inserts ``ARGV[2]`` before the index
+#: ``ARGV[1]`` the same way to :meth:`list.insert()`.
+INSERT_SCRIPT = Script('''
+local size = redis.call('LLEN', KEYS[1])
+local index = tonumber(ARGV[1])
+if index < 0 then
+    index = math.max(index + size, 0)
+elseif index > size then
+    index = size
+end
+if index == 0 then
+    return redis.call('LPUSH', KEYS[1], ARGV[2])
+elseif index == size then
+    return redis.call('RPUSH', KEYS[1], ARGV[2])
+end
+local tail = redis.call('LRANGE', KEYS[1], index, -1)
+redis.call('LTRIM', KEYS[1], 0, index - 1)
+redis.call('RPUSH', KEYS[1], ARGV[2])
+for i = 1, #tail, 100 do
+    redis.call('RPUSH', KEYS[1], unpack(tail, i, math.min(i + 99, #tail)))
+end
+return size + 1
+''', 'sider.list.INSERT_SCRIPT')
+
+#: (:class:`~sider.script.Script`) Removes and returns the element at
+#: the index ``ARGV[1]``.  It returns nothing if the index is out of range.
+POP_SCRIPT = Script('''
+local index = tonumber(ARGV[1])
+local popped = redis.call('LINDEX', KEYS[1], index)
+if not popped then
+    return false
+end
+local tail = redis.call('LRANGE', KEYS[1], index + 1, -1)
+redis.call('LTRIM', KEYS[1], 0, index - 1)
+for i = 1, #tail, 100 do
+    redis.call('RPUSH', KEYS[1], unpack(tail, i, math.min(i + 99, #tail)))
+end
+return popped
+''', 'sider.list.POP_SCRIPT')
+
+
 class List(collections.MutableSequence):
     """The Python-side representaion of Redis list value.  It behaves
     alike built-in Python :class:`list` object.  More exactly, it
@@ -75,12 +117,12 @@ class List(collections.MutableSequence):
         i = 0
         step = 100  # FIXME: it is an arbitarary magic number.
         chunk = None
-        decode = self.value_type.decode
+        decode_many = self.value_type.decode_many
         self.session.mark_query([self.key])
         while chunk is None or len(chunk) >= step:
             chunk = self.session.client.lrange(self.key, i, i + step - 1)
-            for val in chunk:
-                yield decode(val)
+            for val in decode_many(chunk):
+                yield val
             i += step
 
     @query
@@ -118,21 +160,21 @@ class List(collections.MutableSequence):
            :redis:`LRANGE` for slices.
 
         """
-        decode = self.value_type.decode
         if isinstance(index, numbers.Integral):
             self.session.mark_query([self.key])
             result = self.session.client.lindex(self.key, index)
             if result is None:
                 raise IndexError(index)
-            return decode(result)
+            return self.value_type.decode(result)
         elif isinstance(index, slice):
-            start = 0 if index.start is None else index.start
-            stop = (0 if index.stop is None else index.stop) - 1
             self.session.mark_query([self.key])
-            result = self.session.client.lrange(self.key, start, stop)
+            bounds = utils.lrange_bounds(index)
+            if bounds is None:
+                return []
+            result = self.session.client.lrange(self.key, *bounds)
             if index.step is not None:
                 result = result[::index.step]
-            return list(map(decode, result))
+            return self.value_type.decode_many(result)
         raise TypeError('indices must be integers, not ' + repr(index))
 
     def __setitem__(self, index, value):
@@ -140,6 +182,7 @@ class List(collections.MutableSequence):
         if isinstance(index, numbers.Integral):
             value = encode(value)
             if self.session.current_transaction is None:
+                self.session.mark_manipulative([self.key])
                 try:
                     self.session.client.lset(self.key, index, value)
                 except ResponseError:
@@ -157,7 +200,7 @@ class List(collections.MutableSequence):
                 raise ValueError('slice with step is not supported for '
                                  'assignment')
             elif index.start in (0, None) and index.stop == 1:
-                seq = list(map(encode, value))
+                seq = self.value_type.encode_many(value)
                 seq.reverse()
                 self.session.mark_manipulative([self.key])
                 if self.session.server_version_info < (2, 4, 0):
@@ -182,7 +225,7 @@ class List(collections.MutableSequence):
                     pipe = self.session.client
                     self.session.mark_query()
                     list_ = pipe.lrange(self.key, 0, -1)
-                    list_[index] = map(encode, value)
+                    list_[index] = self.value_type.encode_many(value)
                     self.session.mark_manipulative()
                     pipe.delete(self.key)
                     self._raw_extend(list_, pipe, encoded=True)
@@ -235,7 +278,7 @@ class List(collections.MutableSequence):
 
         """
         data = self.value_type.encode(value)
-        self.session.client.rpush(self.key, data)
+        self.session.deferred_client.rpush(self.key, data)
 
     def extend(self, iterable):
         """Extends the list with the ``iterable``.
@@ -271,7 +314,7 @@ class List(collections.MutableSequence):
                     pipe.rpush(self.key, encode(val))
         else:
             if not encoded:
-                iterable = (encode(v) for v in iterable)
+                iterable = self.value_type.encode_many(iterable)
             n = 100  # FIXME: it is an arbitarary magic number.
             for chunk in utils.chunk(iterable, n):
                 pipe.rpush(self.key, *chunk)
@@ -295,6 +338,9 @@ class List(collections.MutableSequence):
            it in offline, and then :redis:`DEL` the key so that empty
            the whole list, and then :redis:`RPUSH` the whole result again.
            Moreover all the commands execute in a transaction.
+           Outside of transactions it's done by a Lua script
+           (:data:`INSERT_SCRIPT`) instead, but it still takes time
+           proportional to the length of the list.
 
            So you should not treat this method as the same method of
            Python built-in :class:`list` object.  It is just for being
@@ -317,6 +363,11 @@ class List(collections.MutableSequence):
                 'not 0 nor -1'.format(cls.__module__, cls.__name__),
                 category=PerformanceWarning, stacklevel=2
             )
+            if self.session.prefers_script(self.key):
+                self.session.mark_manipulative([self.key])
+                self.session.run_script(INSERT_SCRIPT, [self.key],
+                                        [index, data])
+                return
             def block(trial, transaction):
                 pipe = self.session.client
                 self.session.mark_query()
@@ -359,6 +410,9 @@ class List(collections.MutableSequence):
              popped index.  Because multiple operands for :redis:`RPUSH`
              was supported since Redis 2.4.0.)
 
+           Outside of transactions it's done by a Lua script
+           (:data:`POP_SCRIPT`) instead.
+
            So you should not treat this method as the same method of
            Python built-in :class:`list` object.  It is just for being
            compatible to :class:`collections.MutableSequence` protocol.
@@ -372,6 +426,7 @@ class List(collections.MutableSequence):
             raise TypeError('index must be an integer, not ' + repr(index))
         elif index == 0:
             if self.session.current_transaction is None:
+                self.session.mark_manipulative([self.key])
                 popped = client.lpop(self.key)
             else:
                 self.session.mark_query([self.key])
@@ -380,6 +435,7 @@ class List(collections.MutableSequence):
                 client.ltrim(self.key, 1, -1)
         elif index == -1:
             if self.session.current_transaction is None:
+                self.session.mark_manipulative([self.key])
                 popped = client.rpop(self.key)
             else:
                 self.session.mark_query([self.key])
@@ -393,6 +449,13 @@ class List(collections.MutableSequence):
                 'is not 0 nor -1'.format(cls.__module__, cls.__name__),
                 category=PerformanceWarning, stacklevel=_stacklevel + 1
             )
+            if self.session.prefers_script(self.key):
+                self.session.mark_manipulative([self.key])
+                popped = self.session.run_script(POP_SCRIPT, [self.key],
+                                                 [index])
+                if popped is None:
+                    raise IndexError(index)
+                return self.value_type.decode(popped)
             result = [None]
             def block(trial, transaction):
                 pipe = self.session.client
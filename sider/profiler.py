@@ -0,0 +1,203 @@
+""":mod:`sider.profiler` --- Round trip profiler
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Every round trip to Redis takes a network latency, so code which sends
+a command for each element, e.g. looking up fields of a hash one by one
+in a loop, easily gets slow as data grows.  :meth:`Session.profile()
+<sider.session.Session.profile>` counts round trips each Sider operation
+made inside the block, and finds such N+1 patterns::
+
+    with session.profile() as profile:
+        for field in fields:
+            values.append(hash_[field])
+    print(profile.report())
+
+It prints like:
+
+.. code-block:: text
+
+   12 round trips, 12 commands
+   sider.hash.Hash.__getitem__: 12 round trips
+   N+1 pattern: sider.hash.Hash.__getitem__ sent HGET in 12 round trips
+     at app.py:3
+     use Hash.items() to get all fields at once (HGETALL)
+
+It's useful to assert round trip budgets in tests as well::
+
+    with session.profile() as profile:
+        render_page(session)
+    assert not profile.findings, profile.report()
+
+"""
+from __future__ import absolute_import
+import collections
+import threading
+from .instrumentation import Instrument
+
+
+#: (:class:`dict`) The mapping of ``(caller, command)`` pairs to bulk
+#: alternatives suggested by :class:`Profile`.
+SUGGESTIONS = {
+    ('sider.session.Session.get', 'GET'):
+        'use Session.get_many() to load values at once (MGET)',
+    ('sider.session.Session.set', 'SET'):
+        'use Session.set_many() to store values at once (MSET)',
+    ('sider.hash.Hash.__getitem__', 'HGET'):
+        'use Hash.items() to get all fields at once (HGETALL)',
+    ('sider.hash.Hash.__contains__', 'HEXISTS'):
+        'use Hash.keys() to get all keys at once (HKEYS)',
+    ('sider.hash.Hash.__setitem__', 'HSET'):
+        'use Hash.update() to set fields at once (HMSET)',
+    ('sider.list.List.__getitem__', 'LINDEX'):
+        'use slicing e.g. list_[start:stop] to get elements at once '
+        '(LRANGE)',
+    ('sider.list.List.index', 'LINDEX'):
+        'load elements once e.g. list(list_).index(value) (LRANGE)',
+    ('sider.list.List.__reversed__', 'LINDEX'):
+        'load elements once e.g. reversed(list_[:]) (LRANGE)',
+    ('sider.list.List.append', 'RPUSH'):
+        'use List.extend() to append elements at once',
+    ('sider.set.Set.__contains__', 'SISMEMBER'):
+        'load members once e.g. set(set_) (SMEMBERS)',
+    ('sider.set.Set.add', 'SADD'):
+        'use Set.update() to add elements at once',
+    ('sider.set.Set.discard', 'SREM'):
+        'use Set.difference_update() to remove elements at once',
+    ('sider.sortedset.SortedSet.__getitem__', 'ZSCORE'):
+        'use SortedSet.items() to get all scores at once (ZRANGE)',
+    ('sider.sortedset.SortedSet.__contains__', 'ZSCORE'):
+        'use SortedSet.items() to get all members at once (ZRANGE)',
+    ('sider.sortedset.SortedSet.add', 'ZINCRBY'):
+        'use SortedSet.update() to add members at once',
+}
+
+#: (:class:`str`) The suggestion for N+1 patterns not in
+#: :data:`SUGGESTIONS`.
+DEFAULT_SUGGESTION = ('send the commands through a pipeline or '
+                      'sider.autopipeline.AutoPipeline')
+
+
+class Finding(collections.namedtuple('Finding', 'caller command site '
+                                                'round_trips suggestion')):
+    """The N+1 pattern found by :class:`Profile`.
+
+    .. attribute:: caller
+
+       (:class:`str`) The operation which sent the command e.g.
+       ``'sider.hash.Hash.__getitem__'``.
+
+    .. attribute:: command
+
+       (:class:`str`) The command name e.g. ``'HGET'``.
+
+    .. attribute:: site
+
+       (:class:`str`) The ``'filename:lineno'`` string of the code which
+       called the operation.
+
+    .. attribute:: round_trips
+
+       (:class:`numbers.Integral`) The number of round trips made by
+       the same operation and command at the same call site.
+
+    .. attribute:: suggestion
+
+       (:class:`str`) The proposed bulk alternative.
+
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return ('N+1 pattern: {0} sent {1} in {2} round trips\n'
+                '  at {3}\n  {4}').format(self.caller, self.command,
+                                          self.round_trips, self.site,
+                                          self.suggestion)
+
+
+class Profile(Instrument):
+    """The instrument which counts round trips of each operation made
+    in a thread.  :meth:`Session.profile()
+    <sider.session.Session.profile>` makes it.
+
+    :param threshold: the number of round trips of the same command by
+                      the same operation at the same call site to be
+                      regarded as an N+1 pattern.  default is 10
+    :type threshold: :class:`numbers.Integral`
+
+    """
+
+    #: (:class:`numbers.Integral`) The number of round trips to be
+    #: regarded as an N+1 pattern.
+    threshold = None
+
+    #: (:class:`numbers.Integral`) The total number of round trips.
+    round_trips = None
+
+    #: (:class:`numbers.Integral`) The total number of commands.
+    commands = None
+
+    #: (:class:`dict`) The number of round trips each operation made.
+    operations = None
+
+    def __init__(self, threshold=10):
+        if threshold < 2:
+            raise ValueError('threshold must be greater than 1, not ' +
+                             repr(threshold))
+        self.threshold = threshold
+        self.thread = threading.current_thread()
+        self.round_trips = 0
+        self.commands = 0
+        self.operations = {}
+        self.singles = {}
+
+    def record(self, commands, latency):
+        if threading.current_thread() is not self.thread:
+            return
+        self.round_trips += 1
+        self.commands += len(commands)
+        operations = self.operations
+        for caller in set(command.caller for command in commands):
+            operations[caller] = operations.get(caller, 0) + 1
+        if len(commands) == 1:
+            command = commands[0]
+            single = command.caller, command.name, command.site
+            self.singles[single] = self.singles.get(single, 0) + 1
+
+    @property
+    def findings(self):
+        """(:class:`list`) :class:`Finding` objects of N+1 patterns,
+        the most frequent first.
+
+        """
+        findings = [
+            Finding(caller, name, site, count,
+                    SUGGESTIONS.get((caller, name), DEFAULT_SUGGESTION))
+            for (caller, name, site), count in _most_common(self.singles)
+            if count >= self.threshold
+        ]
+        return findings
+
+    def report(self):
+        """Makes the human-readable report.
+
+        :returns: the report text
+        :rtype: :class:`str`
+
+        """
+        lines = ['{0} round trips, {1} commands'.format(self.round_trips,
+                                                        self.commands)]
+        for caller, count in _most_common(self.operations):
+            lines.append('{0}: {1} round trips'.format(caller, count))
+        lines.extend(str(finding) for finding in self.findings)
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        cls = type(self)
+        return '<{0}.{1} {2} round trips>'.format(cls.__module__,
+                                                  cls.__name__,
+                                                  self.round_trips)
+
+
+def _most_common(counts):
+    return sorted(counts.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,248 @@
+""":mod:`sider.replica` --- Routing reads to replicas
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Every operation of Sider objects is marked :func:`~sider.transaction.query`
+or :func:`~sider.transaction.manipulative` or both.  If a session has
+a :class:`ReplicaRouter`, commands sent by query operations outside of
+transactions are routed to one of the replica servers::
+
+    from sider.replica import ReplicaRouter
+    session = Session(primary_client,
+                      replicas=ReplicaRouter([replica_client1,
+                                              replica_client2]))
+    hash_ = session.get('my_hash', Hash)
+    hash_['a']        # [query] read from one of replicas
+    hash_['a'] = 'b'  # [manipulative] written to the primary
+
+Everything else, i.e. manipulative operations, transactions and
+operations not marked as query, are sent to the primary.
+
+Replicas are asynchronously replicated, so they could return stale
+results for a while after writes.  To read your own writes, set
+``pin`` window: reads of a thread (or greenlet) are routed to
+the primary for the seconds after it writes anything::
+
+    router = ReplicaRouter(replicas, pin=1.0)
+
+Replicas are checked by :redis:`PING` every ``interval`` seconds in
+a background thread.  Replicas which haven't replied are skipped, and
+reads are routed to the primary while no replicas are available.
+Stop the thread by :meth:`ReplicaRouter.close()` when the router is
+no more used.
+
+"""
+from __future__ import absolute_import
+import numbers
+import socket
+import threading
+import time
+from timeit import default_timer
+from redis.client import StrictRedis
+from redis.exceptions import ConnectionError, TimeoutError, ResponseError
+from .threadlocal import LocalDict
+
+
+class ReplicaRouter(object):
+    """Selects a replica client for each query.  It's thread-safe.
+
+    :param replicas: clients connected to replica servers
+    :type replicas: :class:`collections.Iterable`
+    :param selection: how to select a replica.
+                      ``'round_robin'`` (default) selects available
+                      replicas in turn, and ``'latency'`` selects
+                      the replica of the least round trip time
+    :type selection: :class:`str`
+    :param pin: seconds to route reads of a thread to the primary
+                after it writes.  default is 0 which means reads are
+                always routed to replicas
+    :type pin: :class:`numbers.Real`
+    :param interval: seconds between :redis:`PING` measurements.
+                     default is 1
+    :type interval: :class:`numbers.Real`
+    :param timeout: seconds to wait for each :redis:`PING` reply.
+                    replicas which don't reply in time are treated as
+                    unavailable.  default is 0.5
+    :type timeout: :class:`numbers.Real`
+
+    """
+
+    #: (:class:`tuple`) The possible values of :attr:`selection`.
+    SELECTIONS = 'round_robin', 'latency'
+
+    #: (:class:`tuple`) Clients connected to replica servers.
+    replicas = None
+
+    #: (:class:`str`) How to select a replica.  One of :attr:`SELECTIONS`.
+    selection = None
+
+    #: (:class:`numbers.Real`) Seconds to route reads of a thread to
+    #: the primary after it writes.
+    pin = None
+
+    #: (:class:`numbers.Real`) Seconds between latency measurements.
+    interval = None
+
+    #: (:class:`numbers.Real`) Seconds to wait for each :redis:`PING`.
+    timeout = None
+
+    #: (:class:`list`) The last measured round trip time of each replica
+    #: in seconds.  Unreachable replicas have ``float('inf')``.
+    latencies = None
+
+    def __init__(self, replicas, selection='round_robin', pin=0, interval=1,
+                 timeout=0.5):
+        replicas = tuple(replicas)
+        if not replicas:
+            raise ValueError('replicas must not be empty')
+        for replica in replicas:
+            if not isinstance(replica, StrictRedis):
+                raise TypeError('replicas must be redis.client.StrictRedis '
+                                'objects, not ' + repr(replica))
+        if selection not in self.SELECTIONS:
+            raise ValueError('selection must be one of {0!r}, not '
+                             '{1!r}'.format(self.SELECTIONS, selection))
+        elif not isinstance(pin, numbers.Real):
+            raise TypeError('pin must be a number, not ' + repr(pin))
+        self.replicas = replicas
+        self.selection = selection
+        self.pin = pin
+        self.interval = interval
+        self.timeout = timeout
+        self.latencies = [0] * len(replicas)
+        self.connections = [None] * len(replicas)
+        self.turn = 0
+        self.writes = LocalDict(written_at=None)
+        self.lock = threading.Lock()
+        self.measured = threading.Event()
+        self.closed = threading.Event()
+        self.monitor = None
+
+    @property
+    def written_at(self):
+        """(:class:`numbers.Real`) The time when the current
+        thread/greenlet has written last in the :attr:`pin` window.
+        It's ``None`` if it hasn't written.
+
+        """
+        return self.writes['written_at']
+
+    @written_at.setter
+    def written_at(self, written_at):
+        self.writes['written_at'] = written_at
+
+    @property
+    def pinned(self):
+        """(:class:`bool`) Whether reads of the current thread/greenlet
+        are pinned to the primary because it has written in the :attr:`pin`
+        window.
+
+        """
+        if not self.pin:
+            return False
+        written_at = self.written_at
+        if written_at is not None and time.time() - written_at < self.pin:
+            return True
+        self.writes.release()
+        return False
+
+    def wrote(self):
+        """Notifies the current thread/greenlet has written.
+        :class:`~sider.session.Session` calls this method.
+
+        """
+        if self.pin:
+            self.written_at = time.time()
+
+    def select(self):
+        """Selects a replica client to send a query.
+
+        :returns: a replica client, or ``None`` if reads should be
+                  routed to the primary
+        :rtype: :class:`redis.client.StrictRedis`
+
+        """
+        if self.pinned:
+            return None
+        if not self.measured.is_set():
+            self.start()
+        latencies = self.latencies
+        if self.selection == 'latency':
+            index = min(range(len(latencies)), key=latencies.__getitem__)
+            if latencies[index] == float('inf'):
+                return None
+            return self.replicas[index]
+        size = len(self.replicas)
+        with self.lock:
+            for _ in range(size):
+                index = self.turn
+                self.turn = (index + 1) % size
+                if latencies[index] != float('inf'):
+                    return self.replicas[index]
+        return None
+
+    def start(self):
+        """Starts the background thread which measures :attr:`latencies`
+        every :attr:`interval` seconds, and waits for the first
+        measurement.  :meth:`select()` calls this method until
+        the first measurement is done.
+
+        """
+        with self.lock:
+            if self.closed.is_set():
+                return
+            elif self.monitor is None:
+                self.monitor = threading.Thread(
+                    target=self.run_monitor,
+                    name='sider.replica.ReplicaRouter.monitor'
+                )
+                self.monitor.daemon = True
+                self.monitor.start()
+        self.measured.wait(self.timeout * len(self.replicas) + 1)
+
+    def close(self):
+        """Stops the background thread of measurements."""
+        self.closed.set()
+        monitor = self.monitor
+        if monitor is not None and monitor is not threading.current_thread():
+            monitor.join()
+
+    def run_monitor(self):
+        while not self.closed.is_set():
+            self.measure()
+            self.measured.set()
+            self.closed.wait(self.interval)
+        for connection in self.connections:
+            if connection is not None:
+                connection.disconnect()
+
+    def measure(self):
+        """Measures round trip time of each replica by sending
+        :redis:`PING` through a dedicated connection of which
+        socket timeout is :attr:`timeout`.  The results are stored into
+        :attr:`latencies`.
+
+        """
+        latencies = []
+        for i, replica in enumerate(self.replicas):
+            connection = self.connections[i]
+            if connection is None:
+                connection = replica.connection_pool.make_connection()
+                connection.socket_timeout = self.timeout
+                connection.socket_connect_timeout = self.timeout
+                self.connections[i] = connection
+            started_at = default_timer()
+            try:
+                connection.send_command('PING')
+                connection.read_response()
+            except (ConnectionError, TimeoutError, ResponseError,
+                    socket.error):
+                connection.disconnect()
+                latencies.append(float('inf'))
+            else:
+                latencies.append(default_timer() - started_at)
+        self.latencies = latencies
+
+    def __repr__(self):
+        cls = type(self)
+        return '<{0}.{1} {2} {3}>'.format(cls.__module__, cls.__name__,
+                                          self.selection, len(self.replicas))
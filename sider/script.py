@@ -0,0 +1,235 @@
+""":mod:`sider.script` --- Server-side Lua scripts
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Several operations e.g. :meth:`SortedSet.discard()
+<sider.sortedset.SortedSet.discard>` read a value and then write
+something depending on it.  In transactions they are done by
+:redis:`WATCH`/:redis:`MULTI`, so they are retried whenever other
+clients touch the same key meanwhile.  Outside of transactions
+they are done by a Lua script instead, which runs atomically on
+the server in a round trip and never conflicts.
+
+Scripts are loaded once by :redis:`SCRIPT LOAD` and then called by
+:redis:`EVALSHA`.  If the server has lost scripts e.g. by restart or
+:redis:`SCRIPT FLUSH`, they are loaded again::
+
+    from sider.script import Script
+
+    script = Script('return redis.call("GET", KEYS[1])')
+    value = session.run_script(script, ['key'])
+
+Scripting requires Redis 2.6 or higher.  Operations fall back to
+transactions on older servers, or if the session is made with
+``scripting=False``.  See also :attr:`Session.scripts
+<sider.session.Session.scripts>`.
+
+If the session is made with an :class:`AdaptiveScripting` policy
+instead, operations are done by transactions by default, and switch
+to scripts only on keys which conflict often::
+
+    session = Session(client, scripting=AdaptiveScripting(threshold=0.2,
+                                                          cooldown=10))
+
+"""
+from __future__ import absolute_import
+import hashlib
+import threading
+import time
+from redis.exceptions import NoScriptError
+
+
+class Script(object):
+    """The Lua script to run on the server.
+
+    :param source: the Lua source code
+    :type source: :class:`str`
+    :param name: the optional name to show in :func:`repr()`
+    :type name: :class:`str`
+
+    """
+
+    #: (:class:`str`) The Lua source code.
+    source = None
+
+    #: (:class:`str`) The hex digest of SHA1 of the :attr:`source`,
+    #: which :redis:`EVALSHA` takes.
+    sha = None
+
+    #: (:class:`str`) The name of the script.  It could be ``None``.
+    name = None
+
+    def __init__(self, source, name=None):
+        self.source = source
+        if not isinstance(source, bytes):
+            source = source.encode('utf-8')
+        self.sha = hashlib.sha1(source).hexdigest()
+        self.name = name
+
+    def __repr__(self):
+        cls = type(self)
+        return '<{0}.{1} {2}>'.format(cls.__module__, cls.__name__,
+                                      self.name or self.sha)
+
+
+class ScriptRegistry(object):
+    """The registry of scripts loaded to a server.  It remembers
+    which scripts have been loaded, so that each script is loaded
+    only once.
+
+    """
+
+    #: (:class:`set`) The SHA1 digests of loaded scripts.
+    loaded = None
+
+    def __init__(self):
+        self.loaded = set()
+
+    def load(self, client, script):
+        """Loads the ``script`` to the server by :redis:`SCRIPT LOAD`.
+
+        :param client: the Redis client
+        :type client: :class:`redis.client.StrictRedis`
+        :param script: the script to load
+        :type script: :class:`Script`
+
+        """
+        client.script_load(script.source)
+        self.loaded.add(script.sha)
+
+    def __call__(self, client, script, keys=(), args=()):
+        """Runs the ``script`` by :redis:`EVALSHA`.  If it hasn't been
+        loaded yet or the server answers ``NOSCRIPT``, it's loaded
+        first.
+
+        :param client: the Redis client
+        :type client: :class:`redis.client.StrictRedis`
+        :param script: the script to run
+        :type script: :class:`Script`
+        :param keys: keys the script deals with, which become
+                     ``KEYS`` in the script
+        :type keys: :class:`collections.Sequence`
+        :param args: arguments which become ``ARGV`` in the script
+        :type args: :class:`collections.Sequence`
+        :returns: the result of the script
+
+        """
+        keys = tuple(keys)
+        arguments = keys + tuple(args)
+        if script.sha not in self.loaded:
+            self.load(client, script)
+        try:
+            return client.evalsha(script.sha, len(keys), *arguments)
+        except NoScriptError:
+            self.loaded.discard(script.sha)
+            self.load(client, script)
+            return client.evalsha(script.sha, len(keys), *arguments)
+
+
+class AdaptiveScripting(object):
+    """The policy which decides for each key whether to do operations
+    by Lua scripts or by :redis:`WATCH`/:redis:`MULTI` transactions.
+
+    It tracks the moving average of the ratio of attempts which have
+    met conflicts for each key.  When it passes the ``threshold``,
+    the key becomes hot and operations on it are done by scripts for
+    ``cooldown`` seconds.  Then they're done by transactions again,
+    and if the key still conflicts it becomes hot again.
+
+    :param threshold: the ratio (0--1) of conflicted attempts which
+                      makes a key hot.  default is 0.2
+    :type threshold: :class:`numbers.Real`
+    :param cooldown: seconds to keep using scripts on a hot key.
+                     default is 10
+    :type cooldown: :class:`numbers.Real`
+    :param weight: the weight (0--1) of the latest attempt in
+                   the moving average.  default is 0.1
+    :type weight: :class:`numbers.Real`
+
+    """
+
+    #: (:class:`numbers.Real`) The ratio of conflicted attempts which
+    #: makes a key hot.
+    threshold = None
+
+    #: (:class:`numbers.Real`) Seconds to keep using scripts on a hot key.
+    cooldown = None
+
+    #: (:class:`numbers.Real`) The weight of the latest attempt in
+    #: the moving average.
+    weight = None
+
+    #: (:class:`dict`) The moving averages of conflict ratios of keys
+    #: which have met conflicts recently.
+    ratios = None
+
+    #: (:class:`dict`) Hot keys and times (:func:`time.time()`) until
+    #: which operations on them are done by scripts.
+    hot_keys = None
+
+    def __init__(self, threshold=0.2, cooldown=10, weight=0.1):
+        if not 0 < threshold <= 1:
+            raise ValueError('threshold must be greater than 0 and at most '
+                             '1, not ' + repr(threshold))
+        elif cooldown < 0:
+            raise ValueError('cooldown must not be negative, not ' +
+                             repr(cooldown))
+        elif not 0 < weight <= 1:
+            raise ValueError('weight must be greater than 0 and at most 1, '
+                             'not ' + repr(weight))
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.weight = weight
+        self.ratios = {}
+        self.hot_keys = {}
+        self.lock = threading.Lock()
+
+    def is_hot(self, key):
+        """Whether operations on the ``key`` have to be done by scripts
+        right now.
+
+        :param key: the Redis key
+        :type key: :class:`str`
+        :rtype: :class:`bool`
+
+        """
+        until = self.hot_keys.get(key)
+        if until is None:
+            return False
+        elif until > time.time():
+            return True
+        with self.lock:
+            if self.hot_keys.get(key) == until:
+                del self.hot_keys[key]
+        return False
+
+    def record(self, keys, conflicted):
+        """Records an attempt of a transaction on the ``keys``.
+        :class:`~sider.transaction.Transaction` calls this method.
+
+        :param keys: the keys the attempt has watched
+        :type keys: :class:`collections.Iterable`
+        :param conflicted: whether the attempt has met conflicts
+        :type conflicted: :class:`bool`
+
+        """
+        ratios = self.ratios
+        weight = self.weight
+        with self.lock:
+            if conflicted:
+                for key in keys:
+                    ratio = ratios.get(key, 0) * (1 - weight) + weight
+                    if ratio >= self.threshold:
+                        self.hot_keys[key] = time.time() + self.cooldown
+                        ratios.pop(key, None)
+                    else:
+                        ratios[key] = ratio
+            elif ratios:
+                for key in keys:
+                    try:
+                        ratio = ratios[key] * (1 - weight)
+                    except KeyError:
+                        continue
+                    if ratio < 0.01:
+                        del ratios[key]
+                    else:
+                        ratios[key] = ratio
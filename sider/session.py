@@ -8,11 +8,18 @@ __ http://martinfowler.com/eaaCatalog/unitOfWork.html
 
 """
 from __future__ import absolute_import
+import collections
+import contextlib
 import warnings
-from redis.client import StrictRedis, Redis, BasePipeline
+import weakref
+from redis.client import StrictRedis, Redis
 from .threadlocal import LocalDict
-from .types import Value, ByteString
-from .transaction import Transaction
+from .cache import invalidating_client
+from .types import Value, Bulk, ByteString
+from .instrumentation import Stats, instrument_client
+from .profiler import Profile
+from .script import ScriptRegistry, AdaptiveScripting
+from .transaction import Transaction, Atomic, RetryPolicy, ConflictStats
 from .exceptions import CommitError
 
 
@@ -23,6 +30,49 @@ class Session(object):
 
     :param client: the Redis client
     :type client: :class:`redis.client.StrictRedis`
+    :param cache: an optional client-side cache of query results.
+                  see also :mod:`sider.cache` module
+    :type cache: :class:`sider.cache.Cache`
+    :param autopipeline: an optional pipeline to queue fire-and-forget
+                         commands into.  see also :mod:`sider.autopipeline`
+                         module
+    :type autopipeline: :class:`sider.autopipeline.AutoPipeline`
+    :param replicas: an optional router to send query operations to
+                     replica servers.  see also :mod:`sider.replica`
+                     module
+    :type replicas: :class:`sider.replica.ReplicaRouter`
+    :param instruments: :class:`~sider.instrumentation.Instrument` objects
+                        to report every command to.  see also
+                        :mod:`sider.instrumentation` module
+    :type instruments: :class:`collections.Iterable`
+    :param stats: whether to aggregate numbers of commands.
+                  if ``True`` a :class:`~sider.instrumentation.Stats`
+                  instrument is added.  see also :attr:`stats`.
+                  default is ``False``
+    :type stats: :class:`bool`
+    :param scripting: whether to run read-modify-write operations
+                      outside of transactions by Lua scripts instead of
+                      :redis:`WATCH`/:redis:`MULTI`.  if it's
+                      an :class:`~sider.script.AdaptiveScripting` policy
+                      scripts are used only on keys which conflict often.
+                      see also :mod:`sider.script` module.
+                      default is ``True``
+    :type scripting: :class:`bool`,
+                     :class:`~sider.script.AdaptiveScripting`
+    :param retry_policy: the policy of retrying transactions which have
+                         met conflicts.  it retries immediately and
+                         endlessly by default.  see also
+                         :attr:`retry_policy`
+    :type retry_policy: :class:`~sider.transaction.RetryPolicy`
+    :param locks: the in-process lock table which serializes concurrent
+                  transactions on the same keys before they reach Redis.
+                  see also :attr:`locks`
+    :type locks: :class:`~sider.transaction.KeyLocks`
+    :param group_commit: an optional executor which merges
+                         :meth:`atomic()` batches of many threads into
+                         a round trip.  see also :mod:`sider.groupcommit`
+                         module
+    :type group_commit: :class:`sider.groupcommit.GroupCommit`
 
     """
 
@@ -34,7 +84,73 @@ class Session(object):
     #: if it's needed.
     verbose_transaction_error = None
 
-    def __init__(self, client):
+    #: (:class:`weakref.WeakValueDictionary`) The identity map of
+    #: Python objects loaded by the session.  Its keys are pairs of
+    #: Redis keys and value types e.g. ``('my_hash', Hash())``, and
+    #: values are Python objects that represent them e.g.
+    #: :class:`sider.hash.Hash` objects.
+    #:
+    #: Only objects that aren't :class:`~sider.types.Bulk` values
+    #: (for example :class:`sider.list.List`, :class:`sider.set.Set`)
+    #: are mapped.  Mapped objects are weakly referenced, so they
+    #: are automatically removed from the map when there are no more
+    #: references to them.
+    identity_map = None
+
+    #: (:class:`dict`) The cache of :class:`~sider.types.Value` instances
+    #: for each value type class.  See also :meth:`ensure_value_type()`.
+    value_types = None
+
+    #: (:class:`sider.cache.Cache`) The client-side cache of query results.
+    #: It's ``None`` if the session doesn't cache anything.
+    cache = None
+
+    #: (:class:`sider.autopipeline.AutoPipeline`) The shared pipeline
+    #: which queues fire-and-forget commands.  It's ``None`` if the session
+    #: doesn't pipeline commands automatically.
+    autopipeline = None
+
+    #: (:class:`sider.replica.ReplicaRouter`) The router which selects
+    #: replica servers to send query operations to.  It's ``None`` if
+    #: the session sends everything to the primary server.
+    replicas = None
+
+    #: (:class:`list`) :class:`~sider.instrumentation.Instrument` objects
+    #: which every command sent by the session is reported to.
+    #: Instruments can be added to or removed from it at any time.
+    instruments = None
+
+    #: (:class:`sider.script.ScriptRegistry`) The registry of Lua scripts
+    #: loaded to the server.  It's ``None`` if the session doesn't use
+    #: scripts.  See also :attr:`scripting_available`.
+    scripts = None
+
+    #: (:class:`sider.script.AdaptiveScripting`) The policy which decides
+    #: for each key whether to use :attr:`scripts`.  It's ``None`` if
+    #: scripts are always used whenever available.
+    adaptive_scripting = None
+
+    #: (:class:`sider.transaction.RetryPolicy`) The default policy of
+    #: retrying transactions which have met conflicts.
+    retry_policy = None
+
+    #: (:class:`sider.transaction.ConflictStats`) The conflicts of
+    #: transactions made by the session.  See also :attr:`conflicts`.
+    conflict_stats = None
+
+    #: (:class:`sider.transaction.KeyLocks`) The in-process lock table of
+    #: keys watched by transactions.  It's ``None`` if transactions of
+    #: the session don't lock anything but only rely on :redis:`WATCH`.
+    locks = None
+
+    #: (:class:`sider.groupcommit.GroupCommit`) The executor which merges
+    #: :meth:`atomic()` batches of many threads into a round trip.
+    #: It's ``None`` if every batch is committed by itself.
+    group_commit = None
+
+    def __init__(self, client, cache=None, autopipeline=None, replicas=None,
+                 instruments=(), stats=False, scripting=True,
+                 retry_policy=None, locks=None, group_commit=None):
         if not isinstance(client, StrictRedis):
             raise TypeError('client must be a redis.client.StrictRedis object'
                             ', not ' + repr(client))
@@ -42,10 +158,104 @@ class Session(object):
             warnings.warn('redis.client.Redis is deprecated and would be '
                           'broken in the future; use redis.client.StrictRedis '
                           'instead', DeprecationWarning)
+        self.instruments = list(instruments)
+        if stats:
+            self.instruments.append(Stats())
+        self.written_keys = LocalDict(keys=None)
+        unwrapped_client = client
+        if cache is not None:
+            client = invalidating_client(client, self.invalidate_written)
+        client = instrument_client(client, self.instruments)
+        # The router can be shared by other sessions, so its replicas are
+        # instrumented for each session instead of being replaced.
+        self.replica_clients = {}
+        if replicas is not None:
+            for replica in replicas.replicas:
+                self.replica_clients[id(replica)] = \
+                    instrument_client(replica, self.instruments)
         self.client = client
         self.basic_client = client
-        self.context_locals = LocalDict(transaction=None)
+        self.context_locals = LocalDict(transaction=None, client=None,
+                                        route=None)
         self.verbose_transaction_error = False
+        self.identity_map = weakref.WeakValueDictionary()
+        self.value_types = {}
+        self.cache = cache
+        if cache is not None and cache.tracking:
+            cache.track(client)
+        self.autopipeline = autopipeline
+        if autopipeline is not None and cache is None:
+            autopipeline.bind(client)
+        elif autopipeline is not None:
+            # Queued commands can be sent by any thread, so the auto-pipeline
+            # invalidates keys written by them instead of the thread-local
+            # invalidate_written().
+            autopipeline.bind(
+                instrument_client(unwrapped_client, self.instruments),
+                self.take_written, cache.invalidate
+            )
+        self.replicas = replicas
+        self.scripts = ScriptRegistry() if scripting else None
+        if isinstance(scripting, AdaptiveScripting):
+            self.adaptive_scripting = scripting
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.conflict_stats = ConflictStats()
+        self.locks = locks
+        self.group_commit = group_commit
+        if group_commit is not None:
+            group_commit.bind(client)
+
+    @property
+    def client(self):
+        """(:class:`redis.client.StrictRedis`) The Redis client.
+        It becomes a pipeline during transactions.  Pipelines are
+        thread/greenlet-local, so that a session can be shared by
+        concurrent transactions of several threads or greenlets.
+
+        If the session has an :attr:`autopipeline`, accessing this
+        flushes commands queued into it first.
+
+        If the session has :attr:`replicas`, it becomes one of replica
+        clients while query operations are running outside of
+        transactions.  See also :meth:`route()`.
+
+        """
+        autopipeline = self.autopipeline
+        if autopipeline is not None and autopipeline.pending:
+            autopipeline.flush()
+        context = self.context_locals.current
+        pipeline = context['client']
+        if pipeline is not None:
+            return pipeline
+        replicas = self.replicas
+        if replicas is not None and context['route'] and \
+           context['transaction'] is None:
+            replica = replicas.select()
+            if replica is not None:
+                return self.replica_clients[id(replica)]
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def deferred_client(self):
+        """(:class:`redis.client.StrictRedis`) The client to send
+        fire-and-forget commands, of which replies are unnecessary.
+        It's the :attr:`autopipeline` if the session has it and
+        it's not on any transaction.  Otherwise it's the same to
+        :attr:`client`.
+
+        .. note::
+
+           This property is for internal use.
+
+        """
+        autopipeline = self.autopipeline
+        if autopipeline is None or self.current_transaction is not None:
+            return self.client
+        return autopipeline
 
     @property
     def server_version(self):
@@ -53,10 +263,7 @@ class Session(object):
         try:
             info = self._server_info
         except AttributeError:
-            client = self.client
-            if isinstance(client, BasePipeline):
-                client = self.context_locals['original_client']
-            info = client.info()
+            info = self._client.info()
             self._server_info = info
         return info['redis_version']
 
@@ -68,6 +275,153 @@ class Session(object):
         """
         return tuple(int(v) for v in self.server_version.split('.'))
 
+    @property
+    def scripting_available(self):
+        """(:class:`bool`) Whether operations can be done by Lua scripts
+        right now.  It's ``False`` if the session has no :attr:`scripts`,
+        it's on a transaction, or the server is older than Redis 2.6.
+
+        """
+        return (self.scripts is not None and
+                self.current_transaction is None and
+                self.server_version_info >= (2, 6, 0))
+
+    def prefers_script(self, key):
+        """Whether a read-modify-write operation on the ``key`` has to be
+        done by a Lua script rather than :redis:`WATCH`/:redis:`MULTI`
+        right now.  It's :attr:`scripting_available`, and if the session
+        has :attr:`adaptive_scripting` the ``key`` has to be hot as well.
+
+        :param key: the Redis key the operation deals with
+        :type key: :class:`str`
+        :rtype: :class:`bool`
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        if not self.scripting_available:
+            return False
+        adaptive = self.adaptive_scripting
+        return adaptive is None or adaptive.is_hot(key)
+
+    def run_script(self, script, keys=(), args=()):
+        """Runs the ``script`` on the primary server through
+        the :attr:`scripts` registry.
+
+        :param script: the script to run
+        :type script: :class:`~sider.script.Script`
+        :param keys: keys the script deals with
+        :type keys: :class:`collections.Sequence`
+        :param args: other arguments of the script
+        :type args: :class:`collections.Sequence`
+        :returns: the result of the script
+
+        .. note::
+
+           This method is for internal use.  Check
+           :meth:`prefers_script()` first.
+
+        """
+        autopipeline = self.autopipeline
+        if autopipeline is not None and autopipeline.pending:
+            autopipeline.flush()
+        return self.scripts(self._client, script, keys, args)
+
+    @property
+    def stats(self):
+        """(:class:`~sider.instrumentation.StatsSnapshot`) The snapshot
+        of aggregated numbers of commands sent by the session.
+        It's ``None`` if the session has no
+        :class:`~sider.instrumentation.Stats` in :attr:`instruments`.
+
+        .. seealso::
+
+           Method :meth:`reset_stats()`
+              Resets the numbers.
+
+        """
+        for instrument in self.instruments:
+            if isinstance(instrument, Stats):
+                return instrument.snapshot()
+
+    def reset_stats(self):
+        """Resets the numbers of :attr:`stats`.
+
+        :returns: the snapshot of the numbers before reset.
+                  ``None`` if the session has no
+                  :class:`~sider.instrumentation.Stats` in
+                  :attr:`instruments`
+        :rtype: :class:`~sider.instrumentation.StatsSnapshot`
+
+        """
+        snapshot = None
+        for instrument in self.instruments:
+            if isinstance(instrument, Stats):
+                last = instrument.reset()
+                if snapshot is None:
+                    snapshot = last
+        return snapshot
+
+    @property
+    def conflicts(self):
+        """(:class:`~sider.transaction.ConflictSnapshot`) The snapshot
+        of conflicts of transactions made by the session: conflicts of
+        each key, the histogram of retries, and time spent in failed
+        attempts.  It helps to find contended keys::
+
+            keys = session.conflicts.keys
+            for key in sorted(keys, key=keys.get, reverse=True)[:10]:
+                print(key, keys[key])
+
+        .. seealso::
+
+           Method :meth:`reset_conflicts()`
+              Resets the numbers.
+
+        """
+        return self.conflict_stats.snapshot()
+
+    def reset_conflicts(self):
+        """Resets the numbers of :attr:`conflicts`.
+
+        :returns: the snapshot of the numbers before reset
+        :rtype: :class:`~sider.transaction.ConflictSnapshot`
+
+        """
+        return self.conflict_stats.reset()
+
+    @contextlib.contextmanager
+    def profile(self, threshold=10):
+        """The context manager which counts round trips each operation
+        made inside the block and finds N+1 patterns::
+
+            with session.profile() as profile:
+                for field in fields:
+                    values.append(hash_[field])
+            print(profile.report())
+
+        Only round trips made by the current thread are counted.
+
+        :param threshold: the number of round trips to be regarded
+                          as an N+1 pattern.  default is 10
+        :type threshold: :class:`numbers.Integral`
+        :returns: the context manager which results
+                  a :class:`~sider.profiler.Profile`
+
+        .. seealso::
+
+           Module :mod:`sider.profiler`
+
+        """
+        profile = Profile(threshold)
+        self.instruments.append(profile)
+        try:
+            yield profile
+        finally:
+            self.instruments.remove(profile)
+
     def get(self, key, value_type=ByteString):
         """Loads the value from the ``key``.
         If ``value_type`` is present the value will be treated as it,
@@ -80,10 +434,27 @@ class Session(object):
         :type value_type: :class:`~sider.types.Value`, :class:`type`
         :returns: the loaded value
 
+        .. note::
+
+           Objects other than :class:`~sider.types.Bulk` values
+           e.g. :class:`~sider.hash.Hash`, :class:`~sider.list.List`
+           are maintained by the :attr:`identity_map`.  So it returns
+           the same object for the same ``key`` and ``value_type``
+           while the object is alive::
+
+               assert session.get('a', Hash) is session.get('a', Hash)
+
         """
-        value_type = Value.ensure_value_type(value_type,
-                                             parameter='value_type')
-        return value_type.load_value(self, key)
+        value_type = self.ensure_value_type(value_type)
+        if isinstance(value_type, Bulk):
+            with self.route(True):
+                return value_type.load_value(self, key)
+        ident = key, value_type
+        try:
+            return self.identity_map[ident]
+        except KeyError:
+            value = value_type.load_value(self, key)
+            return self.identity_map.setdefault(ident, value)
 
     def set(self, key, value, value_type=ByteString):
         """Stores the ``value`` into the ``key``.
@@ -101,9 +472,119 @@ class Session(object):
                   may not equal nor the same to
 
         """
-        value_type = Value.ensure_value_type(value_type,
-                                             parameter='value_type')
-        return value_type.save_value(self, key, value)
+        value_type = self.ensure_value_type(value_type)
+        if self.cache is not None:
+            self.cache.invalidate([key])
+        if self.replicas is not None:
+            self.replicas.wrote()
+        try:
+            value = value_type.save_value(self, key, value)
+        finally:
+            if self.cache is not None:
+                # Results read while it was being saved can be stale.
+                self.cache.invalidate([key])
+        if isinstance(value_type, Bulk):
+            return value
+        return self.identity_map.setdefault((key, value_type), value)
+
+    def get_many(self, keys, value_type=ByteString):
+        """Loads the values from the ``keys`` at once.  It's equivalent
+        to calling :meth:`get()` for each key except it takes fewer
+        round trips::
+
+            a, b, c = session.get_many(['a', 'b', 'c'], Integer)
+
+        :class:`~sider.types.Bulk` values are loaded by a :redis:`MGET`
+        command.  If the session has a :attr:`cache`, contents of
+        container values e.g. :class:`~sider.hash.Hash` are prefetched
+        into the cache in a pipeline.
+
+        :param keys: the Redis keys to load
+        :type keys: :class:`collections.Iterable`
+        :param value_type: the type of the values to load.  default is
+                           :class:`~sider.types.ByteString`
+        :type value_type: :class:`~sider.types.Value`, :class:`type`
+        :returns: the list of loaded values, in the same order to ``keys``
+        :rtype: :class:`list`
+
+        """
+        value_type = self.ensure_value_type(value_type)
+        keys = list(keys)
+        with self.route(True):
+            values = value_type.load_values(self, keys)
+        if isinstance(value_type, Bulk):
+            return values
+        setdefault = self.identity_map.setdefault
+        return [setdefault((key, value_type), value)
+                for key, value in zip(keys, values)]
+
+    def set_many(self, mapping, value_type=ByteString):
+        """Stores all values of the ``mapping`` into their keys at once.
+        It's equivalent to calling :meth:`set()` for each pair except
+        it takes fewer round trips::
+
+            session.set_many({'a': 1, 'b': 2}, Integer)
+
+        :class:`~sider.types.Bulk` values are stored by a :redis:`MSET`
+        command, and container values are stored through a pipeline.
+
+        :param mapping: the mapping of Redis keys to values to be saved,
+                        or an iterable of ``(key, value)`` pairs
+        :type mapping: :class:`collections.Mapping`
+        :param value_type: the type of the values.  default is
+                           :class:`~sider.types.ByteString`
+        :type value_type: :class:`~sider.types.Value`, :class:`type`
+        :returns: the mapping of Redis keys to Python representations of
+                  the saved values
+        :rtype: :class:`dict`
+
+        """
+        value_type = self.ensure_value_type(value_type)
+        if isinstance(mapping, collections.Mapping):
+            pairs = list(getattr(mapping, 'iteritems', mapping.items)())
+        else:
+            pairs = list(mapping)
+        keys = [key for key, _ in pairs]
+        if self.cache is not None:
+            self.cache.invalidate(keys)
+        if self.replicas is not None:
+            self.replicas.wrote()
+        try:
+            values = value_type.save_values(self, pairs)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(keys)
+        if isinstance(value_type, Bulk):
+            return dict(zip(keys, values))
+        setdefault = self.identity_map.setdefault
+        return dict((key, setdefault((key, value_type), value))
+                    for key, value in zip(keys, values))
+
+    def ensure_value_type(self, value_type):
+        """Equivalent to :meth:`Value.ensure_value_type()
+        <sider.types.Value.ensure_value_type>` except it reuses
+        the instance for the same ``value_type`` class.  It's used
+        for keys of the :attr:`identity_map`.
+
+        :param value_type: the type of the value
+        :type value_type: :class:`~sider.types.Value`, :class:`type`
+        :returns: an instance of the given ``value_type``
+        :rtype: :class:`~sider.types.Value`
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        if isinstance(value_type, type):
+            try:
+                return self.value_types[value_type]
+            except KeyError:
+                instance = Value.ensure_value_type(value_type,
+                                                   parameter='value_type')
+                self.value_types[value_type] = instance
+                return instance
+        return Value.ensure_value_type(value_type, parameter='value_type')
 
     @property
     def current_transaction(self):
@@ -143,8 +624,178 @@ class Session(object):
         """
         return Transaction(self)
 
+    def atomic(self):
+        """Makes a write-only batch which atomically commits manipulative
+        operations inside it by :redis:`MULTI`/:redis:`EXEC`, without
+        :redis:`WATCH` and retries::
+
+            with session.atomic():
+                hash_['name'] = 'value'
+                index.add('name')
+
+        Query operations inside it raise
+        :exc:`~sider.exceptions.CommitError`.  Use :attr:`transaction`
+        instead if operations depend on what they read.
+
+        :returns: the context manager of the batch
+        :rtype: :class:`~sider.transaction.Atomic`
+
+        """
+        return Atomic(self)
+
+    @contextlib.contextmanager
+    def route(self, query):
+        """The context manager which routes commands sent in the block
+        to one of :attr:`replicas` if ``query`` is ``True``, or to
+        the primary if it's ``False``.  If it's nested, the outermost
+        one takes effect, so that query operations used by manipulative
+        operations read from the primary.
+
+        :func:`~sider.transaction.query` and
+        :func:`~sider.transaction.manipulative` decorators use this.
+
+        :param query: whether commands in the block are queries
+        :type query: :class:`bool`
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        locals_ = self.context_locals
+        context = locals_.current
+        if context['route'] is not None:
+            yield
+            return
+        context['route'] = bool(query)
+        try:
+            yield
+        finally:
+            context['route'] = None
+            if context['transaction'] is None:
+                locals_.release()
+
+    def cached_query(self, key, command, *args, **options):
+        """Sends a query ``command`` through the :attr:`cache` if
+        the session has it.  If there is the cached result of the same
+        command and arguments, it's returned without any round trips.
+
+        It doesn't use the :attr:`cache` during transactions.
+
+        :param key: the Redis key the ``command`` reads
+        :type key: :class:`str`
+        :param command: the method name of the Redis client
+                        e.g. ``'hget'``
+        :type command: :class:`str`
+        :param \*args: arguments to pass to the ``command``
+        :param \*\*options: keyword arguments to pass to the ``command``
+        :returns: the result of the ``command``
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        cache = self.cache
+        if cache is None or self.current_transaction is not None:
+            return getattr(self.client, command)(*args, **options)
+        entry = key, command, args, tuple(sorted(options.items()))
+        try:
+            return cache.get(entry)
+        except KeyError:
+            token = cache.reserve(key)
+            result = getattr(self.client, command)(*args, **options)
+            cache.store(token, entry, result)
+            return result
+
+    def cached_mget(self, keys):
+        """Gets bulks of the ``keys`` by a :redis:`MGET` command.
+        Bulks cached by :meth:`cached_query()` are reused, and only
+        the rest are fetched and then cached.
+
+        :param keys: the Redis keys to get
+        :type keys: :class:`collections.Sequence`
+        :returns: the list of bulks, in the same order to ``keys``
+        :rtype: :class:`list`
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        cache = self.cache
+        if cache is None or self.current_transaction is not None:
+            return self.client.mget(keys)
+        bulks = [None] * len(keys)
+        missing = []
+        for i, key in enumerate(keys):
+            try:
+                bulks[i] = cache.get((key, 'get', (key,), ()))
+            except KeyError:
+                missing.append(i)
+        if missing:
+            tokens = [cache.reserve(keys[i]) for i in missing]
+            fetched = self.client.mget([keys[i] for i in missing])
+            for i, token, bulk in zip(missing, tokens, fetched):
+                cache.store(token, (keys[i], 'get', (keys[i],), ()), bulk)
+                bulks[i] = bulk
+        return bulks
+
+    def prefetch(self, queries):
+        """Sends query commands in a pipeline and stores these results
+        into the :attr:`cache`, so that following :meth:`cached_query()`
+        calls of the same commands don't need any round trips.
+
+        It does nothing if the session has no :attr:`cache` or it's
+        on a transaction.
+
+        :param queries: ``(key, command, args, options)`` tuples.
+                        see also :meth:`cached_query()`
+        :type queries: :class:`collections.Iterable`
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        cache = self.cache
+        if cache is None or self.current_transaction is not None:
+            return
+        entries = []
+        seen = set()
+        for key, command, args, options in queries:
+            entry = key, command, tuple(args), tuple(sorted(options.items()))
+            if entry in seen:
+                continue
+            seen.add(entry)
+            try:
+                cache.get(entry)
+            except KeyError:
+                entries.append((entry, options))
+        if not entries:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        tokens = []
+        for entry, options in entries:
+            key, command, args, _ = entry
+            tokens.append(cache.reserve(key))
+            getattr(pipe, command)(*args, **options)
+        results = pipe.execute(raise_on_error=False)
+        for token, (entry, _), result in zip(tokens, entries, results):
+            # Errors e.g. WRONGTYPE are left to be raised by the actual query.
+            if not isinstance(result, Exception):
+                cache.store(token, entry, result)
+
     def mark_manipulative(self, keys=frozenset()):
-        """Marks it is manipulative.
+        """Marks it is manipulative.  It also invalidates cached results
+        of the ``keys``, and does it again by :meth:`invalidate_written()`
+        after the next command or pipeline of the current thread/greenlet
+        has been sent, i.e. the write has been done.  Keys of commands
+        queued into the :attr:`autopipeline` are invalidated again by
+        the auto-pipeline instead, after it has sent them.
 
         :param keys: optional set of keys to watch
         :type keys: :class:`collections.Iterable`
@@ -154,6 +805,18 @@ class Session(object):
            This method is for internal use.
 
         """
+        cache = self.cache
+        if cache is not None:
+            keys = list(keys)
+            cache.invalidate(keys)
+            if keys:
+                written = self.written_keys.current
+                if written['keys'] is None:
+                    written['keys'] = set(keys)
+                else:
+                    written['keys'].update(keys)
+        if self.replicas is not None:
+            self.replicas.wrote()
         transaction = self.current_transaction
         if transaction is None:
             return
@@ -161,6 +824,41 @@ class Session(object):
         if not transaction.commit_phase:
             transaction.begin_commit()
 
+    def invalidate_written(self):
+        """Invalidates cached results of keys which have been marked
+        by :meth:`mark_manipulative()` in the current thread/greenlet
+        again.  Results which were read before writes to these keys
+        were done are rejected by the :attr:`cache` as well, since their
+        reservations are also invalidated.
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        keys = self.take_written()
+        if keys:
+            self.cache.invalidate(keys)
+
+    def take_written(self):
+        """Takes keys which have been marked by :meth:`mark_manipulative()`
+        in the current thread/greenlet, so that these aren't invalidated
+        by :meth:`invalidate_written()` anymore.
+
+        :returns: the set of written keys.  it can be ``None``
+                  if nothing has been written
+        :rtype: :class:`set`
+
+        .. note::
+
+           This method is for internal use.
+
+        """
+        written = self.written_keys
+        keys = written.get('keys')
+        written.release()
+        return keys
+
     def mark_query(self, keys=frozenset()):
         """Marks it is querying.
 
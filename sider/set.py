@@ -73,9 +73,9 @@ class Set(collections.MutableSet):
 
     @query
     def __iter__(self):
-        decode = self.value_type.decode
-        for member in self.session.client.smembers(self.key):
-            yield decode(member)
+        members = self.session.cached_query(self.key, 'smembers', self.key)
+        for member in self.value_type.decode_many(members):
+            yield member
 
     @query
     def __len__(self):
@@ -541,8 +541,7 @@ class Set(collections.MutableSet):
         keys = (operand.key for operand in online_sets)
         self.session.mark_query([self.key])
         fetched = self.session.client.sdiff(self.key, *keys)
-        decode = self.value_type.decode
-        diff = set(decode(member) for member in fetched)
+        diff = set(self.value_type.decode_many(fetched))
         diff.difference_update(*offline_sets)
         return diff
 
@@ -574,8 +573,7 @@ class Set(collections.MutableSet):
             inter = self.session.client.sinter(self.key, operand.key)
             symdiff = set(union)
             symdiff.difference_update(inter)
-            decode = self.value_type.decode
-            return set(decode(member) for member in symdiff)
+            return set(self.value_type.decode_many(symdiff))
         return set(self).symmetric_difference(operand)
 
     def union(self, *sets):
@@ -607,8 +605,7 @@ class Set(collections.MutableSet):
             keys = (s.key for s in group)
             self.session.mark_query([self.key])
             subset = self.session.client.sunion(*keys)
-            decode = value_type.decode
-            union.update(decode(member) for member in subset)
+            union.update(value_type.decode_many(subset))
         for operand in offline_sets:
             union.update(operand)
         return union
@@ -635,8 +632,7 @@ class Set(collections.MutableSet):
         if keys:
             self.session.mark_query([self.key])
             inter = self.session.client.sinter(self.key, *keys)
-            decode = self.value_type.decode
-            online = set(decode(m) for m in inter)
+            online = set(self.value_type.decode_many(inter))
         else:
             online = self
         if offline_sets:
@@ -658,7 +654,7 @@ class Set(collections.MutableSet):
 
         """
         member = self.value_type.encode(element)
-        self.session.client.sadd(self.key, member)
+        self.session.deferred_client.sadd(self.key, member)
 
     @manipulative
     def discard(self, element):
@@ -676,7 +672,7 @@ class Set(collections.MutableSet):
             member = self.value_type.encode(element)
         except TypeError:
             return
-        self.session.client.srem(self.key, member)
+        self.session.deferred_client.srem(self.key, member)
 
     def pop(self):
         """Removes an arbitrary element from the set and returns it.
@@ -691,6 +687,7 @@ class Set(collections.MutableSet):
 
         """
         if self.session.current_transaction is None:
+            self.session.mark_manipulative([self.key])
             popped = self.session.client.spop(self.key)
             if popped is None:
                 raise KeyError('pop from an empty set')
@@ -759,8 +756,7 @@ class Set(collections.MutableSet):
 
     def _raw_update(self, members, pipe):
         key = self.key
-        encode = self.value_type.encode
-        members = (encode(v) for v in members)
+        members = self.value_type.encode_many(members)
         self.session.mark_manipulative()
         if self.session.server_version_info < (2, 4, 0):
             for member in members:
@@ -916,7 +912,9 @@ class Set(collections.MutableSet):
             for el in enc_elements:
                 pipe.srem(self.key, el)
         else:
-            pipe.srem(self.key, *enc_elements)
+            n = 100  # FIXME: it is an arbitarary magic number.
+            for chunk in utils.chunk(enc_elements, n):
+                pipe.srem(self.key, *chunk)
 
     def __repr__(self):
         cls = type(self)
@@ -14,6 +14,55 @@ import itertools
 from .session import Session
 from .types import Bulk, String
 from .transaction import query, manipulative
+from .script import Script
+
+
+#: (:class:`~sider.script.Script`) Decreases the score of ``ARGV[1]``
+#: by ``-ARGV[2]``, or removes it if the score gets ``ARGV[3]`` or less.
+#: It always removes it if ``ARGV[3]`` is empty.  It returns the score
+#: before decrement.
+DECREASE_SCRIPT = Script('''
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score then
+    return false
+end
+if ARGV[3] == '' or tonumber(score) + tonumber(ARGV[2]) <= tonumber(ARGV[3])
+then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+else
+    redis.call('ZINCRBY', KEYS[1], ARGV[2], ARGV[1])
+end
+return score
+''', 'sider.sortedset.DECREASE_SCRIPT')
+
+#: (:class:`~sider.script.Script`) Does the same thing to
+#: :data:`DECREASE_SCRIPT` for the first member got by ``ARGV[1]``
+#: (:redis:`ZRANGE` or :redis:`ZREVRANGE`).  It returns the member and
+#: its score before decrement.
+POPITEM_SCRIPT = Script('''
+local pair = redis.call(ARGV[1], KEYS[1], 0, 0, 'WITHSCORES')
+if #pair == 0 then
+    return false
+end
+if ARGV[3] == '' or tonumber(pair[2]) + tonumber(ARGV[2]) <= tonumber(ARGV[3])
+then
+    redis.call('ZREM', KEYS[1], pair[1])
+else
+    redis.call('ZINCRBY', KEYS[1], ARGV[2], pair[1])
+end
+return pair
+''', 'sider.sortedset.POPITEM_SCRIPT')
+
+#: (:class:`~sider.script.Script`) Adds ``ARGV[1]`` with the score
+#: ``ARGV[2]`` if it doesn't exist.  It returns the score before
+#: the operation.
+SETDEFAULT_SCRIPT = Script('''
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score then
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+end
+return score
+''', 'sider.sortedset.SETDEFAULT_SCRIPT')
 
 
 class SortedSet(collections.MutableMapping, collections.MutableSet):
@@ -98,8 +147,8 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
     @query
     def __iter__(self):
         result = self.session.client.zrange(self.key, 0, -1)
-        for i in result:
-            yield self.value_type.decode(i)
+        for i in self.value_type.decode_many(result):
+            yield i
 
     @query
     def __contains__(self, member):
@@ -166,7 +215,7 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
         if not isinstance(score, numbers.Real):
             raise TypeError('score must be a float, not ' + repr(score))
         element = self.value_type.encode(member)
-        self.session.client.zadd(self.key, score, element)
+        self.session.deferred_client.zadd(self.key, score, element)
 
     def __delitem__(self, member):
         """Removes the ``member``.
@@ -189,6 +238,7 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
         element = self.value_type.encode(member)
         session = self.session
         if session.current_transaction is None:
+            session.mark_manipulative([self.key])
             exists = session.client.zrem(self.key, element)
         else:
             session.mark_query()
@@ -214,13 +264,12 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
             elif self.value_type != operand.value_type:
                 return False
         pairs = zrange(self.key, 0, -1, withscores=True)
-        decode = self.value_type.decode
         if operand_is_sortedset:
             operand_pairs = zrange(operand.key, 0, -1, withscores=True)
             return pairs == operand_pairs
-        elif isinstance(operand, collections.Mapping):
-            for element, score in pairs:
-                element = decode(element)
+        elements = self.value_type.decode_many(el for el, _ in pairs)
+        if isinstance(operand, collections.Mapping):
+            for element, (_, score) in zip(elements, pairs):
                 try:
                     s = operand[element]
                 except KeyError:
@@ -230,8 +279,8 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
                         return False
             return True
         elif isinstance(operand, collections.Set):
-            for element, score in pairs:
-                if not (score == 1 and decode(element) in operand):
+            for element, (_, score) in zip(elements, pairs):
+                if not (score == 1 and element in operand):
                     return False
             return True
         return False
@@ -258,8 +307,7 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
         """
         client = self.session.client
         zrange = client.zrevrange if reverse else client.zrange
-        decode = self.value_type.decode
-        return map(decode, zrange(self.key, 0, -1))
+        return self.value_type.decode_many(zrange(self.key, 0, -1))
 
     @query
     def items(self, reverse=False):
@@ -346,11 +394,11 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
             n = 0
         elif not isinstance(n, numbers.Integral):
             raise TypeError('n must be an integer, not ' + repr(n))
-        client = self.session.client
-        zrange = client.zrevrange if reverse else client.zrange
-        pairs = zrange(self.key, 0, n - 1, withscores=True)
-        decode = self.value_type.decode
-        return [(decode(value), score) for value, score in pairs]
+        zrange = 'zrevrange' if reverse else 'zrange'
+        pairs = self.session.cached_query(self.key, zrange, self.key, 0, n - 1,
+                                          withscores=True)
+        values = self.value_type.decode_many(value for value, _ in pairs)
+        return [(value, score) for value, (_, score) in zip(values, pairs)]
 
     @manipulative
     def add(self, member, score=1):
@@ -368,7 +416,8 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
         if not isinstance(score, numbers.Real):
             raise TypeError('score must be a numbers.Real, not ' + repr(score))
         element = self.value_type.encode(member)
-        self.session.client.zincrby(self.key, value=element, amount=score)
+        self.session.deferred_client.zincrby(self.key, value=element,
+                                             amount=score)
 
     def discard(self, member, score=1, remove=0):
         """Opposite operation of :meth:`add()`.  It decreases
@@ -400,7 +449,8 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
 
            Otherwise, it internally uses :redis:`ZSCORE` plus
            :redis:`ZINCRBY` or `:redis:`ZREM` (total two commands)
-           within a transaction.
+           within a transaction, or a Lua script (:data:`DECREASE_SCRIPT`)
+           if it's not on any transaction.
 
         """
         if not isinstance(score, numbers.Real):
@@ -412,6 +462,11 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
             self.add(member, -score)
             return
         element = self.value_type.encode(member)
+        if self.session.prefers_script(self.key):
+            self.session.mark_manipulative([self.key])
+            self.session.run_script(DECREASE_SCRIPT, [self.key],
+                                    [element, -score, remove])
+            return
         def block(trial, transaction):
             pipe = self.session.client
             self.session.mark_query()
@@ -444,13 +499,19 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
            whether the key exists and get its score if it exists.
            If it doesn't exist yet, it sends one more command:
            :redis:`ZADD`.  It is atomically committed
-           in a transaction.
+           in a transaction, or done by a Lua script
+           (:data:`SETDEFAULT_SCRIPT`) if it's not on any transaction.
 
         """
         if not isinstance(default, numbers.Real):
             raise TypeError('default must be a numbera.Real value, not ' +
                             repr(default))
         element = self.value_type.encode(key)
+        if self.session.prefers_script(self.key):
+            self.session.mark_manipulative([self.key])
+            score = self.session.run_script(SETDEFAULT_SCRIPT, [self.key],
+                                            [element, default])
+            return default if score is None else float(score)
         score = [None]
         def block(trial, transaction):
             pipe = self.session.client
@@ -499,13 +560,24 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
 
            It internally uses :redis:`ZRANGE` or :redis:`ZREVRANGE`,
            :redis:`ZREM` or :redis:`ZINCRBY` (total 2 commands)
-           in a transaction.
+           in a transaction, or a Lua script (:data:`POPITEM_SCRIPT`)
+           if it's not on any transaction.
 
         .. seealso::
 
            Method :meth:`pop()`
 
         """
+        if self.session.prefers_script(self.key):
+            self.session.mark_manipulative([self.key])
+            zrange = 'ZREVRANGE' if desc else 'ZRANGE'
+            pair = self.session.run_script(
+                POPITEM_SCRIPT, [self.key],
+                [zrange, -score, '' if remove is None else remove]
+            )
+            if pair is None:
+                raise KeyError('pop from an empty set')
+            return self.value_type.decode(pair[0]), float(pair[1])
         resultset = []
         def block(trial, transaction):
             pipe = self.session.client
@@ -545,7 +617,9 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
         .. note::
 
            It internally uses :redis:`ZSCORE`, :redis:`ZREM` or
-           :redis:`ZINCRBY` (total 2 commands) in a transaction.
+           :redis:`ZINCRBY` (total 2 commands) in a transaction,
+           or a Lua script (:data:`DECREASE_SCRIPT`) if it's not on
+           any transaction.
 
         If no positional arguments or no ``key`` keyword argument,
         it behaves like :meth:`set.pop()` method.  Basically it
@@ -567,7 +641,8 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
 
            It internally uses :redis:`ZRANGE` or :redis:`ZREVRANGE`,
            :redis:`ZREM` or :redis:`ZINCRBY` (total 2 commands)
-           in a transaction.
+           in a transaction, or a Lua script (:data:`POPITEM_SCRIPT`)
+           if it's not on any transaction.
 
         .. seealso::
 
@@ -609,6 +684,13 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
                 key = kwargs['key']
                 default = kwargs.get('default')
             element = self.value_type.encode(key)
+            if self.session.prefers_script(self.key):
+                self.session.mark_manipulative([self.key])
+                current = self.session.run_script(
+                    DECREASE_SCRIPT, [self.key],
+                    [element, -score, '' if remove is None else remove]
+                )
+                return default if current is None else float(current)
             current = [None]
             def block(trial, transaction):
                 pipe = self.session.client
@@ -694,6 +776,7 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
         session = self.session
         key = self.key
         encode = self.value_type.encode
+        encode_many = self.value_type.encode_many
         def block(trial, transaction):
             session.mark_manipulative([key])
             zincrby = session.client.zincrby
@@ -709,8 +792,7 @@ class SortedSet(collections.MutableMapping, collections.MutableSet):
                                             repr(score))
                         zincrby(key, value=el, amount=score)
                 elif isinstance(set_, collections.Iterable):
-                    for el in set_:
-                        el = encode(el)
+                    for el in encode_many(set_):
                         zincrby(key, value=el, amount=1)
                 else:
                     raise TypeError('expected iterable, not ' + repr(set_))
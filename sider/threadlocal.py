@@ -84,6 +84,14 @@ class LocalDict(collections.MutableMapping):
             self.idents[ident] = d
             return d
 
+    def release(self):
+        """Drops the items of the current thread/greenlet, so that
+        they don't leak after the thread/greenlet has ended.  Items
+        become the initial items again when they are accessed next.
+
+        """
+        self.idents.pop(get_ident(), None)
+
     def __len__(self):
         return len(self.current)
 
@@ -23,6 +23,14 @@ This means you shouldn't do I/O in the transaction block.
 Your I/O could be executed two or more times.  Do I/O after or
 before transaction blocks instead.
 
+By default it retries immediately and endlessly.  On contended keys
+it can be limited by :class:`RetryPolicy`, and conflicts can be found
+through :attr:`Session.conflicts <sider.session.Session.conflicts>`::
+
+    session = Session(client, retry_policy=RetryPolicy(max_attempts=10,
+                                                       backoff=0.001,
+                                                       deadline=1))
+
 There are two properties of every operation: :func:`query` or
 :func:`manipulative` or both.  For example, :meth:`Hash.get()
 <sider.hash.Hash.get>` method is a query operation.
@@ -61,14 +69,24 @@ while the following raises a :exc:`~sider.exceptions.CommitError`::
 
 """
 from __future__ import absolute_import
+import collections
+import copy
 import sys
 import warnings
 import functools
+import inspect
+import random
+import threading
+import time
 import traceback
 import gc
+from timeit import default_timer
 from redis.client import WatchError
-from .exceptions import DoubleTransactionError, ConflictError
+from redis.exceptions import ConnectionError, ResponseError
+from .exceptions import (CommitError, DoubleTransactionError, ConflictError,
+                         NotCommittedError, RetryLimitError)
 from .warnings import SiderWarning, TransactionWarning
+from .instrumentation import Command
 from . import lazyimport
 
 
@@ -78,24 +96,383 @@ except NameError:
     _string_type = str
 
 
+#: (:class:`frozenset`) The names of read-only commands of which
+#: results can be reused during the query phase of a transaction.
+#: See also :attr:`Transaction.reads`.
+READ_COMMANDS = frozenset([
+    'EXISTS', 'GET', 'STRLEN', 'TYPE',
+    'HEXISTS', 'HGET', 'HGETALL', 'HKEYS', 'HLEN', 'HMGET', 'HVALS',
+    'LINDEX', 'LLEN', 'LRANGE',
+    'SCARD', 'SISMEMBER', 'SMEMBERS',
+    'ZCARD', 'ZCOUNT', 'ZRANGE', 'ZRANGEBYSCORE', 'ZRANK', 'ZREVRANGE',
+    'ZREVRANGEBYSCORE', 'ZREVRANK', 'ZSCORE'
+])
+
+
+class RetryPolicy(object):
+    """The policy of retrying transactions which have met conflicts.
+    The default policy retries immediately and endlessly.
+
+    Delays grow exponentially from ``backoff`` by ``multiplier`` up to
+    ``max_backoff``, and if ``jitter`` is ``True`` a random delay
+    between zero and that is taken instead, so that clients which
+    have conflicted with each other don't retry at the same time.
+
+    :param max_attempts: the maximum number of attempts including
+                         the first one.  ``None`` means no limit.
+                         default is ``None``
+    :type max_attempts: :class:`numbers.Integral`
+    :param backoff: seconds to wait before the first retry.
+                    default is 0
+    :type backoff: :class:`numbers.Real`
+    :param multiplier: how much the delay grows every retry.
+                       default is 2
+    :type multiplier: :class:`numbers.Real`
+    :param max_backoff: the maximum seconds to wait before a retry.
+                        default is 1
+    :type max_backoff: :class:`numbers.Real`
+    :param jitter: whether to randomize delays.  default is ``True``
+    :type jitter: :class:`bool`
+    :param deadline: seconds since the first attempt after which
+                     it doesn't retry anymore.  ``None`` means no limit.
+                     default is ``None``
+    :type deadline: :class:`numbers.Real`
+
+    """
+
+    def __init__(self, max_attempts=None, backoff=0, multiplier=2,
+                 max_backoff=1, jitter=True, deadline=None):
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError('max_attempts must be 1 or more, not ' +
+                             repr(max_attempts))
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def delay(self, failures, elapsed):
+        """Decides how long to wait before the next attempt.
+
+        :param failures: the number of failed attempts so far
+        :type failures: :class:`numbers.Integral`
+        :param elapsed: seconds since the first attempt
+        :type elapsed: :class:`numbers.Real`
+        :returns: seconds to wait, or ``None`` if it gives up
+        :rtype: :class:`numbers.Real`
+
+        """
+        if self.max_attempts is not None and failures >= self.max_attempts:
+            return None
+        deadline = self.deadline
+        if deadline is not None and elapsed >= deadline:
+            return None
+        if not self.backoff:
+            return 0
+        delay = min(self.max_backoff,
+                    self.backoff * self.multiplier ** (failures - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if deadline is not None:
+            delay = min(delay, deadline - elapsed)
+        return delay
+
+    def __repr__(self):
+        cls = type(self)
+        return ('{0}.{1}(max_attempts={2!r}, backoff={3!r}, multiplier={4!r}, '
+                'max_backoff={5!r}, jitter={6!r}, deadline={7!r})').format(
+            cls.__module__, cls.__name__, self.max_attempts, self.backoff,
+            self.multiplier, self.max_backoff, self.jitter, self.deadline
+        )
+
+
+class KeyLocks(object):
+    """The in-process lock table of keys.  If a session has it,
+    transactions lock keys they watch until they end, so that concurrent
+    transactions of the same process on the same keys are serialized
+    before they reach Redis and don't conflict with each other.  Only
+    conflicts with other processes cost retries then::
+
+        session = Session(client, locks=KeyLocks())
+
+    It can be shared by several sessions of the same Redis server.
+
+    Transactions never wait for more keys while holding some, but
+    release them and then wait for all of them at once instead,
+    so that it can't deadlock.  On retries keys watched by the previous
+    attempt are locked in advance.
+
+    """
+
+    #: (:class:`dict`) The owners (usually :class:`Transaction` objects)
+    #: of locked keys.
+    owners = None
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.owners = {}
+
+    def acquire(self, owner, keys, blocking=True):
+        """Locks all ``keys`` at once.  Keys the ``owner`` has already
+        locked are ignored.
+
+        :param owner: the object which will own locks
+        :param keys: keys to lock
+        :type keys: :class:`collections.Iterable`
+        :param blocking: whether to wait until other owners release
+                         them.  default is ``True``
+        :type blocking: :class:`bool`
+        :returns: whether they've been locked.  it's always ``True``
+                  if ``blocking`` is ``True``
+        :rtype: :class:`bool`
+
+        """
+        keys = frozenset(keys)
+        owners = self.owners
+        with self.condition:
+            while any(owners.get(key, owner) is not owner for key in keys):
+                if not blocking:
+                    return False
+                self.condition.wait()
+            for key in keys:
+                owners[key] = owner
+        return True
+
+    def release(self, owner, keys):
+        """Unlocks ``keys`` the ``owner`` has locked.
+
+        :param owner: the object which owns locks
+        :param keys: keys to unlock
+        :type keys: :class:`collections.Iterable`
+
+        """
+        owners = self.owners
+        with self.condition:
+            for key in keys:
+                if owners.get(key) is owner:
+                    del owners[key]
+            self.condition.notify_all()
+
+
+class ConflictSnapshot(collections.namedtuple('ConflictSnapshot',
+                                              'keys retries failed_time '
+                                              'aborted')):
+    """The snapshot of :class:`ConflictStats`.
+
+    .. attribute:: keys
+
+       (:class:`dict`) The number of conflicts of each key.
+       Since Redis doesn't tell which watched key has been changed,
+       a conflict is counted for every key the transaction watched.
+
+    .. attribute:: retries
+
+       (:class:`dict`) The histogram of retries.
+       Its keys are the numbers of retries a transaction took until
+       it finished, and values are the numbers of such transactions.
+       For example, ``{0: 98, 1: 2}`` means 98 transactions were
+       committed at once and 2 transactions were retried once.
+
+    .. attribute:: failed_time
+
+       (:class:`numbers.Real`) The total seconds spent in failed
+       attempts.
+
+    .. attribute:: aborted
+
+       (:class:`numbers.Integral`) The number of transactions given up
+       by the :class:`RetryPolicy`.
+
+    """
+
+    __slots__ = ()
+
+
+class ConflictStats(object):
+    """Aggregates conflicts of transactions.  It's thread-safe.
+
+    .. seealso::
+
+       Property :attr:`Session.conflicts
+       <sider.session.Session.conflicts>`
+
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def conflict(self, keys, elapsed):
+        """Records a failed attempt.
+
+        :param keys: the keys the attempt watched
+        :type keys: :class:`collections.Iterable`
+        :param elapsed: seconds the attempt took
+        :type elapsed: :class:`numbers.Real`
+
+        """
+        with self.lock:
+            counts = self.keys
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+            self.failed_time += elapsed
+
+    def finish(self, retries, aborted=False):
+        """Records a finished transaction.
+
+        :param retries: the number of retries it took
+        :type retries: :class:`numbers.Integral`
+        :param aborted: whether it was given up.  default is ``False``
+        :type aborted: :class:`bool`
+
+        """
+        with self.lock:
+            self.retries[retries] = self.retries.get(retries, 0) + 1
+            if aborted:
+                self.aborted += 1
+
+    def snapshot(self):
+        """Makes the snapshot of the current numbers.
+
+        :returns: the snapshot
+        :rtype: :class:`ConflictSnapshot`
+
+        """
+        with self.lock:
+            return ConflictSnapshot(dict(self.keys), dict(self.retries),
+                                    self.failed_time, self.aborted)
+
+    def reset(self):
+        """Resets all numbers to zero.
+
+        :returns: the snapshot of the numbers before reset
+        :rtype: :class:`ConflictSnapshot`
+
+        """
+        snapshot = None
+        with self.lock:
+            if hasattr(self, 'keys'):
+                snapshot = ConflictSnapshot(self.keys, self.retries,
+                                            self.failed_time, self.aborted)
+            self.keys = {}
+            self.retries = {}
+            self.failed_time = 0.0
+            self.aborted = 0
+        return snapshot
+
+
+class Future(object):
+    """The result of a command queued during the commit phase of
+    a transaction.  Commands sent through :attr:`Session.client
+    <sider.session.Session.client>` after the commit phase began
+    return it, and it's resolved when the transaction is committed::
+
+        for trial in session.transaction:
+            hash_['counter'] = int(hash_['counter']) + 1
+            pushed = session.client.rpush('list', 'value')
+            removed = session.client.hdel('hash', 'field')
+        print(pushed.result)   # the new length of the list
+        print(removed.result)  # whether the field was removed
+
+    """
+
+    __slots__ = 'done', 'value'
+
+    def __init__(self):
+        #: (:class:`bool`) Whether it has been resolved.
+        self.done = False
+        self.value = None
+
+    def resolve(self, value):
+        """Sets the reply of the command.
+
+        .. note::
+
+           It's totally for internal use.
+
+        """
+        self.value = value
+        self.done = True
+
+    @property
+    def result(self):
+        """The reply of the command.
+
+        :raises sider.exceptions.NotCommittedError:
+           when the transaction hasn't been committed yet, or
+           the attempt which queued the command has met conflicts
+
+        """
+        if not self.done:
+            raise NotCommittedError('the transaction has not been committed '
+                                    'yet; the result is not available')
+        return self.value
+
+    def __repr__(self):
+        cls = type(self)
+        if self.done:
+            return '<{0}.{1} {2!r}>'.format(cls.__module__, cls.__name__,
+                                            self.value)
+        return '<{0}.{1} (pending)>'.format(cls.__module__, cls.__name__)
+
+
 class Transaction(object):
     """Transaction block.
 
     :param session: a session object
     :type session: :class:`~sider.session.Session`
-    :param keys: the list of keys
+    :param keys: the list of keys.  if it's a mapping of keys to
+                 their value types, these are prefetched for every
+                 attempt.  see also :meth:`prefetch()`
     :type keys: :class:`collections.Iterable`
+    :param retry_policy: the policy of retrying on conflicts.
+                         :attr:`Session.retry_policy
+                         <sider.session.Session.retry_policy>`
+                         by default
+    :type retry_policy: :class:`RetryPolicy`
 
     """
 
-    def __init__(self, session, keys=frozenset()):
+    #: (:class:`dict`) The results of :data:`READ_COMMANDS` on watched
+    #: keys during the query phase.  Reading the same thing again is
+    #: served from it without any round trips.  It's emptied for every
+    #: attempt, and when any other command is sent.
+    reads = None
+
+    #: (:class:`list`) :class:`Future` objects of commands queued during
+    #: the commit phase, with their indices in the pipeline.
+    futures = None
+
+    #: (:class:`set`) Keys locked by the transaction in the
+    #: :attr:`Session.locks <sider.session.Session.locks>` table.
+    locked_keys = None
+
+    #: (:class:`dict`) The whole values of keys read by :meth:`prefetch()`
+    #: in the current attempt.  Keys are Redis keys and values are plain
+    #: Python values e.g. :class:`dict` for :class:`~sider.types.Hash`.
+    snapshot = None
+
+    def __init__(self, session, keys=frozenset(), retry_policy=None):
         if not isinstance(session, lazyimport.session.Session):
             raise TypeError('session must be a sider.session.Session instance'
                             ', not ' + repr(session))
         self.session = session
         self.keys = set(keys)
         self.initial_keys = frozenset(keys)
+        self.pending_keys = set()
+        self.reads = {}
+        self.futures = []
+        self.snapshot = {}
+        self.locked_keys = set()
+        if isinstance(keys, collections.Mapping):
+            self.initial_value_types = dict(keys)
+        else:
+            self.initial_value_types = None
         self.commit_phase = False
+        if retry_policy is None:
+            retry_policy = session.retry_policy
+        self.retry_policy = retry_policy
 
     def __enter__(self):
         context = self.session.context_locals
@@ -105,31 +482,47 @@ class Transaction(object):
                 repr(self.session) + self.format_enter_stack()
             )
         context['transaction'] = self
-        client = self.session.client
-        context['original_client'] = client
-        self.session.client = client.pipeline()
+        pipe = self.session.client.pipeline()
+        pipe.execute_command = self._wrap_execute_command(pipe)
+        self.reads = {}
+        self.futures = []
+        self.snapshot = {}
+        context['client'] = pipe
+        # Keys watched by the previous attempt are probably watched
+        # again, so these are locked at once in advance.
+        self.lock(self.keys | self.initial_keys)
         self.watch(self.initial_keys, initialize=True)
         if self.session.verbose_transaction_error:
             self.enter_stack = traceback.format_stack()
+        if self.initial_value_types:
+            self.prefetch(self.initial_value_types)
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         try:
             if exc_value is None:
                 try:
-                    self.session.client.execute()
+                    results = self._commit(self.session.client)
                 except WatchError:
                     self.session.client.reset()
                     raise ConflictError('the transaction has met conflicts; '
                                         'retry')
+                for index, future in self.futures:
+                    future.resolve(results[index])
             else:
                 self.session.client.reset()
         finally:
             self.commit_phase = False
+            if self.locked_keys:
+                self.session.locks.release(self, self.locked_keys)
+                self.locked_keys = set()
+            if self.session.cache is not None:
+                self.session.cache.invalidate(self.keys)
             context = self.session.context_locals
             context['transaction'] = None
-            self.session.client = context['original_client']
-            del context['original_client']
+            context['client'] = None
+            if context['route'] is None:
+                context.release()
 
     def __iter__(self):
         """You can more explictly execute (and retry) a routine in
@@ -146,18 +539,42 @@ class Transaction(object):
 
         :raises sider.exceptions.DoubleTransactionError:
            when any transaction has already being executed for a session
+        :raises sider.exceptions.RetryLimitError:
+           when the :attr:`retry_policy` gives up retrying
 
         """
         transaction = self.session.current_transaction
         if transaction is None:
+            policy = self.retry_policy
+            stats = self.session.conflict_stats
+            adaptive = self.session.adaptive_scripting
+            timer = default_timer
+            started_at = timer()
             trial = 0
             while 1:
+                attempted_at = timer()
                 try:
                     with self:
                         yield trial
                 except ConflictError:
+                    now = timer()
+                    stats.conflict(self.keys, now - attempted_at)
+                    if adaptive is not None:
+                        adaptive.record(self.keys, True)
                     trial += 1
+                    delay = policy.delay(trial, now - started_at)
+                    if delay is None:
+                        stats.finish(trial - 1, aborted=True)
+                        raise RetryLimitError(
+                            'the transaction has met conflicts {0} time(s) '
+                            'and given up retrying'.format(trial)
+                        )
+                    elif delay > 0:
+                        time.sleep(delay)
                     continue
+                stats.finish(trial)
+                if adaptive is not None:
+                    adaptive.record(self.keys, False)
                 break
         else:
             raise DoubleTransactionError(
@@ -176,8 +593,22 @@ class Transaction(object):
                       see the signature explained in the below:
                       :func:`block()`
         :type block: :class:`collections.Callable`
-        :param keys: a list of keys to watch
-        :type keys: :class:`collections.Iterable`
+        :param keys: a list of keys to watch.  if it's a mapping of
+                     keys to their value types, their whole values are
+                     read in the same round trip with :redis:`WATCH`
+                     and available through :attr:`snapshot`::
+
+                         def block(trial, transaction):
+                             count = transaction.snapshot['count']
+                             names = transaction.snapshot['names']
+                             session.set('count', count + len(names),
+                                         Integer)
+                         transaction(block, {'count': Integer,
+                                             'names': Set})
+
+                     see also :meth:`prefetch()`
+        :type keys: :class:`collections.Iterable`,
+                    :class:`collections.Mapping`
         :param ignore_double: don't raise any error even
                               if any transaction has already being
                               executed for a session.
@@ -195,15 +626,23 @@ class Transaction(object):
            :type transaction: :class:`~sider.transaction.Transaction`
 
         """
+        prefetch = isinstance(keys, collections.Mapping)
         try:
             for trial in self:
-                self.watch(keys)
+                if prefetch:
+                    self.prefetch(keys)
+                else:
+                    self.watch(keys)
                 block(trial, self)
         except DoubleTransactionError:
             if ignore_double:
                 t = self.session.current_transaction
-                t.watch(keys)
-                block(0, None)
+                if prefetch:
+                    t.prefetch(keys)
+                    block(0, t)
+                else:
+                    t.watch(keys)
+                    block(0, None)
             else:
                 raise
         except:
@@ -220,6 +659,10 @@ class Transaction(object):
     def watch(self, keys, initialize=False):
         """Watches more ``keys``.
 
+        Keys aren't watched immediately, but collected and then
+        sent by a :redis:`WATCH` command in the same round trip with
+        the next query, or right before the commit phase begins.
+
         :param keys: a set of keys to watch more
         :type keys: :class:`collections.Iterable`
         :param initialize: initializes the set of watched keys
@@ -236,12 +679,158 @@ class Transaction(object):
         keys = set(keys)
         if initialize:
             self.keys = keys
+            self.pending_keys = set(keys)
         else:
             keys -= self.keys
+            self.keys |= keys
+            self.pending_keys |= keys
+        self.lock(keys)
+
+    def lock(self, keys):
+        """Locks ``keys`` in the :attr:`Session.locks
+        <sider.session.Session.locks>` table until the transaction ends.
+        It does nothing if the session has no lock table.
+
+        :param keys: keys to lock
+        :type keys: :class:`collections.Iterable`
+
+        .. note::
+
+           It's totally for internal use.
+
+        """
+        locks = self.session.locks
+        if locks is None:
+            return
+        keys = set(keys) - self.locked_keys
+        if not keys:
+            return
+        elif not locks.acquire(self, keys, blocking=not self.locked_keys):
+            # Waiting for more keys while holding some could deadlock,
+            # so these are released and then all are locked at once.
+            locks.release(self, self.locked_keys)
+            keys |= self.locked_keys
+            self.locked_keys = set()
+            locks.acquire(self, keys)
+        self.locked_keys |= keys
+
+    def flush_watch(self):
+        """Sends a :redis:`WATCH` command of keys which have been
+        collected by :meth:`watch()` but not watched yet.
+
+        .. note::
+
+           It's totally for internal use.
+
+        """
+        keys = self.pending_keys
         if keys:
+            self.pending_keys = set()
             self.session.client.watch(*keys)
-        if not initialize:
-            self.keys |= keys
+
+    def prefetch(self, value_types):
+        """Watches keys of ``value_types`` and reads their whole values
+        in the same round trip with the :redis:`WATCH` command, so that
+        a transaction which knows all keys it reads up front takes only
+        two round trips however many it reads: this and :redis:`EXEC`.
+
+        Read values are stored into :attr:`snapshot`.  Raw results are
+        also stored into :attr:`reads`, so reading the whole values again
+        through Sider objects doesn't need any round trips either.
+
+        :param value_types: the mapping of keys to their value types
+                            e.g. ``{'names': List, 'count': Integer}``
+        :type value_types: :class:`collections.Mapping`
+        :returns: the :attr:`snapshot`
+        :rtype: :class:`dict`
+        :raises sider.exceptions.CommitError:
+           when it is tried during commit phase
+
+        """
+        if self.commit_phase:
+            raise CommitError('prefetch() was tried during commit phase' +
+                              self.format_commit_stack())
+        session = self.session
+        value_types = dict((key, session.ensure_value_type(value_type))
+                           for key, value_type in value_types.items())
+        # Commands are queued to a throwaway pipeline only to get
+        # their arguments as redis-py makes.
+        stack = session.basic_client.pipeline(transaction=False)
+        for key, value_type in value_types.items():
+            command, args, options = value_type.snapshot_query(key)
+            getattr(stack, command)(*args, **options)
+        commands = stack.command_stack
+        self.watch(value_types)
+        keys = self.pending_keys
+        self.pending_keys = set()
+        results = _execute_watching(session.client, keys, commands)
+        for (key, value_type), (args, options), result in zip(
+                value_types.items(), commands, results):
+            if isinstance(result, Exception):
+                # Errors e.g. WRONGTYPE are left to be raised by the actual
+                # query.
+                self.snapshot.pop(key, None)
+                continue
+            entry = args, tuple(sorted(options.items()))
+            self.reads[entry] = copy.copy(result)
+            self.snapshot[key] = value_type.snapshot_value(result)
+        return self.snapshot
+
+    def _commit(self, pipe):
+        return pipe.execute()
+
+    def _wrap_execute_command(self, pipe):
+        """Makes the ``execute_command()`` method of the ``pipe`` which
+        does the following things during the query phase:
+
+        - It prepends the :redis:`WATCH` command of :attr:`pending_keys`
+          to the next command, so that both are sent in a round trip.
+        - It serves repeated :data:`READ_COMMANDS` on watched keys from
+          :attr:`reads`.  Since these keys are watched, the commit fails
+          anyway if they have been changed meanwhile.
+
+        During the commit phase, it returns a :class:`Future` for each
+        queued command instead of the pipeline.
+
+        """
+        execute_command = pipe.execute_command
+        def wrapped_execute_command(*args, **options):
+            name = args[0]
+            if pipe.explicit_transaction:
+                index = len(pipe.command_stack)
+                execute_command(*args, **options)
+                future = Future()
+                self.futures.append((index, future))
+                return future
+            elif name == 'WATCH':
+                return execute_command(*args, **options)
+            elif name not in READ_COMMANDS:
+                self.reads.clear()
+            elif len(args) > 1 and args[1] in self.keys:
+                entry = args, tuple(sorted(options.items()))
+                try:
+                    return copy.copy(self.reads[entry])
+                except KeyError:
+                    pass
+                except TypeError:  # unhashable arguments
+                    entry = None
+                result = self._execute_command(pipe, execute_command,
+                                               args, options)
+                if entry is not None:
+                    self.reads[entry] = copy.copy(result)
+                return result
+            return self._execute_command(pipe, execute_command, args, options)
+        return wrapped_execute_command
+
+    def _execute_command(self, pipe, execute_command, args, options):
+        keys = self.pending_keys
+        if not keys:
+            return execute_command(*args, **options)
+        self.pending_keys = set()
+        result, = _execute_watching(pipe, keys, [(args, options)])
+        if isinstance(result, Exception):
+            raise result
+        return result
 
     def begin_commit(self, _stacklevel=1):
         """Explicitly marks the transaction beginning to commit from this.
@@ -256,6 +845,8 @@ class Transaction(object):
                           category=TransactionWarning,
                           stacklevel=1 + _stacklevel)
             return
+        self.flush_watch()
+        self.reads.clear()
         self.commit_phase = True
         if self.session.verbose_transaction_error:
             self.commit_stack = traceback.format_stack()
@@ -326,6 +917,112 @@ class Transaction(object):
         return ''
 
 
+class Atomic(Transaction):
+    """The write-only batch which atomically commits manipulative
+    operations by :redis:`MULTI`/:redis:`EXEC` without :redis:`WATCH`.
+    It has no query phase and is never retried, so it's cheaper than
+    :class:`Transaction` when operations don't depend on what they read::
+
+        with session.atomic():
+            hash_['name'] = 'value'
+            index.add('name')
+
+    Any query operations inside it raise
+    :exc:`~sider.exceptions.CommitError`.  It can't be iterated nor
+    called unlike :class:`Transaction`.
+
+    If the session has a :attr:`~sider.session.Session.group_commit`,
+    it's committed together with batches of other threads in a round trip.
+    See also :mod:`sider.groupcommit`.
+
+    :param session: a session object
+    :type session: :class:`~sider.session.Session`
+
+    .. seealso::
+
+       Method :meth:`Session.atomic() <sider.session.Session.atomic>`
+
+    """
+
+    __iter__ = None
+
+    def __enter__(self):
+        super(Atomic, self).__enter__()
+        self.begin_commit()
+        return self
+
+    def _commit(self, pipe):
+        group_commit = self.session.group_commit
+        if group_commit is None:
+            return pipe.execute()
+        commands = pipe.command_stack
+        pipe.reset()
+        try:
+            return group_commit.commit(commands)
+        finally:
+            self.session.invalidate_written()
+
+    def __call__(self, block, keys=frozenset(), ignore_double=False):
+        raise TypeError('{0} cannot be called; use it as a context '
+                        'manager'.format(type(self).__name__))
+
+    def watch(self, keys, initialize=False):
+        """It doesn't watch ``keys`` but only remembers them, so that
+        their cached results are invalidated when it's committed.
+
+        """
+        if initialize:
+            self.keys = set(keys)
+        else:
+            self.keys.update(keys)
+
+
+def _execute_watching(pipe, keys, commands):
+    """Sends :redis:`WATCH` of the ``keys`` (if any) and ``commands``,
+    a list of ``(args, options)`` pairs, through the ``pipe`` in
+    a round trip, and then returns the list of results of the latter.
+    Error replies are returned as exceptions instead of being raised.
+
+    """
+    packed = [args for args, _ in commands]
+    if keys:
+        packed.insert(0, ('WATCH',) + tuple(keys))
+    connection = pipe.connection
+    if connection is None:
+        connection = pipe.connection_pool.get_connection('WATCH',
+                                                         pipe.shard_hint)
+        pipe.connection = connection
+    record = getattr(pipe, 'sider_record', None)
+    if record is not None and record.instruments:
+        recorded = [Command.from_args(args) for args in packed]
+        started_at = default_timer()
+    else:
+        record = None
+    try:
+        connection.send_packed_command(connection.pack_commands(packed))
+        results = []
+        try:
+            if keys:
+                pipe.parse_response(connection, 'WATCH')
+        finally:
+            # Replies of the commands have to be read anyway.
+            for args, options in commands:
+                try:
+                    result = pipe.parse_response(connection, args[0],
+                                                 **options)
+                except ResponseError as e:
+                    result = e
+                results.append(result)
+        return results
+    except ConnectionError:
+        connection.disconnect()
+        pipe.reset()
+        raise
+    finally:
+        if record is not None:
+            record(recorded, default_timer() - started_at)
+
+
 def manipulative(function):
     """The decorator that marks the method manipulative.
 
@@ -337,9 +1034,13 @@ def manipulative(function):
     """
     @functools.wraps(function)
     def marked(self, *args, **kwargs):
-        self.session.mark_manipulative([self.key] if hasattr(self, 'key')
-                                                  else [])
-        return function(self, *args, **kwargs)
+        session = self.session
+        session.mark_manipulative([self.key] if hasattr(self, 'key') else [])
+        with session.route(False):
+            result = function(self, *args, **kwargs)
+        if inspect.isgenerator(result):
+            return _routed(session, False, result)
+        return result
     return marked
 
 
@@ -354,7 +1055,27 @@ def query(function):
     """
     @functools.wraps(function)
     def marked(self, *args, **kwargs):
-        self.session.mark_query([self.key] if hasattr(self, 'key') else [])
-        return function(self, *args, **kwargs)
+        session = self.session
+        session.mark_query([self.key] if hasattr(self, 'key') else [])
+        with session.route(True):
+            result = function(self, *args, **kwargs)
+        if inspect.isgenerator(result):
+            return _routed(session, True, result)
+        return result
     return marked
 
+
+def _routed(session, query, generator):
+    """Makes the ``generator`` to be resumed in the :meth:`Session.route()
+    <sider.session.Session.route>` context, so that commands sent by lazy
+    iterators are also routed.
+
+    """
+    while True:
+        with session.route(query):
+            try:
+                value = next(generator)
+            except StopIteration:
+                return
+        yield value
+
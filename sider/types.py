@@ -15,20 +15,119 @@ into Python :class:`int` ``3``.
 .. todo::
 
    - :class:`Complex` that takes :class:`complex`.
-   - :class:`Real` that takes real numbers (:class:`numbers.Real`).
 
    Anything more?
 
 """
 from __future__ import absolute_import
 import sys
+import io
 import re
 import collections
 import numbers
+import struct
 import datetime
 import uuid
+import json
+import pickle
+import zlib
 from .lazyimport import list, set, sortedset
-from .datetime import UTC, FixedOffset
+from .datetime import UTC, fixed_offset
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _parse_canonical(bulk, size, separators, parse):
+    """Parses the ``bulk`` in the canonical format which Sider writes
+    without regular expressions: ``size`` bytes optionally followed by
+    6 digits of microseconds, and then optionally a time zone (``Z`` or
+    ``+HH:MM``).  The first ``size`` bytes have to be digits except for
+    the ``separators``, a sequence of ``(offset, byte)`` pairs.  The bytes
+    except for the time zone and its :class:`~datetime.tzinfo` are passed
+    to ``parse``.  It returns ``None`` if the ``bulk`` isn't in the format.
+
+    """
+    length = len(bulk)
+    tzinfo = None
+    if bulk[-1:] == b'Z':
+        tzinfo = UTC
+        length -= 1
+    elif length in (size + 6, size + 13):
+        sign = bulk[-6:-5]
+        if (sign not in (b'+', b'-') or bulk[-3:-2] != b':' or
+                not bulk[-5:-3].isdigit() or not bulk[-2:].isdigit()):
+            return None
+        minutes = int(bulk[-5:-3]) * 60 + int(bulk[-2:])
+        tzinfo = fixed_offset(-minutes if sign == b'-' else minutes)
+        length -= 6
+    if length == size + 7:
+        if (bulk[size:size + 1] != b'.' or
+                not bulk[size + 1:length].isdigit()):
+            return None
+    elif length != size:
+        return None
+    for offset, separator in separators:
+        if bulk[offset:offset + 1] != separator:
+            return None
+    digits = bulk[:size].translate(None, b'-:T')
+    if len(digits) != size - len(separators) or not digits.isdigit():
+        return None
+    try:
+        return parse(bulk[:length] if length < len(bulk) else bulk, tzinfo)
+    except ValueError:
+        return None
+
+
+#: The separators of the canonical datetime format, e.g.
+#: ``2012-03-28T09:21:34``.
+_DATETIME_SEPARATORS = ((4, b'-'), (7, b'-'), (10, b'T'), (13, b':'),
+                        (16, b':'))
+
+#: The separators of the canonical time format, e.g. ``09:21:34``.
+_TIME_SEPARATORS = ((2, b':'), (5, b':'))
+
+
+if hasattr(datetime.datetime, 'fromisoformat'):  # Python 3.7+
+    # _parse_canonical() has already checked the whole shape, so that
+    # fromisoformat() never gets what the regular expressions reject.
+    # Note that datetime.replace() is slower than making a new datetime.
+    def _parse_datetime(bulk, tzinfo):
+        d = datetime.datetime.fromisoformat(bulk.decode('ascii'))
+        if tzinfo is None:
+            return d
+        return datetime.datetime(d.year, d.month, d.day, d.hour, d.minute,
+                                 d.second, d.microsecond, tzinfo)
+
+    def _parse_time(bulk, tzinfo):
+        t = datetime.time.fromisoformat(bulk.decode('ascii'))
+        if tzinfo is None:
+            return t
+        return datetime.time(t.hour, t.minute, t.second, t.microsecond,
+                             tzinfo)
+else:
+    def _parse_datetime(bulk, tzinfo):
+        return datetime.datetime(int(bulk[0:4]), int(bulk[5:7]),
+                                 int(bulk[8:10]), int(bulk[11:13]),
+                                 int(bulk[14:16]), int(bulk[17:19]),
+                                 int(bulk[20:26] or 0), tzinfo)
+
+    def _parse_time(bulk, tzinfo):
+        return datetime.time(int(bulk[0:2]), int(bulk[3:5]), int(bulk[6:8]),
+                             int(bulk[9:15] or 0), tzinfo)
+
+
+def _overrides(value_type, cls, name):
+    """Whether the class of ``value_type`` overrides the method of
+    ``name`` defined by ``cls``.  Specialized :meth:`Bulk.encode_many()`
+    and :meth:`Bulk.decode_many()` implementations fall back to the
+    generic ones if subclasses override :meth:`Bulk.encode()` or
+    :meth:`Bulk.decode()`.
+
+    """
+    return getattr(type(value_type), name) != getattr(cls, name)
 
 
 class Value(object):
@@ -208,6 +307,76 @@ class Value(object):
             'implemented'.format(cls.__module__, cls.__name__)
         )
 
+    def load_values(self, session, keys):
+        """How to load the values from the given Redis ``keys`` at once.
+        Subclasses can override it to reduce round trips.  By default
+        it simply calls :meth:`load_value()` for each key.
+
+        :param session: the session object that stores the given ``keys``
+        :type session: :class:`sider.session.Session`
+        :param keys: the key names to load
+        :type keys: :class:`collections.Sequence`
+        :returns: the list of Python representations of the loaded values,
+                  in the same order to ``keys``
+        :rtype: :class:`list`
+
+        """
+        return [self.load_value(session, key) for key in keys]
+
+    def save_values(self, session, pairs):
+        """How to save the given ``(key, value)`` ``pairs`` at once.
+        Subclasses can override it to reduce round trips.  By default
+        it simply calls :meth:`save_value()` for each pair.
+
+        :param session: the session object going to store
+                        the given ``pairs``
+        :type session: :class:`sider.session.Session`
+        :param pairs: the sequence of ``(key, value)`` pairs to save
+        :type pairs: :class:`collections.Sequence`
+        :returns: the list of Python representations of the saved values,
+                  in the same order to ``pairs``
+        :rtype: :class:`list`
+
+        """
+        return [self.save_value(session, key, value) for key, value in pairs]
+
+    def snapshot_query(self, key):
+        """The query command to read the whole value of the given
+        Redis ``key`` at once, which :meth:`Transaction.prefetch()
+        <sider.transaction.Transaction.prefetch>` sends.  Subclasses
+        have to implement it.  By default it raises
+        :exc:`~exceptions.NotImplementedError`.
+
+        :param key: the key name to read
+        :type key: :class:`str`
+        :returns: a ``(command, args, options)`` tuple where ``command``
+                  is the method name of the Redis client e.g.
+                  ``'hgetall'``
+        :rtype: :class:`tuple`
+
+        """
+        cls = type(self)
+        raise NotImplementedError(
+            '{0}.{1}.snapshot_query() method must be '
+            'implemented'.format(cls.__module__, cls.__name__)
+        )
+
+    def snapshot_value(self, result):
+        """Decodes the ``result`` of the :meth:`snapshot_query()` into
+        a plain Python value e.g. :class:`dict` for :class:`Hash`.
+        Subclasses have to implement it.  By default it raises
+        :exc:`~exceptions.NotImplementedError`.
+
+        :param result: the result of the :meth:`snapshot_query()`
+        :returns: the Python representation of the whole value
+
+        """
+        cls = type(self)
+        raise NotImplementedError(
+            '{0}.{1}.snapshot_value() method must be '
+            'implemented'.format(cls.__module__, cls.__name__)
+        )
+
     def __hash__(self):
         return hash(type(self))
 
@@ -249,20 +418,46 @@ class Hash(Value):
         return Hash(session, key,
                     key_type=self.key_type, value_type=self.value_type)
 
+    def load_values(self, session, keys):
+        session.prefetch((key, 'hgetall', (key,), {}) for key in keys)
+        return [self.load_value(session, key) for key in keys]
+
     def save_value(self, session, key, value):
-        if not isinstance(value, collections.Mapping):
-            raise TypeError('expected a mapping object, not ' + repr(value))
+        return self.save_values(session, [(key, value)])[0]
+
+    def save_values(self, session, pairs):
         from .hash import Hash
-        obj = Hash(session, key,
-                   key_type=self.key_type, value_type=self.value_type)
-        if value:
-            pipe = session.client.pipeline()
+        objs = []
+        pipe = session.client.pipeline()
+        for key, value in pairs:
+            if not isinstance(value, collections.Mapping):
+                raise TypeError('expected a mapping object, not ' +
+                                repr(value))
+            obj = Hash(session, key,
+                       key_type=self.key_type, value_type=self.value_type)
             pipe.delete(key)
             obj._raw_update(value, pipe)
-            pipe.execute()
-        else:
-            session.client.delete(key)
-        return obj
+            objs.append(obj)
+        pipe.execute()
+        return objs
+
+    def snapshot_query(self, key):
+        return 'hgetall', (key,), {}
+
+    def snapshot_value(self, result):
+        keys = self.key_type.decode_many(result)
+        values = self.value_type.decode_many(result.values())
+        return dict(zip(keys, values))
+
+    def __hash__(self):
+        return (super(Hash, self).__hash__() * hash(self.key_type) *
+                hash(self.value_type))
+
+    def __eq__(self, operand):
+        if super(Hash, self).__eq__(operand):
+            return (self.key_type == operand.key_type and
+                    self.value_type == operand.value_type)
+        return False
 
 
 class List(Value):
@@ -287,15 +482,27 @@ class List(Value):
         return list.List(session, key, value_type=self.value_type)
 
     def save_value(self, session, key, value):
-        if not isinstance(value, collections.Sequence):
-            raise TypeError('expected a list-like sequence, not ' +
-                            repr(value))
-        obj = list.List(session, key, value_type=self.value_type)
+        return self.save_values(session, [(key, value)])[0]
+
+    def save_values(self, session, pairs):
+        objs = []
         pipe = session.client.pipeline()
-        pipe.delete(key)
-        obj._raw_extend(value, pipe)
+        for key, value in pairs:
+            if not isinstance(value, collections.Sequence):
+                raise TypeError('expected a list-like sequence, not ' +
+                                repr(value))
+            obj = list.List(session, key, value_type=self.value_type)
+            pipe.delete(key)
+            obj._raw_extend(value, pipe)
+            objs.append(obj)
         pipe.execute()
-        return obj
+        return objs
+
+    def snapshot_query(self, key):
+        return 'lrange', (key, 0, -1), {}
+
+    def snapshot_value(self, result):
+        return self.value_type.decode_many(result)
 
     def __hash__(self):
         return super(List, self).__hash__() * hash(self.value_type)
@@ -326,16 +533,32 @@ class Set(Value):
     def load_value(self, session, key):
         return set.Set(session, key, value_type=self.value_type)
 
+    def load_values(self, session, keys):
+        session.prefetch((key, 'smembers', (key,), {}) for key in keys)
+        return [self.load_value(session, key) for key in keys]
+
     def save_value(self, session, key, value):
-        if not isinstance(value, collections.Set):
-            raise TypeError('expected a set-like object, not ' +
-                            repr(value))
-        obj = set.Set(session, key, value_type=self.value_type)
+        return self.save_values(session, [(key, value)])[0]
+
+    def save_values(self, session, pairs):
+        objs = []
         pipe = session.client.pipeline()
-        pipe.delete(key)
-        obj._raw_update(value, pipe)
+        for key, value in pairs:
+            if not isinstance(value, collections.Set):
+                raise TypeError('expected a set-like object, not ' +
+                                repr(value))
+            obj = set.Set(session, key, value_type=self.value_type)
+            pipe.delete(key)
+            obj._raw_update(value, pipe)
+            objs.append(obj)
         pipe.execute()
-        return obj
+        return objs
+
+    def snapshot_query(self, key):
+        return 'smembers', (key,), {}
+
+    def snapshot_value(self, result):
+        return frozenset(self.value_type.decode_many(result))
 
     def __hash__(self):
         return super(Set, self).__hash__() * hash(self.value_type)
@@ -358,44 +581,56 @@ class SortedSet(Set):
     def load_value(self, session, key):
         return sortedset.SortedSet(session, key, value_type=self.value_type)
 
+    def load_values(self, session, keys):
+        session.prefetch((key, 'zrange', (key, 0, -1), {'withscores': True})
+                         for key in keys)
+        return [self.load_value(session, key) for key in keys]
+
     def save_value(self, session, key, value):
-        if not isinstance(value, (collections.Set, collections.Mapping)):
-            raise TypeError('expected a set-like or mapping object, not ' +
-                            repr(value))
-        obj = sortedset.SortedSet(session, key, value_type=self.value_type)
+        return self.save_values(session, [(key, value)])[0]
+
+    def save_values(self, session, pairs):
         encode = self.value_type.encode
-        if session.server_version_info < (2, 4, 0):
+        old_version = session.server_version_info < (2, 4, 0)
+        objs = []
+        saves = []
+        for key, value in pairs:
+            if not isinstance(value, (collections.Set, collections.Mapping)):
+                raise TypeError('expected a set-like or mapping object, not ' +
+                                repr(value))
+            obj = sortedset.SortedSet(session, key,
+                                      value_type=self.value_type)
             if isinstance(value, collections.Mapping):
-                pairs = [
-                    (encode(el), score)
-                    for el, score in getattr(value, 'iteritems', value.items)()
-                ]
+                items = getattr(value, 'iteritems', value.items)()
+                elements = [(encode(el), score) for el, score in items]
             else:
-                pairs = [(encode(el), 1) for el in value]
-            def block(trial, transaction):
-                obj.clear()
-                zadd = session.client.zadd
-                for el, score in pairs:
-                    zadd(key, score, el)
-        else:
-            if isinstance(value, collections.Mapping):
-                items = getattr(value, 'iteritems', value.items)
-                def args():
-                    for el, score in items():
-                        yield score
-                        yield encode(el)
+                elements = [(encode(el), 1) for el in value]
+            if old_version:
+                args = elements
             else:
-                def args():
-                    for el in value:
-                        yield 1
-                        yield encode(el)
-            args = tuple(args())
-            def block(trial, transaction):
+                args = tuple(arg for el, score in elements
+                             for arg in (score, el))
+            objs.append(obj)
+            saves.append((obj, args))
+        def block(trial, transaction):
+            for obj, args in saves:
                 obj.clear()
-                if args:
-                    session.client.zadd(key, *args)
-        session.transaction(block, [key], ignore_double=True)
-        return obj
+                zadd = session.client.zadd
+                if old_version:
+                    for el, score in args:
+                        zadd(obj.key, score, el)
+                elif args:
+                    zadd(obj.key, *args)
+        session.transaction(block, [obj.key for obj in objs],
+                            ignore_double=True)
+        return objs
+
+    def snapshot_query(self, key):
+        return 'zrange', (key, 0, -1), {'withscores': True}
+
+    def snapshot_value(self, result):
+        elements = self.value_type.decode_many(el for el, _ in result)
+        return dict(zip(elements, (score for _, score in result)))
 
 
 class Bulk(Value):
@@ -438,15 +673,69 @@ class Bulk(Value):
             'implemented'.format(cls.__module__, cls.__name__)
         )
 
+    def encode_many(self, values):
+        """Encodes Python ``values`` into Redis bulks at once.
+        Containers e.g. :class:`sider.set.Set` use this instead of
+        calling :meth:`encode()` for each value.  By default it simply
+        calls :meth:`encode()` for each value, and subclasses can
+        override it to avoid the overhead of method calls.
+
+        :param values: Python values to encode into Redis bulks
+        :type values: :class:`collections.Iterable`
+        :returns: the list of encoded Redis bulks in the same order
+        :rtype: :class:`list`
+        :raises exceptions.TypeError:
+           if the type of any of the given values is not acceptable
+           by this type
+
+        """
+        encode = self.encode
+        return [encode(value) for value in values]
+
+    def decode_many(self, bulks):
+        """Decodes Redis ``bulks`` to Python objects at once.
+        Containers e.g. :class:`sider.set.Set` use this instead of
+        calling :meth:`decode()` for each bulk.  By default it simply
+        calls :meth:`decode()` for each bulk, and subclasses can
+        override it to avoid the overhead of method calls.
+
+        :param bulks: Redis bulks to decode into Python objects
+        :type bulks: :class:`collections.Iterable`
+        :returns: the list of decoded Python objects in the same order
+        :rtype: :class:`list`
+
+        """
+        decode = self.decode
+        return [decode(bulk) for bulk in bulks]
+
     def load_value(self, session, key):
-        bulk = session.client.get(key)
+        bulk = session.cached_query(key, 'get', key)
         return self.decode(bulk)
 
+    def load_values(self, session, keys):
+        return self.decode_many(session.cached_mget(keys))
+
     def save_value(self, session, key, value):
         bulk = self.encode(value)
         session.client.set(key, bulk)
         return value
 
+    def save_values(self, session, pairs):
+        if not pairs:
+            return []
+        keys = [key for key, _ in pairs]
+        values = [value for _, value in pairs]
+        session.client.mset(dict(zip(keys, self.encode_many(values))))
+        return values
+
+    def snapshot_query(self, key):
+        return 'get', (key,), {}
+
+    def snapshot_value(self, result):
+        if result is None:
+            return None
+        return self.decode(result)
+
 
 class Tuple(Bulk):
     r"""Stores tuples of fixed fields.  It can be used for
@@ -521,6 +810,214 @@ class Tuple(Bulk):
             pos += size + 1
         return tuple(values)
 
+    def encode_many(self, values):
+        if _overrides(self, Tuple, 'encode') or not self.field_types:
+            return super(Tuple, self).encode_many(values)
+        values = tuple(values)
+        fields_num = len(self.field_types)
+        for value in values:
+            if not isinstance(value, tuple) or len(value) != fields_num:
+                self.encode(value)  # raises TypeError or ValueError
+        # Fields are encoded column by column through their encode_many().
+        columns = [field.encode_many(column)
+                   for field, column in zip(self.field_types, zip(*values))]
+        encoded = []
+        for codes in zip(*columns):
+            header = b','.join(str(len(code)).encode('ascii')
+                               for code in codes)
+            encoded.append(b'\n'.join((header,) + codes))
+        return encoded
+
+    def decode_many(self, bulks):
+        if _overrides(self, Tuple, 'decode') or not self.field_types:
+            return super(Tuple, self).decode_many(bulks)
+        bulks = tuple(bulks)
+        fields_num = len(self.field_types)
+        # Fields are decoded column by column through their decode_many().
+        columns = [[] for _ in self.field_types]
+        for bulk in bulks:
+            pos = bulk.index(b'\n')
+            sizes = bulk[:pos].split(b',')
+            if len(sizes) != fields_num:
+                return super(Tuple, self).decode_many(bulks)
+            pos += 1
+            for column, size in zip(columns, sizes):
+                size = int(size)
+                column.append(bulk[pos:pos + size])
+                pos += size + 1
+        columns = [field.decode_many(column)
+                   for field, column in zip(self.field_types, columns)]
+        return [values for values in zip(*columns)]
+
+    def __hash__(self):
+        return super(Tuple, self).__hash__() * hash(self.field_types)
+
+    def __eq__(self, operand):
+        if super(Tuple, self).__eq__(operand):
+            return self.field_types == operand.field_types
+        return False
+
+
+class Compressed(Bulk):
+    r"""Wraps another :class:`Bulk` type and compresses its encoded
+    values by :mod:`zlib` if they're not smaller than ``threshold``
+    bytes.  It works wherever the ``inner_type`` works, e.g. as values
+    of :class:`Hash` and :class:`List`::
+
+        Hash(value_type=Compressed(UnicodeString))
+
+    .. sourcecode:: pycon
+
+       >>> compressed = Compressed(ByteString, threshold=16)
+       >>> compressed.encode('short')
+       '\x00short'
+       >>> len(compressed.encode('long' * 100))
+       18
+       >>> compressed.decode(compressed.encode('long' * 100)) == 'long' * 100
+       True
+
+    Every encoded value starts with a header byte which tells whether
+    the rest is compressed or not, so it can't decode values which
+    have been stored without :class:`Compressed`.
+
+    Small values don't compress well on their own.  If they're similar
+    to each other e.g. JSON objects of the same schema, give a preset
+    dictionary (``zdict``) which contains byte sequences common in
+    them.  The same dictionary has to be given to decode the values.
+
+    :param inner_type: the type of values to compress
+    :type inner_type: :class:`Bulk`, :class:`type`
+    :param level: the compression level from 0 to 9.  default is 6
+    :type level: :class:`numbers.Integral`
+    :param threshold: the minimum byte size of encoded values to compress.
+                      default is 256
+    :type threshold: :class:`numbers.Integral`
+    :param zdict: the optional preset dictionary.
+                  it requires Python 3.3 or higher
+    :type zdict: :class:`bytes`
+
+    """
+
+    #: (:class:`bytes`) The header byte of values stored as these are.
+    RAW = b'\x00'
+
+    #: (:class:`bytes`) The header byte of compressed values.
+    DEFLATED = b'\x01'
+
+    #: (:class:`Bulk`) The type of values to compress.
+    inner_type = None
+
+    #: (:class:`numbers.Integral`) The compression level from 0 to 9.
+    level = None
+
+    #: (:class:`numbers.Integral`) The minimum byte size of encoded values
+    #: to compress.
+    threshold = None
+
+    #: (:class:`bytes`) The preset dictionary.  It could be ``None``.
+    zdict = None
+
+    def __init__(self, inner_type, level=6, threshold=256, zdict=None):
+        inner_type = Bulk.ensure_value_type(inner_type,
+                                            parameter='inner_type')
+        if not 0 <= level <= 9:
+            raise ValueError('level must be from 0 to 9, not ' + repr(level))
+        elif threshold < 0:
+            raise ValueError('threshold must not be negative, not ' +
+                             repr(threshold))
+        elif zdict is not None and sys.version_info < (3, 3):
+            raise RuntimeError('zdict requires Python 3.3 or higher')
+        self.inner_type = inner_type
+        self.level = level
+        self.threshold = threshold
+        self.zdict = zdict
+
+    def encode(self, value):
+        return self.compress(self.inner_type.encode(value))
+
+    def decode(self, bulk):
+        return self.inner_type.decode(self.decompress(bulk))
+
+    def encode_many(self, values):
+        if _overrides(self, Compressed, 'encode'):
+            return super(Compressed, self).encode_many(values)
+        compress = self.compress
+        return [compress(bulk)
+                for bulk in self.inner_type.encode_many(values)]
+
+    def decode_many(self, bulks):
+        if _overrides(self, Compressed, 'decode'):
+            return super(Compressed, self).decode_many(bulks)
+        decompress = self.decompress
+        return self.inner_type.decode_many(
+            [decompress(bulk) for bulk in bulks]
+        )
+
+    def compress(self, bulk):
+        """Compresses the ``bulk`` encoded by :attr:`inner_type` if it's
+        large enough and prepends the header byte.  If the compressed
+        one isn't smaller, the ``bulk`` is stored as it is.
+
+        :param bulk: the bulk encoded by :attr:`inner_type`
+        :type bulk: :class:`bytes`
+        :returns: the bulk to store
+        :rtype: :class:`bytes`
+
+        """
+        if len(bulk) < self.threshold:
+            return self.RAW + bulk
+        if self.zdict is None:
+            compressed = zlib.compress(bulk, self.level)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED,
+                                          zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL,
+                                          zlib.Z_DEFAULT_STRATEGY, self.zdict)
+            compressed = compressor.compress(bulk) + compressor.flush()
+        if len(compressed) < len(bulk):
+            return self.DEFLATED + compressed
+        return self.RAW + bulk
+
+    def decompress(self, bulk):
+        """The inverse of :meth:`compress()`.
+
+        :param bulk: the stored bulk
+        :type bulk: :class:`bytes`
+        :returns: the bulk to be decoded by :attr:`inner_type`
+        :rtype: :class:`bytes`
+        :raises exceptions.ValueError:
+           if the ``bulk`` is not compressed by the same :attr:`zdict`,
+           or is not made by :meth:`compress()` at all
+
+        """
+        header = bulk[:1]
+        if header == self.RAW:
+            return bulk[1:]
+        elif header != self.DEFLATED:
+            raise ValueError('invalid header of compressed bulk: ' +
+                             repr(bulk[:16]))
+        try:
+            if self.zdict is None:
+                return zlib.decompress(bulk[1:])
+            decompressor = zlib.decompressobj(zdict=self.zdict)
+            return decompressor.decompress(bulk[1:]) + decompressor.flush()
+        except zlib.error as e:
+            raise ValueError('failed to decompress {0!r}: {1}'.format(
+                bulk[:16], e
+            ))
+
+    def __hash__(self):
+        return super(Compressed, self).__hash__() * hash(
+            (self.inner_type, self.level, self.threshold, self.zdict)
+        )
+
+    def __eq__(self, operand):
+        if super(Compressed, self).__eq__(operand):
+            return (self.inner_type == operand.inner_type and
+                    self.level == operand.level and
+                    self.threshold == operand.threshold and
+                    self.zdict == operand.zdict)
+        return False
+
 
 class Integer(Bulk):
     """Stores integers as decimal strings.  For example:
@@ -548,6 +1045,23 @@ class Integer(Bulk):
     def decode(self, bulk):
         return int(bulk)
 
+    def encode_many(self, values):
+        if _overrides(self, Integer, 'encode'):
+            return super(Integer, self).encode_many(values)
+        values = tuple(values)
+        # ABC checks are slow, so each distinct type is checked once.
+        integral = numbers.Integral
+        if not all(issubclass(cls, integral)
+                   for cls in frozenset(map(type, values))):
+            for value in values:
+                self.encode(value)  # raises TypeError
+        return [str(value).encode('ascii') for value in values]
+
+    def decode_many(self, bulks):
+        if _overrides(self, Integer, 'decode'):
+            return super(Integer, self).decode_many(bulks)
+        return [int(bulk) for bulk in bulks]
+
 
 class ByteString(Bulk):
     """Stores byte strings.  It stores the given byte strings as these are.
@@ -576,6 +1090,21 @@ class ByteString(Bulk):
     def decode(self, bulk):
         return bulk
 
+    def encode_many(self, values):
+        if _overrides(self, ByteString, 'encode'):
+            return super(ByteString, self).encode_many(values)
+        values = tuple(values)
+        bytes_type = self.bytes_type
+        for value in values:
+            if not isinstance(value, bytes_type):
+                self.encode(value)  # raises TypeError
+        return [value for value in values]
+
+    def decode_many(self, bulks):
+        if _overrides(self, ByteString, 'decode'):
+            return super(ByteString, self).decode_many(bulks)
+        return [bulk for bulk in bulks]
+
 
 class UnicodeString(Bulk):
     r"""Stores Unicode strings (:class:`unicode`), not byte strings
@@ -605,6 +1134,21 @@ class UnicodeString(Bulk):
     def decode(self, bulk):
         return bulk.decode('utf-8')
 
+    def encode_many(self, values):
+        if _overrides(self, UnicodeString, 'encode'):
+            return super(UnicodeString, self).encode_many(values)
+        values = tuple(values)
+        string_type = self.string_type
+        for value in values:
+            if not isinstance(value, string_type):
+                self.encode(value)  # raises TypeError
+        return [value.encode('utf-8') for value in values]
+
+    def decode_many(self, bulks):
+        if _overrides(self, UnicodeString, 'decode'):
+            return super(UnicodeString, self).decode_many(bulks)
+        return [bulk.decode('utf-8') for bulk in bulks]
+
 
 if sys.version_info[0] == 3:  # python 3.x
     String = UnicodeString
@@ -632,6 +1176,49 @@ class Boolean(Integer):
         return bool(super(Boolean, self).decode(bulk))
 
 
+class Float(Bulk):
+    """Stores floating point numbers as decimal strings.  For example:
+
+    .. sourcecode:: pycon
+
+       >>> float_ = Float()
+       >>> float_.encode(3.14)
+       '3.14'
+       >>> float_.decode('3.14')
+       3.14
+
+    Like :class:`Integer`, it stores decimals so that they can be
+    added by :redis:`INCRBYFLOAT` and :redis:`HINCRBYFLOAT`.  If you
+    don't need these, :class:`Float64` is more compact.
+
+    """
+
+    def encode(self, value):
+        if not isinstance(value, numbers.Real):
+            raise TypeError('expected a real number, not ' + repr(value))
+        return repr(float(value)).encode('ascii')
+
+    def decode(self, bulk):
+        return float(bulk)
+
+    def encode_many(self, values):
+        if _overrides(self, Float, 'encode'):
+            return super(Float, self).encode_many(values)
+        values = tuple(values)
+        # ABC checks are slow, so each distinct type is checked once.
+        real = numbers.Real
+        if not all(issubclass(cls, real)
+                   for cls in frozenset(map(type, values))):
+            for value in values:
+                self.encode(value)  # raises TypeError
+        return [repr(float(value)).encode('ascii') for value in values]
+
+    def decode_many(self, bulks):
+        if _overrides(self, Float, 'decode'):
+            return super(Float, self).decode_many(bulks)
+        return [float(bulk) for bulk in bulks]
+
+
 class Date(Bulk):
     """Stores :class:`datetime.date` values.  Dates are internally
     formatted in :rfc:`3339` format e.g. ``2012-03-28``.
@@ -725,6 +1312,31 @@ class DateTime(Bulk):
             return parsed.replace(tzinfo=None)
         return parsed
 
+    def encode_many(self, values):
+        if _overrides(self, DateTime, 'encode'):
+            return super(DateTime, self).encode_many(values)
+        datetime_type = datetime.datetime
+        encoded = []
+        for value in values:
+            if not isinstance(value, datetime_type):
+                self.encode(value)  # raises TypeError
+            if value.tzinfo is not None:
+                value = value.replace(tzinfo=None)
+            encoded.append(value.isoformat().encode('ascii'))
+        return encoded
+
+    def decode_many(self, bulks):
+        if _overrides(self, DateTime, 'decode'):
+            return super(DateTime, self).decode_many(bulks)
+        parse = self.parse_datetime
+        decoded = []
+        for bulk in bulks:
+            parsed = parse(bulk)
+            if parsed.tzinfo:
+                parsed = parsed.replace(tzinfo=None)
+            decoded.append(parsed)
+        return decoded
+
     def parse_datetime(self, bulk):
         r"""Parses a :rfc:`3339` formatted string into
         :class:`datetime.datetime`.
@@ -763,6 +1375,12 @@ class DateTime(Bulk):
            uses this method.
 
         """
+        # The canonical format which encode() writes is parsed without
+        # the regular expression.
+        parsed = _parse_canonical(bulk, 19, _DATETIME_SEPARATORS,
+                                  _parse_datetime)
+        if parsed is not None:
+            return parsed
         match = self.DATETIME_PATTERN.search(bulk)
         if match:
             year = int(match.group('year'))
@@ -771,16 +1389,18 @@ class DateTime(Bulk):
             hour = int(match.group('hour'))
             minute = int(match.group('minute'))
             second = int(match.group('second'))
-            microsecond = int(match.group('microsecond'))
+            microsecond = match.group('microsecond')
+            microsecond = int(microsecond) if microsecond else 0
             if match.group('tz'):
                 if match.group('tz_utc'):
                     tzinfo = UTC
                 else:
-                    tzplus = match.group('tz_offset_sign') == '+'
                     tzhour = int(match.group('tz_offset_hour'))
                     tzmin = int(match.group('tz_offset_minute'))
-                    tzoffset = datetime.timedelta(hours=tzhour, minutes=tzmin)
-                    tzinfo = FixedOffset(tzoffset if tzplus else -tzoffset)
+                    tzoffset = tzhour * 60 + tzmin
+                    if match.group('tz_offset_sign') == b'-':
+                        tzoffset = -tzoffset
+                    tzinfo = fixed_offset(tzoffset)
             else:
                 tzinfo = None
             return datetime.datetime(year, month, day, hour, minute, second,
@@ -887,6 +1507,14 @@ class Time(Bulk):
            uses this method.
 
         """
+        # The canonical format which encode() writes is parsed without
+        # the regular expression.
+        parsed = _parse_canonical(bulk, 8, _TIME_SEPARATORS, _parse_time)
+        if parsed is not None:
+            if drop_tzinfo and parsed.tzinfo is not None:
+                return datetime.time(parsed.hour, parsed.minute,
+                                     parsed.second, parsed.microsecond)
+            return parsed
         match = self.TIME_PATTERN.search(bulk)
         if not match:
             raise ValueError('malformed time: ' + repr(bulk))
@@ -899,11 +1527,12 @@ class Time(Bulk):
             if match.group('tz_utc'):
                 tzinfo = UTC
             else:
-                tzplus = match.group('tz_offset_sign') == '+'
                 tzhour = int(match.group('tz_offset_hour'))
                 tzmin = int(match.group('tz_offset_minute'))
-                tzoffset = datetime.timedelta(hours=tzhour, minutes=tzmin)
-                tzinfo = FixedOffset(tzoffset if tzplus else -tzoffset)
+                tzoffset = tzhour * 60 + tzmin
+                if match.group('tz_offset_sign') == b'-':
+                    tzoffset = -tzoffset
+                tzinfo = fixed_offset(tzoffset)
         else:
             tzinfo = None
         return datetime.time(hour, minute, second, microsecond, tzinfo=tzinfo)
@@ -1009,3 +1638,486 @@ class UUID(Bulk):
 
     def decode(self, bulk):
         return uuid.UUID(bulk.decode('ascii'))
+
+    def encode_many(self, values):
+        if _overrides(self, UUID, 'encode'):
+            return super(UUID, self).encode_many(values)
+        values = tuple(values)
+        uuid_type = uuid.UUID
+        for value in values:
+            if not isinstance(value, uuid_type):
+                self.encode(value)  # raises TypeError
+        return [str(value).encode('ascii') for value in values]
+
+    def decode_many(self, bulks):
+        if _overrides(self, UUID, 'decode'):
+            return super(UUID, self).decode_many(bulks)
+        uuid_type = uuid.UUID
+        return [uuid_type(bulk.decode('ascii')) for bulk in bulks]
+
+
+class PackedTuple(Bulk):
+    """Stores tuples of fixed-width binary fields packed by
+    :mod:`struct`.  For example:
+
+    .. sourcecode:: pycon
+
+       >>> pair = PackedTuple('<hh')
+       >>> pair.encode((1, -2))
+       '\\x01\\x00\\xfe\\xff'
+       >>> pair.decode(_)
+       (1, -2)
+
+    Unlike :class:`Tuple` it has no header, and numbers don't have
+    to be formatted and parsed as decimals, so values take less memory
+    in Redis and are decoded faster.  Use a format with an explicit
+    byte order e.g. ``'<'`` so that values can be shared between
+    different machines.
+
+    :param format: the :mod:`struct` format string e.g. ``'<qqd'``
+    :type format: :class:`str`
+
+    """
+
+    #: (:class:`str`) The :mod:`struct` format string.
+    format = None
+
+    #: (:class:`struct.Struct`) The compiled :attr:`format`.
+    struct = None
+
+    def __init__(self, format):
+        self.format = format
+        self.struct = struct.Struct(format)
+
+    def encode(self, value):
+        if not isinstance(value, tuple):
+            raise TypeError('expected a tuple, not ' + repr(value))
+        try:
+            return self.struct.pack(*value)
+        except struct.error as e:
+            raise ValueError('cannot pack {0!r} into {1!r}: {2}'.format(
+                value, self.format, e
+            ))
+
+    def decode(self, bulk):
+        try:
+            return self.struct.unpack(bulk)
+        except struct.error as e:
+            raise ValueError('cannot unpack {0!r} from {1!r}: {2}'.format(
+                bulk, self.format, e
+            ))
+
+    def encode_many(self, values):
+        if _overrides(self, PackedTuple, 'encode'):
+            return super(PackedTuple, self).encode_many(values)
+        values = tuple(values)
+        pack = self.struct.pack
+        try:
+            return [pack(*value) for value in values]
+        except (TypeError, struct.error):
+            for value in values:
+                self.encode(value)  # raises TypeError or ValueError
+            raise
+
+    def decode_many(self, bulks):
+        if _overrides(self, PackedTuple, 'decode'):
+            return super(PackedTuple, self).decode_many(bulks)
+        bulks = tuple(bulks)
+        # Bulks are joined and decoded at once, so all of them have to be
+        # exactly sized.  Otherwise decode() raises the proper error.
+        if frozenset(map(len, bulks)) - frozenset([self.size]):
+            return super(PackedTuple, self).decode_many(bulks)
+        return self.decode_buffer(b''.join(bulks))
+
+    @property
+    def size(self):
+        """(:class:`numbers.Integral`) The byte size of encoded values."""
+        return self.struct.size
+
+    def decode_buffer(self, buffer):
+        """Decodes values packed back to back in the ``buffer`` at once.
+        The ``buffer`` isn't copied nor sliced: values are unpacked
+        directly from it.
+
+        .. sourcecode:: pycon
+
+           >>> pair = PackedTuple('<hh')
+           >>> pair.decode_buffer(pair.encode((1, 2)) + pair.encode((3, 4)))
+           [(1, 2), (3, 4)]
+
+        :param buffer: the buffer e.g. :class:`bytes`, :class:`bytearray`
+                       or :class:`memoryview` of packed values
+        :returns: the list of decoded values
+        :rtype: :class:`list`
+        :raises exceptions.ValueError:
+           if the size of the ``buffer`` isn't a multiple of :attr:`size`
+
+        """
+        size = self.size
+        length = len(buffer)
+        if length % size:
+            raise ValueError('the buffer size {0} is not a multiple of '
+                             '{1}'.format(length, size))
+        if hasattr(self.struct, 'iter_unpack'):  # Python 3.4+
+            return [value for value in self.struct.iter_unpack(buffer)]
+        unpack_from = self.struct.unpack_from
+        return [unpack_from(buffer, offset)
+                for offset in range(0, length, size)]
+
+    def __hash__(self):
+        return super(PackedTuple, self).__hash__() * hash(self.format)
+
+    def __eq__(self, operand):
+        if super(PackedTuple, self).__eq__(operand):
+            return self.format == operand.format
+        return False
+
+
+class PackedNumber(PackedTuple):
+    """The base class of fixed-width binary numbers e.g. :class:`Int64`
+    and :class:`Float64`.  Subclasses have to define :attr:`FORMAT`,
+    :attr:`TYPECODE` and :attr:`NUMBER_TYPE`.
+
+    """
+
+    #: (:class:`str`) The :mod:`struct` format string of a number
+    #: in little endian.
+    FORMAT = None
+
+    #: (:class:`str`) The native format character which is the same
+    #: to :attr:`FORMAT` on little endian machines.  It's used to cast
+    #: a :class:`memoryview` to numbers without copying.
+    TYPECODE = None
+
+    #: (:class:`type`) The abstract type of acceptable numbers.
+    NUMBER_TYPE = None
+
+    def __init__(self):
+        super(PackedNumber, self).__init__(self.FORMAT)
+
+    def encode(self, value):
+        if not isinstance(value, self.NUMBER_TYPE):
+            raise TypeError('expected an instance of {0.__module__}.'
+                            '{0.__name__}, not {1!r}'.format(self.NUMBER_TYPE,
+                                                             value))
+        return super(PackedNumber, self).encode((value,))
+
+    def decode(self, bulk):
+        return super(PackedNumber, self).decode(bulk)[0]
+
+    def encode_many(self, values):
+        if _overrides(self, PackedNumber, 'encode'):
+            return super(PackedTuple, self).encode_many(values)
+        values = tuple(values)
+        # ABC checks are slow, so each distinct type is checked once.
+        number_type = self.NUMBER_TYPE
+        if not all(issubclass(cls, number_type)
+                   for cls in frozenset(map(type, values))):
+            for value in values:
+                self.encode(value)  # raises TypeError
+        pack = self.struct.pack
+        try:
+            return [pack(value) for value in values]
+        except struct.error:
+            for value in values:
+                self.encode(value)  # raises ValueError
+            raise
+
+    def decode_many(self, bulks):
+        if _overrides(self, PackedNumber, 'decode'):
+            return super(PackedTuple, self).decode_many(bulks)
+        bulks = tuple(bulks)
+        if frozenset(map(len, bulks)) - frozenset([self.size]):
+            return super(PackedTuple, self).decode_many(bulks)
+        return self.decode_buffer(b''.join(bulks))
+
+    def decode_buffer(self, buffer):
+        """Decodes numbers packed back to back in the ``buffer`` at once.
+        On little endian machines the ``buffer`` is cast to numbers by
+        :class:`memoryview` without copying.
+
+        .. sourcecode:: pycon
+
+           >>> int64 = Int64()
+           >>> int64.decode_buffer(int64.encode(1) + int64.encode(-2))
+           [1, -2]
+
+        :param buffer: the buffer e.g. :class:`bytes`, :class:`bytearray`
+                       or :class:`memoryview` of packed numbers
+        :returns: the list of decoded numbers
+        :rtype: :class:`list`
+        :raises exceptions.ValueError:
+           if the size of the ``buffer`` isn't a multiple of :attr:`size`
+
+        """
+        if sys.byteorder == 'little' and hasattr(memoryview, 'cast'):
+            view = memoryview(buffer)
+            if view.format == 'B' and view.contiguous:
+                if view.nbytes % self.size:
+                    raise ValueError('the buffer size {0} is not a multiple '
+                                     'of {1}'.format(view.nbytes, self.size))
+                return view.cast(self.TYPECODE).tolist()
+        return [value
+                for value, in super(PackedNumber, self).decode_buffer(buffer)]
+
+
+class Int64(PackedNumber):
+    """Stores 64-bit signed integers as 8-byte little endian binaries.
+    For example:
+
+    .. sourcecode:: pycon
+
+       >>> int64 = Int64()
+       >>> int64.encode(42)
+       '*\\x00\\x00\\x00\\x00\\x00\\x00\\x00'
+       >>> int64.decode(_)
+       42
+
+    Unlike :class:`Integer` values can't be increased by
+    :redis:`INCRBY`, but these take always 8 bytes and are decoded
+    faster.
+
+    """
+
+    FORMAT = '<q'
+    TYPECODE = 'q'
+    NUMBER_TYPE = numbers.Integral
+
+
+class Float64(PackedNumber):
+    """Stores double precision floating point numbers as 8-byte
+    little endian binaries.  For example:
+
+    .. sourcecode:: pycon
+
+       >>> float64 = Float64()
+       >>> float64.encode(0.5)
+       '\\x00\\x00\\x00\\x00\\x00\\x00\\xe0?'
+       >>> float64.decode(_)
+       0.5
+
+    Unlike :class:`Float` values can't be increased by
+    :redis:`INCRBYFLOAT`, but these take always 8 bytes and are
+    decoded faster.
+
+    """
+
+    FORMAT = '<d'
+    TYPECODE = 'd'
+    NUMBER_TYPE = numbers.Real
+
+
+class JSON(Bulk):
+    """Stores JSON-serializable values e.g. :class:`dict`, :class:`list`,
+    :class:`str` and numbers as compact UTF-8 JSON.  For example:
+
+    .. sourcecode:: pycon
+
+       >>> json_ = JSON()
+       >>> json_.encode({'a': [1, 2.5, None]})
+       '{"a":[1,2.5,null]}'
+       >>> json_.decode(_)
+       {u'a': [1, 2.5, None]}
+
+    If orjson_ is installed it's used instead of :mod:`json` for speed.
+    Both write the same compact form of standard JSON (:mod:`json` never
+    writes ``NaN`` nor ``Infinity``), so values written by one can be
+    read by the other.  Note that tuples are decoded as lists, and
+    keys of objects are always decoded as strings.
+
+    However, some values are encoded differently depending on which
+    one is used:
+
+    - Not-a-number and infinities are written as ``null`` by orjson_,
+      while :mod:`json` raises :exc:`~exceptions.ValueError`.
+    - Non-string keys of dictionaries are converted to strings by
+      :mod:`json`, while orjson_ raises :exc:`~exceptions.TypeError`.
+    - Integers beyond 64 bits are written by :mod:`json`, while orjson_
+      raises :exc:`~exceptions.TypeError` (and reads them as floats).
+    - :class:`~datetime.datetime`, :class:`~uuid.UUID` and dataclass
+      values are written as strings or objects by orjson_, while
+      :mod:`json` raises :exc:`~exceptions.TypeError`.
+
+    Stick to strings, finite numbers, booleans, ``None``, lists and
+    dictionaries of string keys to get the same results from both.
+
+    .. _orjson: https://github.com/ijl/orjson
+
+    """
+
+    #: (:class:`json.JSONEncoder`) The encoder used if orjson_ isn't
+    #: installed.
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'),
+                               allow_nan=False)
+
+    #: (:class:`json.JSONDecoder`) The decoder used if orjson_ isn't
+    #: installed.
+    decoder = json.JSONDecoder()
+
+    def encode(self, value):
+        if orjson is not None:
+            return orjson.dumps(value)
+        encoded = self.encoder.encode(value)
+        if isinstance(encoded, bytes):  # Python 2
+            return encoded
+        return encoded.encode('utf-8')
+
+    def decode(self, bulk):
+        if orjson is not None:
+            return orjson.loads(bulk)
+        return self.decoder.decode(bulk.decode('utf-8'))
+
+    def encode_many(self, values):
+        if _overrides(self, JSON, 'encode') or sys.version_info < (3,):
+            return super(JSON, self).encode_many(values)
+        if orjson is not None:
+            dumps = orjson.dumps
+            return [dumps(value) for value in values]
+        encode = self.encoder.encode
+        return [encode(value).encode('utf-8') for value in values]
+
+    def decode_many(self, bulks):
+        if _overrides(self, JSON, 'decode'):
+            return super(JSON, self).decode_many(bulks)
+        if orjson is not None:
+            loads = orjson.loads
+            return [loads(bulk) for bulk in bulks]
+        decode = self.decoder.decode
+        return [decode(bulk.decode('utf-8')) for bulk in bulks]
+
+
+if hasattr(pickle, 'PickleBuffer'):  # Python 3.8+
+    class _OutOfBandPickler(pickle.Pickler):
+        """The pickler which makes large :class:`memoryview` objects
+        out-of-band buffers.  Exact :class:`bytes` and :class:`bytearray`
+        objects never reach :meth:`reducer_override()`, so only top-level
+        ones can be out of band by :class:`_OutOfBand`.
+
+        """
+
+        def __init__(self, file, protocol, buffer_callback, threshold):
+            super(_OutOfBandPickler, self).__init__(
+                file, protocol, buffer_callback=buffer_callback
+            )
+            self.threshold = threshold
+
+        def reducer_override(self, obj):
+            # Only flat byte views can be restored from raw buffers.
+            if (type(obj) is memoryview and obj.format == 'B' and
+                    obj.ndim == 1 and obj.c_contiguous):
+                if obj.nbytes >= self.threshold:
+                    return memoryview, (pickle.PickleBuffer(obj),)
+                return memoryview, (obj.tobytes(),)
+            return NotImplemented
+
+    class _OutOfBand(object):
+        """Makes a top-level :class:`bytes` or :class:`bytearray` value
+        an out-of-band buffer.  Only the value is pickled, not this.
+
+        """
+
+        __slots__ = 'value',
+
+        def __init__(self, value):
+            self.value = value
+
+        def __reduce_ex__(self, protocol):
+            return type(self.value), (pickle.PickleBuffer(self.value),)
+
+
+class Pickle(Bulk):
+    """Stores any picklable Python objects by :mod:`pickle`.
+
+    .. sourcecode:: pycon
+
+       >>> pickle_ = Pickle()
+       >>> pickle_.decode(pickle_.encode({'a': (1, 2.5)}))
+       {'a': (1, 2.5)}
+
+    With protocol 5 (Python 3.8 or higher) large :class:`bytes`,
+    :class:`bytearray`, :class:`memoryview` and
+    :class:`pickle.PickleBuffer` payloads are pickled out of band, so
+    they aren't copied into the pickle stream but only once into the
+    encoded bulk.  Decoded :class:`memoryview` payloads are views of
+    the bulk without copying.  Note that :mod:`pickle` never lets
+    :class:`bytes` and :class:`bytearray` objects nested in other
+    objects out of band; wrap them in :class:`memoryview` or
+    :class:`pickle.PickleBuffer` if needed.
+
+    Values with out-of-band payloads are encoded in the following
+    format, which is similar to :class:`Tuple`.  The first size is
+    of the pickle stream, and the rest are of payloads.  Other values
+    are encoded in the plain pickle format.
+
+    .. productionlist::
+       pickle_oob: "\\0" `header` newline stream payload*
+
+    .. warning::
+
+       Never decode values which untrusted clients can write.
+       Unpickling can run arbitrary code.
+
+    :param protocol: the pickle protocol version.
+                     default is :const:`pickle.HIGHEST_PROTOCOL`
+    :type protocol: :class:`numbers.Integral`
+
+    """
+
+    #: (:class:`numbers.Integral`) The minimum byte size of payloads
+    #: to pickle out of band.  Smaller ones are cheaper to be copied
+    #: into the stream.
+    OUT_OF_BAND_THRESHOLD = 4096
+
+    #: (:class:`numbers.Integral`) The pickle protocol version.
+    protocol = None
+
+    def __init__(self, protocol=pickle.HIGHEST_PROTOCOL):
+        if not 0 <= protocol <= pickle.HIGHEST_PROTOCOL:
+            raise ValueError(
+                'protocol must be from 0 to {0}, not {1!r}'.format(
+                    pickle.HIGHEST_PROTOCOL, protocol
+                )
+            )
+        self.protocol = protocol
+
+    def encode(self, value):
+        if self.protocol < 5:
+            return pickle.dumps(value, self.protocol)
+        threshold = self.OUT_OF_BAND_THRESHOLD
+        if type(value) in (bytes, bytearray) and len(value) >= threshold:
+            value = _OutOfBand(value)
+        buffers = []
+        file_ = io.BytesIO()
+        _OutOfBandPickler(file_, self.protocol, buffers.append,
+                          threshold).dump(value)
+        stream = file_.getvalue()
+        if not buffers:
+            return stream
+        payloads = [buffer_.raw() for buffer_ in buffers]
+        sizes = [len(stream)]
+        sizes.extend(payload.nbytes for payload in payloads)
+        header = b','.join(str(size).encode('ascii') for size in sizes)
+        chunks = [b'\x00', header, b'\n', stream]
+        chunks.extend(payloads)
+        return b''.join(chunks)
+
+    def decode(self, bulk):
+        if bulk[:1] != b'\x00':
+            return pickle.loads(bulk)
+        pos = bulk.index(b'\n')
+        sizes = [int(size) for size in bulk[1:pos].split(b',')]
+        view = memoryview(bulk)
+        pos += 1
+        chunks = []
+        for size in sizes:
+            chunks.append(view[pos:pos + size])
+            pos += size
+        return pickle.loads(chunks[0], buffers=chunks[1:])
+
+    def __hash__(self):
+        return super(Pickle, self).__hash__() * hash(self.protocol)
+
+    def __eq__(self, operand):
+        if super(Pickle, self).__eq__(operand):
+            return self.protocol == operand.protocol
+        return False
@@ -10,3 +10,18 @@ def chunk(iterable, n):
     """
     i = iter(iterable)
     return iter(lambda: list(itertools.islice(i, n)), [])
+
+
+def lrange_bounds(index):
+    """Converts a :class:`slice` ``index`` into the inclusive ``start``
+    and ``stop`` arguments of :redis:`LRANGE`.  It returns ``None`` if
+    the slice is always empty, e.g. ``[:0]``, because :redis:`LRANGE`
+    treats ``-1`` as the last element.
+
+    """
+    start = 0 if index.start is None else index.start
+    if index.stop is None:
+        return start, -1
+    elif index.stop == 0:
+        return None
+    return start, index.stop - 1
@@ -0,0 +1,23 @@
+""":mod:`siderbench` --- Benchmark suite
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+This package measures throughput (operations per second) and p50/p99
+latency of public methods of :class:`~sider.hash.Hash`,
+:class:`~sider.list.List`, :class:`~sider.set.Set`,
+:class:`~sider.sortedset.SortedSet` and codecs of :mod:`sider.types`
+at several data sizes.  Each method is compared to the raw redis-py
+calls which send the same commands, so that the overhead Sider adds
+can be seen as well.
+
+It spawns a ``redis-server`` on a free port by default:
+
+.. code-block:: console
+
+   $ python -m siderbench
+   $ python -m siderbench --sizes 10,1000 --filter Hash
+   $ python -m siderbench --json results.json
+   $ python -m siderbench --host localhost --port 6379 --db 15
+
+Benchmarks are listed in :mod:`siderbench.cases`.
+
+"""
@@ -0,0 +1,78 @@
+""":mod:`siderbench.__main__` --- Command line interface
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""
+from __future__ import absolute_import, print_function
+import argparse
+import json
+import sys
+from redis.client import StrictRedis
+from .cases import GROUPS
+from .runner import SIZES, format_results, run
+from .server import RedisServer
+
+
+parser = argparse.ArgumentParser(prog='python -m siderbench',
+                                 description='Benchmarks Sider.')
+parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                    help='comma-separated data sizes [%(default)s]')
+parser.add_argument('--filter', action='append', default=[],
+                    help='run only benchmarks of which names contain it '
+                         'e.g. Hash, List.pop, types.  can be repeated')
+parser.add_argument('--duration', type=float, default=0.2,
+                    help='seconds to measure each method [%(default)s]')
+parser.add_argument('--min-iterations', type=int, default=5,
+                    help='the minimum calls of each method [%(default)s]')
+parser.add_argument('--redis-server', metavar='PATH',
+                    help='the path of redis-server to spawn.  '
+                         'found from PATH by default')
+parser.add_argument('--host', help='use the running server instead of '
+                                   'spawning redis-server.  keys starting '
+                                   'with "siderbench:" are overwritten')
+parser.add_argument('--port', type=int, default=6379,
+                    help='the port of --host [%(default)s]')
+parser.add_argument('--db', type=int, default=0,
+                    help='the database number of --host [%(default)s]')
+parser.add_argument('--json', metavar='FILE',
+                    help='also write results as JSON to the file')
+
+
+def main(args=None):
+    args = parser.parse_args(args)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    filters = args.filter
+    def filter_(case):
+        return not filters or any(f in case.name for f in filters)
+    def progress(case, size):
+        print('{0} ({1})...'.format(case.name, size), end='\r',
+              file=sys.stderr)
+        sys.stderr.flush()
+    server = None
+    if args.host:
+        client = StrictRedis(host=args.host, port=args.port, db=args.db)
+    else:
+        server = RedisServer(args.redis_server)
+        server.start()
+        client = server.client()
+    try:
+        results = list(run(client, GROUPS, sizes, duration=args.duration,
+                           min_iterations=args.min_iterations,
+                           filter=filter_, progress=progress))
+    finally:
+        if server is not None:
+            server.stop()
+    print(' ' * 79, end='\r', file=sys.stderr)
+    print(format_results(results))
+    uncovered = [(group.name, group.uncovered()) for group in GROUPS]
+    uncovered = [(name, methods) for name, methods in uncovered if methods]
+    if uncovered and not filters:
+        print('\nNot benchmarked:')
+        for name, methods in uncovered:
+            print('  {0}: {1}'.format(name, ', '.join(methods)))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([result.to_json() for result in results], f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,561 @@
+""":mod:`siderbench.cases` --- Benchmark cases
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Each group populates its key with the given number of elements:
+
+- :data:`HASH`: fields ``f0``, ``f1``, ... and values ``0``, ``1``, ...
+- :data:`LIST`: elements ``e0``, ``e1``, ...
+- :data:`SET`: members ``m0``, ``m1``, ...
+- :data:`SORTED_SET`: members ``m0``, ``m1``, ... and scores 0, 1, ...
+
+Methods which take time proportional to the data size are limited to
+:const:`LINEAR_MAX_SIZE` elements, and methods which make a round trip
+for each element to :const:`ROUND_TRIP_MAX_SIZE`.
+
+"""
+from __future__ import absolute_import
+import datetime
+import uuid
+import sider.hash
+import sider.list
+import sider.set
+import sider.sortedset
+from sider import types
+from .runner import Group
+
+
+#: (:class:`numbers.Integral`) The maximum data size for methods which
+#: take time proportional to the data size.
+LINEAR_MAX_SIZE = 100000
+
+#: (:class:`numbers.Integral`) The maximum data size for methods which
+#: make a round trip for each element.
+ROUND_TRIP_MAX_SIZE = 1000
+
+#: (:class:`numbers.Integral`) The number of elements to send per command
+#: while populating.
+CHUNK = 1000
+
+
+def _populate(command, make_args):
+    def populate(client, key, size):
+        client.delete(key)
+        pipe = client.pipeline(transaction=False)
+        for start in range(0, size, CHUNK):
+            args = []
+            for i in range(start, min(start + CHUNK, size)):
+                args.extend(make_args(i))
+            pipe.execute_command(command, key, *args)
+            if len(pipe.command_stack) >= 100:
+                pipe.execute()
+        pipe.execute()
+    return populate
+
+
+HASH = Group('Hash', types.Hash(),
+             _populate('HMSET', lambda i: ('f{0}'.format(i), str(i))),
+             sider.hash.Hash)
+LIST = Group('List', types.List(),
+             _populate('RPUSH', lambda i: ('e{0}'.format(i),)),
+             sider.list.List)
+SET = Group('Set', types.Set(),
+            _populate('SADD', lambda i: ('m{0}'.format(i),)),
+            sider.set.Set)
+SORTED_SET = Group('SortedSet', types.SortedSet(),
+                   _populate('ZADD', lambda i: (i, 'm{0}'.format(i))),
+                   sider.sortedset.SortedSet)
+
+TEN = dict(('x{0}'.format(i), str(i)) for i in range(10))
+TEN_MEMBERS = frozenset(TEN)
+
+
+# Hash
+
+@HASH.case('__getitem__', raw=lambda c: c.client.hget(c.key, 'f0'))
+def _(c):
+    c.obj['f0']
+
+
+@HASH.case('get', raw=lambda c: c.client.hget(c.key, 'f0'))
+def _(c):
+    c.obj.get('f0')
+
+
+@HASH.case('__setitem__', raw=lambda c: c.client.hset(c.key, 'f0', '0'))
+def _(c):
+    c.obj['f0'] = '0'
+
+
+@HASH.case('__delitem__', raw=lambda c: c.client.hdel(c.key, 'f0'),
+           prepare=lambda c: c.client.hset(c.key, 'f0', '0'))
+def _(c):
+    del c.obj['f0']
+
+
+@HASH.case('__contains__', raw=lambda c: c.client.hexists(c.key, 'f0'))
+def _(c):
+    'f0' in c.obj
+
+
+@HASH.case('__len__', raw=lambda c: c.client.hlen(c.key))
+def _(c):
+    len(c.obj)
+
+
+@HASH.case('__iter__', raw=lambda c: c.client.hkeys(c.key),
+           max_size=LINEAR_MAX_SIZE)
+def _(c):
+    for _ in c.obj:
+        pass
+
+
+@HASH.case('keys', raw=lambda c: c.client.hkeys(c.key),
+           max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.keys()
+
+
+@HASH.case('values', raw=lambda c: c.client.hvals(c.key),
+           max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.values()
+
+
+@HASH.case('items', raw=lambda c: c.client.hgetall(c.key),
+           max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.items()
+
+
+@HASH.case('setdefault', raw=lambda c: c.client.hsetnx(c.key, 'f0', 'x'))
+def _(c):
+    c.obj.setdefault('f0', 'x')
+
+
+@HASH.case('update', raw=lambda c: c.client.hmset(c.key, TEN))
+def _(c):
+    c.obj.update(TEN)
+
+
+@HASH.case('clear', raw=lambda c: c.client.delete(c.key),
+           prepare=lambda c: c.client.hmset(c.key, TEN), destructive=True)
+def _(c):
+    c.obj.clear()
+
+
+# List
+
+@LIST.case('__getitem__', raw=lambda c: c.client.lindex(c.key, 0))
+def _(c):
+    c.obj[0]
+
+
+@LIST.case('__getitem__[:10]', raw=lambda c: c.client.lrange(c.key, 0, 9))
+def _(c):
+    c.obj[:10]
+
+
+@LIST.case('__setitem__', raw=lambda c: c.client.lset(c.key, 0, 'e0'))
+def _(c):
+    c.obj[0] = 'e0'
+
+
+@LIST.case('__len__', raw=lambda c: c.client.llen(c.key))
+def _(c):
+    len(c.obj)
+
+
+@LIST.case('__iter__', raw=lambda c: c.client.lrange(c.key, 0, -1),
+           max_size=LINEAR_MAX_SIZE)
+def _(c):
+    for _ in c.obj:
+        pass
+
+
+@LIST.case('__contains__', raw=lambda c: c.client.lrange(c.key, 0, -1),
+           max_size=LINEAR_MAX_SIZE)
+def _(c):
+    'absent' in c.obj
+
+
+@LIST.case('__reversed__', max_size=ROUND_TRIP_MAX_SIZE)
+def _(c):
+    for _ in reversed(c.obj):
+        pass
+
+
+@LIST.case('index', raw=lambda c: c.client.lindex(c.key, 0))
+def _(c):
+    c.obj.index('e0')
+
+
+@LIST.case('count', raw=lambda c: c.client.lrange(c.key, 0, -1),
+           max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.count('e0')
+
+
+@LIST.case('append', raw=lambda c: c.client.rpush(c.key, 'x'),
+           prepare=lambda c: c.client.rpop(c.key))
+def _(c):
+    c.obj.append('x')
+
+
+@LIST.case('extend', raw=lambda c: c.client.rpush(c.key, *TEN_MEMBERS),
+           prepare=lambda c: c.client.ltrim(c.key, 0, c.size - 1))
+def _(c):
+    c.obj.extend(TEN_MEMBERS)
+
+
+@LIST.case('insert', raw=lambda c: c.client.lpush(c.key, 'x'),
+           prepare=lambda c: c.client.lpop(c.key))
+def _(c):
+    c.obj.insert(0, 'x')
+
+
+@LIST.case('pop', raw=lambda c: c.client.rpop(c.key),
+           prepare=lambda c: c.client.rpush(c.key, 'x'))
+def _(c):
+    c.obj.pop()
+
+
+@LIST.case('pop(0)', raw=lambda c: c.client.lpop(c.key),
+           prepare=lambda c: c.client.lpush(c.key, 'x'))
+def _(c):
+    c.obj.pop(0)
+
+
+@LIST.case('__delitem__', raw=lambda c: c.client.lpop(c.key),
+           prepare=lambda c: c.client.lpush(c.key, 'x'))
+def _(c):
+    del c.obj[0]
+
+
+# Set
+
+@SET.case('__contains__', raw=lambda c: c.client.sismember(c.key, 'm0'))
+def _(c):
+    'm0' in c.obj
+
+
+@SET.case('__len__', raw=lambda c: c.client.scard(c.key))
+def _(c):
+    len(c.obj)
+
+
+@SET.case('__iter__', raw=lambda c: c.client.smembers(c.key),
+          max_size=LINEAR_MAX_SIZE)
+def _(c):
+    for _ in c.obj:
+        pass
+
+
+@SET.case('add', raw=lambda c: c.client.sadd(c.key, 'x'))
+def _(c):
+    c.obj.add('x')
+
+
+@SET.case('discard', raw=lambda c: c.client.srem(c.key, 'x'),
+          prepare=lambda c: c.client.sadd(c.key, 'x'))
+def _(c):
+    c.obj.discard('x')
+
+
+@SET.case('pop', raw=lambda c: c.client.spop(c.key),
+          prepare=lambda c: c.client.sadd(c.key, 'x'), destructive=True)
+def _(c):
+    c.obj.pop()
+
+
+@SET.case('update', raw=lambda c: c.client.sadd(c.key, *TEN_MEMBERS))
+def _(c):
+    c.obj.update(TEN_MEMBERS)
+
+
+@SET.case('union', raw=lambda c: c.client.sunion(c.key, c.other_key),
+          max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.union(c.session.get(c.other_key, types.Set))
+
+
+@SET.case('intersection', raw=lambda c: c.client.sinter(c.key, c.other_key),
+          max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.intersection(c.session.get(c.other_key, types.Set))
+
+
+@SET.case('difference', raw=lambda c: c.client.sdiff(c.key, c.other_key),
+          max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.difference(c.session.get(c.other_key, types.Set))
+
+
+@SET.case('issubset', max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.issubset(c.session.get(c.other_key, types.Set))
+
+
+@SET.case('isdisjoint', max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.isdisjoint(TEN_MEMBERS)
+
+
+@SET.case('clear', raw=lambda c: c.client.delete(c.key),
+          prepare=lambda c: c.client.sadd(c.key, *TEN_MEMBERS),
+          destructive=True)
+def _(c):
+    c.obj.clear()
+
+
+# SortedSet
+
+@SORTED_SET.case('__getitem__', raw=lambda c: c.client.zscore(c.key, 'm0'))
+def _(c):
+    c.obj['m0']
+
+
+@SORTED_SET.case('__setitem__', raw=lambda c: c.client.zadd(c.key, 0, 'm0'))
+def _(c):
+    c.obj['m0'] = 0
+
+
+@SORTED_SET.case('__contains__', raw=lambda c: c.client.zscore(c.key, 'm0'))
+def _(c):
+    'm0' in c.obj
+
+
+@SORTED_SET.case('__len__', raw=lambda c: c.client.zcard(c.key))
+def _(c):
+    len(c.obj)
+
+
+@SORTED_SET.case('__iter__', raw=lambda c: c.client.zrange(c.key, 0, -1),
+                 max_size=LINEAR_MAX_SIZE)
+def _(c):
+    for _ in c.obj:
+        pass
+
+
+@SORTED_SET.case('add', raw=lambda c: c.client.zincrby(c.key, 'x', 1))
+def _(c):
+    c.obj.add('x')
+
+
+@SORTED_SET.case('discard', prepare=lambda c: c.client.zadd(c.key, 5, 'x'))
+def _(c):
+    c.obj.discard('x')
+
+
+@SORTED_SET.case('__delitem__', raw=lambda c: c.client.zrem(c.key, 'x'),
+                 prepare=lambda c: c.client.zadd(c.key, 5, 'x'))
+def _(c):
+    del c.obj['x']
+
+
+@SORTED_SET.case('items',
+                 raw=lambda c: c.client.zrange(c.key, 0, -1, withscores=True),
+                 max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.items()
+
+
+@SORTED_SET.case('most_common',
+                 raw=lambda c: c.client.zrevrange(c.key, 0, 9,
+                                                  withscores=True))
+def _(c):
+    c.obj.most_common(10)
+
+
+@SORTED_SET.case('least_common',
+                 raw=lambda c: c.client.zrange(c.key, 0, 9, withscores=True))
+def _(c):
+    c.obj.least_common(10)
+
+
+@SORTED_SET.case('update')
+def _(c):
+    c.obj.update(TEN_MEMBERS)
+
+
+@SORTED_SET.case('clear', raw=lambda c: c.client.delete(c.key),
+                 prepare=lambda c: c.client.zadd(c.key, 1, 'x'),
+                 destructive=True)
+def _(c):
+    c.obj.clear()
+
+
+# Hash (mixin methods)
+
+@HASH.case('pop', raw=lambda c: c.client.hdel(c.key, 'x'),
+           prepare=lambda c: c.client.hset(c.key, 'x', '1'))
+def _(c):
+    c.obj.pop('x')
+
+
+@HASH.case('popitem', prepare=lambda c: c.client.hset(c.key, 'x', '1'),
+           max_size=LINEAR_MAX_SIZE, destructive=True)
+def _(c):
+    c.obj.popitem()
+
+
+# List (mixin methods)
+
+@LIST.case('__iadd__', raw=lambda c: c.client.rpush(c.key, *TEN_MEMBERS),
+           prepare=lambda c: c.client.ltrim(c.key, 0, c.size - 1))
+def _(c):
+    obj = c.obj
+    obj += TEN_MEMBERS
+
+
+@LIST.case('remove', prepare=lambda c: c.client.lpush(c.key, 'x'))
+def _(c):
+    c.obj.remove('x')
+
+
+@LIST.case('reverse', max_size=ROUND_TRIP_MAX_SIZE)
+def _(c):
+    c.obj.reverse()
+
+
+@LIST.case('clear', raw=lambda c: c.client.delete(c.key),
+           prepare=lambda c: c.client.rpush(c.key, *TEN_MEMBERS),
+           destructive=True)
+def _(c):
+    c.obj.clear()
+
+
+# Set and SortedSet operators
+
+def _binary(method, other_set=False):
+    def function(c):
+        if other_set:
+            other = c.session.get(c.other_key, types.Set)
+        else:
+            other = TEN_MEMBERS
+        getattr(c.obj, method)(other)
+    return function
+
+
+_ADD_X = {
+    SET: lambda c: c.client.sadd(c.key, 'x'),
+    SORTED_SET: lambda c: c.client.zadd(c.key, 1, 'x'),
+}
+
+#: (:class:`frozenset`) Operators which :class:`~sider.sortedset.SortedSet`
+#: inherits from :class:`collections.MutableSet` but can't run, because they
+#: construct a new set by calling the class with only an iterable.
+SORTED_SET_BROKEN = frozenset([
+    '__and__', '__or__', '__sub__', '__xor__', '__iand__', '__ixor__'
+])
+
+for _group in SET, SORTED_SET:
+    _skip = SORTED_SET_BROKEN if _group is SORTED_SET else frozenset()
+    for _method in ('__and__', '__or__', '__sub__', '__xor__', 'isdisjoint',
+                    'issuperset', 'symmetric_difference'):
+        if _method in _skip or not hasattr(_group.cls, _method) or \
+           any(case.method == _method for case in _group.cases):
+            continue
+        _group.case(_method, max_size=LINEAR_MAX_SIZE)(
+            _binary(_method, _group is SET)
+        )
+    for _method in ('__iand__', '__ior__', '__isub__', '__ixor__',
+                    'difference_update', 'intersection_update',
+                    'symmetric_difference_update'):
+        if _method in _skip or not hasattr(_group.cls, _method):
+            continue
+        _group.case(_method, max_size=LINEAR_MAX_SIZE, destructive=True)(
+            _binary(_method)
+        )
+    _group.case('remove', prepare=_ADD_X[_group])(
+        lambda c: c.obj.remove('x')
+    )
+
+del _group, _method, _skip
+
+
+# SortedSet (rest)
+
+@SORTED_SET.case('get', raw=lambda c: c.client.zscore(c.key, 'm0'))
+def _(c):
+    c.obj.get('m0')
+
+
+@SORTED_SET.case('keys', raw=lambda c: c.client.zrange(c.key, 0, -1),
+                 max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.keys()
+
+
+@SORTED_SET.case('values',
+                 raw=lambda c: c.client.zrange(c.key, 0, -1, withscores=True),
+                 max_size=LINEAR_MAX_SIZE)
+def _(c):
+    c.obj.values()
+
+
+@SORTED_SET.case('setdefault', raw=lambda c: c.client.zscore(c.key, 'm0'))
+def _(c):
+    c.obj.setdefault('m0')
+
+
+@SORTED_SET.case('pop', prepare=lambda c: c.client.zadd(c.key, 1, 'x'))
+def _(c):
+    c.obj.pop('x')
+
+
+@SORTED_SET.case('popitem', prepare=lambda c: c.client.zadd(c.key, -1, 'x'))
+def _(c):
+    c.obj.popitem()
+
+
+# Codecs
+
+CODEC_SAMPLES = [
+    ('ByteString', types.ByteString(), b'bytes value'),
+    ('UnicodeString', types.UnicodeString(), u'unicode value'),
+    ('Integer', types.Integer(), 1234567),
+    ('Float', types.Float(), 1234.5678),
+    ('Int64', types.Int64(), 1234567),
+    ('Float64', types.Float64(), 1234.5678),
+    ('Boolean', types.Boolean(), True),
+    ('Date', types.Date(), datetime.date(2015, 8, 16)),
+    ('DateTime', types.DateTime(),
+     datetime.datetime(2015, 8, 16, 12, 34, 56, 789)),
+    ('Time', types.Time(), datetime.time(12, 34, 56, 789)),
+    ('TimeDelta', types.TimeDelta(), datetime.timedelta(days=1, seconds=2)),
+    ('UUID', types.UUID(), uuid.UUID(int=1234567890)),
+    ('Tuple', types.Tuple(types.Integer, types.UnicodeString),
+     (1, u'tuple')),
+    ('PackedTuple', types.PackedTuple('<qqd'), (1, 2, 3.5)),
+    ('Compressed', types.Compressed(types.UnicodeString),
+     u'<li class="item">compressed value</li>' * 20),
+    ('JSON', types.JSON(), {u'id': 1234567, u'tags': [u'a', u'b'],
+                            u'score': 0.5, u'active': True}),
+    ('Pickle', types.Pickle(), {'id': 1234567, 'tags': ('a', 'b'),
+                                'score': 0.5, 'active': True}),
+]
+
+CODECS = []
+
+for _name, _value_type, _value in CODEC_SAMPLES:
+    _group = Group('types.' + _name, _value_type)
+    _bulk = _value_type.encode(_value)
+    _group.case('encode')(
+        lambda c, value=_value: c.obj.encode(value)
+    )
+    _group.case('decode')(
+        lambda c, bulk=_bulk: c.obj.decode(bulk)
+    )
+    _group.case('encode_many')(
+        lambda c, values=[_value] * 1000: c.obj.encode_many(values)
+    )
+    _group.case('decode_many')(
+        lambda c, bulks=[_bulk] * 1000: c.obj.decode_many(bulks)
+    )
+    CODECS.append(_group)
+
+del _name, _value_type, _value, _group, _bulk
+
+
+#: (:class:`list`) All benchmark groups.
+GROUPS = [HASH, LIST, SET, SORTED_SET] + CODECS
@@ -0,0 +1,386 @@
+""":mod:`siderbench.runner` --- Measuring and reporting
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""
+from __future__ import absolute_import, division
+import collections
+import inspect
+import math
+from timeit import default_timer
+from sider.session import Session
+
+
+#: (:class:`tuple`) The default data sizes.
+SIZES = 10, 100, 1000, 10000, 100000, 1000000
+
+#: (:class:`str`) The prefix of keys made by benchmarks.
+KEY_PREFIX = 'siderbench:'
+
+
+class Measurement(collections.namedtuple('Measurement',
+                                         'iterations ops p50 p99')):
+    """The measured numbers of an operation.
+
+    .. attribute:: iterations
+
+       (:class:`numbers.Integral`) The number of measured calls.
+
+    .. attribute:: ops
+
+       (:class:`numbers.Real`) Operations per second.
+
+    .. attribute:: p50
+
+       (:class:`numbers.Real`) The median latency in seconds.
+
+    .. attribute:: p99
+
+       (:class:`numbers.Real`) The 99th percentile latency in seconds.
+
+    """
+
+    __slots__ = ()
+
+
+class Result(collections.namedtuple('Result', 'group method size sider raw')):
+    """The result of a benchmark :class:`Case`.
+
+    .. attribute:: group
+
+       (:class:`str`) The group name e.g. ``'Hash'``.
+
+    .. attribute:: method
+
+       (:class:`str`) The method name e.g. ``'__getitem__'``.
+
+    .. attribute:: size
+
+       (:class:`numbers.Integral`) The data size.  It's ``None``
+       for benchmarks which don't depend on data sizes.
+
+    .. attribute:: sider
+
+       (:class:`Measurement`) The numbers of the Sider operation.
+
+    .. attribute:: raw
+
+       (:class:`Measurement`) The numbers of the equivalent raw redis-py
+       calls.  It could be ``None``.
+
+    """
+
+    __slots__ = ()
+
+    @property
+    def overhead(self):
+        """(:class:`numbers.Real`) How much slower the Sider operation
+        is than raw redis-py in median latency, e.g. 0.1 means 10%.
+        It's ``None`` if there's no :attr:`raw` measurement.
+
+        """
+        if self.raw is None or not self.raw.p50:
+            return None
+        return self.sider.p50 / self.raw.p50 - 1
+
+    def to_json(self):
+        """Makes a JSON-serializable dictionary of the result."""
+        data = {'group': self.group, 'method': self.method,
+                'size': self.size, 'sider': self.sider._asdict(),
+                'raw': self.raw and self.raw._asdict(),
+                'overhead': self.overhead}
+        data['sider'] = dict(data['sider'])
+        if data['raw'] is not None:
+            data['raw'] = dict(data['raw'])
+        return data
+
+
+class Context(object):
+    """What benchmark functions take.
+
+    .. attribute:: session
+
+       (:class:`sider.session.Session`) The session.
+
+    .. attribute:: client
+
+       (:class:`redis.client.StrictRedis`) The raw client.
+
+    .. attribute:: key
+
+       (:class:`str`) The populated key.
+
+    .. attribute:: other_key
+
+       (:class:`str`) The populated key of another small value of the same
+       type, for binary operations e.g. :meth:`Set.union()
+       <sider.set.Set.union>`.
+
+    .. attribute:: size
+
+       (:class:`numbers.Integral`) The data size.
+
+    .. attribute:: obj
+
+       The Sider object of the :attr:`key`, or the
+       :class:`~sider.types.Value` instance for codec benchmarks.
+
+    """
+
+    def __init__(self, session, client, key, other_key, size, obj):
+        self.session = session
+        self.client = client
+        self.key = key
+        self.other_key = other_key
+        self.size = size
+        self.obj = obj
+
+
+class Case(object):
+    """A benchmark of a method.
+
+    :param group: the group it belongs to
+    :type group: :class:`Group`
+    :param method: the method name
+    :type method: :class:`str`
+    :param function: the function which calls the method once.
+                     it takes a :class:`Context`
+    :type function: :class:`collections.Callable`
+    :param raw: the function which sends the same commands through raw
+                redis-py.  it takes a :class:`Context`
+    :type raw: :class:`collections.Callable`
+    :param prepare: the function called before every call, which isn't
+                    measured.  it takes a :class:`Context`
+    :type prepare: :class:`collections.Callable`
+    :param max_size: skip data sizes greater than it
+    :type max_size: :class:`numbers.Integral`
+    :param destructive: whether to populate data again after
+                        the benchmark
+    :type destructive: :class:`bool`
+
+    """
+
+    def __init__(self, group, method, function, raw=None, prepare=None,
+                 max_size=None, destructive=False):
+        self.group = group
+        self.method = method
+        self.function = function
+        self.raw = raw
+        self.prepare = prepare
+        self.max_size = max_size
+        self.destructive = destructive
+
+    @property
+    def name(self):
+        """(:class:`str`) The qualified name e.g. ``'Hash.__getitem__'``."""
+        return self.group.name + '.' + self.method
+
+    def __repr__(self):
+        return '<siderbench.runner.Case {0}>'.format(self.name)
+
+
+class Group(object):
+    """The group of benchmark cases on the same value type.
+
+    :param name: the group name e.g. ``'Hash'``
+    :type name: :class:`str`
+    :param value_type: the value type
+    :type value_type: :class:`sider.types.Value`
+    :param populate: the function to fill the given key with the given
+                     number of elements.  it takes a raw client, a key
+                     and a size.  ``None`` for benchmarks which don't
+                     need the server e.g. codecs
+    :type populate: :class:`collections.Callable`
+    :param cls: the class of which public methods have to be benchmarked.
+                see also :meth:`uncovered()`
+    :type cls: :class:`type`
+
+    """
+
+    def __init__(self, name, value_type, populate=None, cls=None):
+        self.name = name
+        self.value_type = value_type
+        self.populate = populate
+        self.cls = cls
+        self.cases = []
+
+    def case(self, method, raw=None, prepare=None, max_size=None,
+             destructive=False):
+        """The decorator which registers a benchmark function."""
+        def decorator(function):
+            self.cases.append(Case(self, method, function, raw=raw,
+                                   prepare=prepare, max_size=max_size,
+                                   destructive=destructive))
+            return function
+        return decorator
+
+    def uncovered(self):
+        """Lists public methods of :attr:`cls` which have no benchmarks.
+
+        :rtype: :class:`list`
+
+        """
+        if self.cls is None:
+            return []
+        covered = set(case.method for case in self.cases)
+        methods = []
+        for name, _ in inspect.getmembers(self.cls, callable):
+            if name.startswith('_') and name not in PROTOCOL_METHODS:
+                continue
+            elif name not in covered:
+                methods.append(name)
+        return methods
+
+
+#: (:class:`frozenset`) Special methods regarded as public.
+PROTOCOL_METHODS = frozenset([
+    '__contains__', '__delitem__', '__getitem__', '__iter__', '__len__',
+    '__reversed__', '__setitem__', '__and__', '__or__', '__sub__', '__xor__',
+    '__iand__', '__ior__', '__isub__', '__ixor__', '__iadd__', '__add__',
+])
+
+
+def percentile(sorted_values, rank):
+    """Gets the ``rank`` (0--1) percentile of ``sorted_values`` by
+    the nearest-rank method.
+
+    """
+    index = max(0, int(math.ceil(rank * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def measure(function, prepare=None, duration=0.2, min_iterations=5,
+            max_iterations=100000):
+    """Calls the ``function`` repeatedly and measures it.
+
+    :param function: the function to measure.  it takes no arguments
+    :type function: :class:`collections.Callable`
+    :param prepare: the function to call before every call
+                    without measurement
+    :type prepare: :class:`collections.Callable`
+    :param duration: the seconds to keep measuring.  default is 0.2
+    :type duration: :class:`numbers.Real`
+    :param min_iterations: the minimum number of calls.  default is 5
+    :type min_iterations: :class:`numbers.Integral`
+    :param max_iterations: the maximum number of calls.  default is 100000
+    :type max_iterations: :class:`numbers.Integral`
+    :rtype: :class:`Measurement`
+
+    """
+    timer = default_timer
+    latencies = []
+    deadline = timer() + duration
+    while True:
+        if prepare is not None:
+            prepare()
+        started_at = timer()
+        function()
+        latencies.append(timer() - started_at)
+        count = len(latencies)
+        if count >= max_iterations or \
+           count >= min_iterations and timer() >= deadline:
+            break
+    total = sum(latencies)
+    latencies.sort()
+    return Measurement(count, count / total if total else float('inf'),
+                       percentile(latencies, 0.5), percentile(latencies, 0.99))
+
+
+def run(client, groups, sizes=SIZES, duration=0.2, min_iterations=5,
+        filter=None, progress=None):
+    """Runs benchmarks of the ``groups``.
+
+    :param client: the client of the server to run benchmarks against.
+                   keys starting with :const:`KEY_PREFIX` are overwritten
+    :type client: :class:`redis.client.StrictRedis`
+    :param groups: :class:`Group` objects
+    :type groups: :class:`collections.Iterable`
+    :param sizes: data sizes.  default is :const:`SIZES`
+    :type sizes: :class:`collections.Iterable`
+    :param duration: seconds to measure each method.  see also
+                     :func:`measure()`
+    :type duration: :class:`numbers.Real`
+    :param min_iterations: the minimum number of calls of each method
+    :type min_iterations: :class:`numbers.Integral`
+    :param filter: the function which takes a :class:`Case` and decides
+                   whether to run it
+    :type filter: :class:`collections.Callable`
+    :param progress: the function called with a :class:`Case` and
+                     a size before running it
+    :type progress: :class:`collections.Callable`
+    :returns: the generator of :class:`Result` objects
+
+    """
+    session = Session(client)
+    options = {'duration': duration, 'min_iterations': min_iterations}
+    for group in groups:
+        cases = [case for case in group.cases
+                 if filter is None or filter(case)]
+        if not cases:
+            continue
+        group_sizes = [None] if group.populate is None else sizes
+        for size in group_sizes:
+            key = KEY_PREFIX + group.name
+            other_key = KEY_PREFIX + group.name + ':other'
+            if group.populate is None:
+                obj = group.value_type
+            else:
+                group.populate(client, key, size)
+                group.populate(client, other_key, 10)
+                obj = session.get(key, group.value_type)
+            context = Context(session, client, key, other_key, size, obj)
+            for case in cases:
+                if case.max_size is not None and size is not None and \
+                   size > case.max_size:
+                    continue
+                if progress is not None:
+                    progress(case, size)
+                prepare = case.prepare and (lambda: case.prepare(context))
+                result = measure(lambda: case.function(context), prepare,
+                                 **options)
+                if case.destructive:
+                    group.populate(client, key, size)
+                raw = None
+                if case.raw is not None:
+                    raw = measure(lambda: case.raw(context), prepare,
+                                  **options)
+                    if case.destructive:
+                        group.populate(client, key, size)
+                yield Result(group.name, case.method, size, result, raw)
+            if group.populate is not None:
+                client.delete(key, other_key)
+
+
+def format_results(results):
+    """Formats the results as a text table.
+
+    :param results: :class:`Result` objects
+    :type results: :class:`collections.Iterable`
+    :returns: the table text
+    :rtype: :class:`str`
+
+    """
+    header = ('method', 'size', 'ops/s', 'p50 us', 'p99 us',
+              'raw ops/s', 'raw p50 us', 'overhead')
+    rows = [header]
+    for result in results:
+        sider = result.sider
+        raw = result.raw
+        overhead = result.overhead
+        rows.append((
+            result.group + '.' + result.method,
+            '-' if result.size is None else str(result.size),
+            '{0:.0f}'.format(sider.ops),
+            '{0:.1f}'.format(sider.p50 * 1e6),
+            '{0:.1f}'.format(sider.p99 * 1e6),
+            '-' if raw is None else '{0:.0f}'.format(raw.ops),
+            '-' if raw is None else '{0:.1f}'.format(raw.p50 * 1e6),
+            '-' if overhead is None else '{0:+.1%}'.format(overhead)
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells.extend(cell.rjust(width)
+                     for cell, width in zip(row[1:], widths[1:]))
+        lines.append('  '.join(cells))
+    return '\n'.join(lines)
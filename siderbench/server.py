@@ -0,0 +1,125 @@
+""":mod:`siderbench.server` --- Local Redis server
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""
+from __future__ import absolute_import
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from redis.client import StrictRedis
+from redis.exceptions import ConnectionError
+
+
+def find_executable(name='redis-server'):
+    """Finds the executable ``name`` from :envvar:`PATH`.
+
+    :param name: the executable name.  default is ``'redis-server'``
+    :type name: :class:`str`
+    :returns: the path of the executable, or ``None``
+    :rtype: :class:`str`
+
+    """
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+
+
+def find_free_port():
+    """Finds a free TCP port of the local host.
+
+    :returns: the port number
+    :rtype: :class:`numbers.Integral`
+
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+class RedisServer(object):
+    """The ``redis-server`` process spawned for benchmarks.  It doesn't
+    persist anything, and its working directory is removed when it's
+    stopped.  It can be used as a context manager::
+
+        with RedisServer() as server:
+            client = server.client()
+
+    :param executable: the path of ``redis-server``.
+                       found from :envvar:`PATH` by default
+    :type executable: :class:`str`
+    :param port: the port to listen.  a free port by default
+    :type port: :class:`numbers.Integral`
+
+    """
+
+    #: (:class:`numbers.Real`) Seconds to wait for the server to be ready.
+    TIMEOUT = 10
+
+    def __init__(self, executable=None, port=None):
+        if executable is None:
+            executable = find_executable()
+            if executable is None:
+                raise IOError('redis-server is not found; '
+                              'specify its path explicitly')
+        self.executable = executable
+        self.port = find_free_port() if port is None else port
+        self.process = None
+        self.directory = None
+
+    def start(self):
+        """Spawns the server and waits until it's ready."""
+        self.directory = tempfile.mkdtemp(prefix='siderbench-')
+        self.process = subprocess.Popen(
+            [self.executable, '--port', str(self.port), '--bind', '127.0.0.1',
+             '--save', '', '--appendonly', 'no', '--dir', self.directory],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        client = self.client()
+        deadline = time.time() + self.TIMEOUT
+        while True:
+            try:
+                client.ping()
+            except ConnectionError:
+                if self.process.poll() is not None or time.time() > deadline:
+                    output = self.process.communicate()[0]
+                    self.stop()
+                    raise IOError('failed to start redis-server:\n' +
+                                  output.decode('utf-8', 'replace'))
+                time.sleep(0.05)
+            else:
+                break
+
+    def stop(self):
+        """Terminates the server."""
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.terminate()
+                self.process.wait()
+            self.process = None
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def client(self, db=0):
+        """Makes a client connected to the server.
+
+        :param db: the database number.  default is 0
+        :type db: :class:`numbers.Integral`
+        :rtype: :class:`redis.client.StrictRedis`
+
+        """
+        return StrictRedis(host='127.0.0.1', port=self.port, db=db)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
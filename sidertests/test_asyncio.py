@@ -0,0 +1,207 @@
+import asyncio
+import datetime
+import os
+import pytest
+from pytest import raises
+asyncio_redis = pytest.importorskip('redis.asyncio')
+from sider.asyncio import (AsyncHash, AsyncList, AsyncSession, AsyncSet,
+                           AsyncSortedSet, AsyncTransaction)
+from sider.exceptions import CommitError, DoubleTransactionError
+from sider.types import Hash, Integer, List, Set, SortedSet
+
+
+prefix = 'sidertests_asyncio_{0:%Y%m%d%H%M%S%f}_'.format(
+    datetime.datetime.now()
+)
+
+
+def key(key):
+    return prefix + str(key)
+
+
+def run(coroutine_function):
+    async def main():
+        client = asyncio_redis.StrictRedis(
+            host=os.environ.get('SIDERTEST_HOST', 'localhost'),
+            port=int(os.environ.get('SIDERTEST_PORT', 6379)),
+            db=int(os.environ.get('SIDERTEST_DB', 0))
+        )
+        session = AsyncSession(client)
+        session.verbose_transaction_error = True
+        try:
+            return await coroutine_function(session)
+        finally:
+            await client.close()
+    return asyncio.get_event_loop().run_until_complete(main())
+
+
+def test_session_bulk():
+    async def test(session):
+        keyid = key('test_asyncio_session_bulk')
+        assert await session.set(keyid, 123, Integer) == 123
+        assert await session.get(keyid, Integer) == 123
+        assert await session.get(keyid) == b'123'
+    run(test)
+
+
+def test_identity_map():
+    async def test(session):
+        keyid = key('test_asyncio_identity_map')
+        hash_ = await session.get(keyid, Hash)
+        assert isinstance(hash_, AsyncHash)
+        assert hash_ is await session.get(keyid, Hash)
+        assert hash_ is not await session.get(keyid, Hash(Integer))
+        assert hash_ is await session.set(keyid, {'a': 'b'}, Hash)
+    run(test)
+
+
+def test_hash():
+    async def test(session):
+        hash_ = await session.set(key('test_asyncio_hash'),
+                                  {'a': 1, 'b': 2}, Hash(value_type=Integer))
+        assert await hash_.length() == 2
+        assert await hash_.getitem('a') == 1
+        assert await hash_.get('c') is None
+        with raises(KeyError):
+            await hash_.getitem('c')
+        assert await hash_.contains('a')
+        assert not await hash_.contains('c')
+        await hash_.set('c', 3)
+        assert await hash_.items() == frozenset([('a', 1), ('b', 2),
+                                                 ('c', 3)])
+        assert sorted([k async for k in hash_]) == ['a', 'b', 'c']
+        await hash_.delete('a')
+        with raises(KeyError):
+            await hash_.delete('a')
+        assert await hash_.setdefault('b', 5) == 2
+        assert await hash_.setdefault('d', 4) == 4
+        await hash_.update({'e': 5}, f=6)
+        assert await hash_.keys() == frozenset('bcdef')
+        assert sorted(await hash_.values()) == [2, 3, 4, 5, 6]
+        await hash_.clear()
+        assert await hash_.length() == 0
+    run(test)
+
+
+def test_list():
+    async def test(session):
+        list_ = await session.set(key('test_asyncio_list'), ['a', 'b'], List)
+        assert isinstance(list_, AsyncList)
+        await list_.append('c')
+        await list_.extend('de')
+        assert [v async for v in list_] == list('abcde')
+        assert await list_.length() == 5
+        assert await list_.get(0) == 'a'
+        assert await list_.get(slice(1, 3)) == ['b', 'c']
+        assert await list_.get(slice(0, 0)) == []
+        assert await list_.get(slice(None, 0)) == []
+        assert await list_.get(slice(3, None)) == ['d', 'e']
+        with raises(IndexError):
+            await list_.get(10)
+        await list_.set(-1, 'E')
+        with raises(IndexError):
+            await list_.set(10, 'x')
+        assert await list_.pop() == 'E'
+        assert await list_.pop(0) == 'a'
+        assert await list_.get(slice(None, None)) == ['b', 'c', 'd']
+    run(test)
+
+
+def test_set():
+    async def test(session):
+        set_ = await session.set(key('test_asyncio_set'), set('abc'), Set)
+        assert isinstance(set_, AsyncSet)
+        await set_.add('d')
+        await set_.discard('a')
+        await set_.update('ef', ['g'])
+        assert await set_.members() == frozenset('bcdefg')
+        assert await set_.contains('b')
+        assert await set_.length() == 6
+        popped = await set_.pop()
+        assert popped not in await set_.members()
+        assert len({m async for m in set_}) == 5
+    run(test)
+
+
+def test_sortedset():
+    async def test(session):
+        zset = await session.set(key('test_asyncio_sortedset'),
+                                 {'a': 1, 'b': 2}, SortedSet)
+        assert isinstance(zset, AsyncSortedSet)
+        await zset.add('a', 2)
+        await zset.set('c', 5)
+        assert await zset.items() == [('b', 2), ('a', 3), ('c', 5)]
+        assert await zset.most_common(1) == [('c', 5)]
+        assert [m async for m in zset] == ['b', 'a', 'c']
+        assert await zset.score('a') == 3
+        assert await zset.get('z') is None
+        await zset.discard('b', 2)
+        assert not await zset.contains('b')
+        await zset.delete('a')
+        with raises(KeyError):
+            await zset.delete('a')
+        assert await zset.length() == 1
+    run(test)
+
+
+def test_transaction():
+    async def test(session):
+        keyid = key('test_asyncio_transaction')
+        hash_ = await session.set(keyid, {'a': 'b'}, Hash)
+        trials = []
+        async def block(trial, transaction):
+            trials.append(trial)
+            value = await hash_.getitem('a')
+            if trial == 0:
+                await session.basic_client.hset(keyid, 'a', 'conflict')
+            await hash_.set('a', '(' + value + ')')
+            with raises(CommitError):
+                await hash_.getitem('a')
+        await session.transaction(block)
+        assert trials == [0, 1]
+        assert await hash_.getitem('a') == '(conflict)'
+        async with AsyncTransaction(session, [keyid]):
+            with raises(DoubleTransactionError):
+                async with AsyncTransaction(session):
+                    pass
+            await hash_.set('b', 'c')
+        assert await hash_.getitem('b') == 'c'
+    run(test)
+
+
+def test_transaction_writes_containers():
+    async def test(session):
+        keyid = key('test_asyncio_transaction_writes_containers')
+        hash_ = await session.set(keyid, {'a': 'b'}, Hash)
+        list_ = await session.set(keyid + '_list', ['1'], List)
+        set_ = await session.set(keyid + '_set', set('x'), Set)
+        async with AsyncTransaction(session):
+            await hash_.set('c', '1')
+            await list_.append('2')
+        async def block(trial, transaction):
+            value = await hash_.getitem('a')
+            await list_.append(value)
+            await set_.add(value)
+        await session.transaction(block, [keyid])
+        assert await hash_.getitem('c') == '1'
+        assert await list_.get(slice(None, None)) == ['1', '2', 'b']
+        assert await set_.members() == frozenset('xb')
+    run(test)
+
+
+def test_transaction_per_task():
+    async def test(session):
+        list_ = await session.set(key('test_asyncio_transaction_per_task'),
+                                  [], List)
+        started = asyncio.Event()
+        async def in_transaction(trial, transaction):
+            await list_.append('a')
+            started.set()
+            await asyncio.sleep(0.05)
+        async def outside():
+            await started.wait()
+            assert session.current_transaction is None
+            await list_.append('b')
+        await asyncio.gather(session.transaction(in_transaction), outside())
+        assert await list_.get(slice(None, None)) == ['b', 'a']
+    run(test)
@@ -0,0 +1,125 @@
+import threading
+import time
+from pytest import raises
+from redis.exceptions import ResponseError
+from .env import get_client, get_session, key
+from sider.autopipeline import AutoPipeline
+from sider.session import Session
+from sider.types import Hash, List, Set, SortedSet, ByteString
+
+
+def pipelined_session(**kwargs):
+    session = Session(get_client(), autopipeline=AutoPipeline(**kwargs))
+    session.verbose_transaction_error = True
+    return session
+
+
+def test_size_limit():
+    session = pipelined_session(size=3, window=None)
+    other = get_session()
+    keyid = key('test_autopipeline_size_limit')
+    list_ = session.get(keyid, List)
+    list_.append('a')
+    list_.append('b')
+    assert session.autopipeline.pending == 2
+    assert list(other.get(keyid, List)) == []
+    list_.append('c')
+    assert session.autopipeline.pending == 0
+    assert list(other.get(keyid, List)) == ['a', 'b', 'c']
+
+
+def test_window():
+    session = pipelined_session(size=100, window=0.01)
+    other = get_session()
+    keyid = key('test_autopipeline_window')
+    set_ = session.get(keyid, Set)
+    set_.add('a')
+    set_.add('b')
+    for _ in range(100):
+        if not session.autopipeline.pending:
+            break
+        time.sleep(0.01)
+    assert set(other.get(keyid, Set)) == set('ab')
+
+
+def test_query_flushes():
+    session = pipelined_session(size=100, window=None)
+    hashid = key('test_autopipeline_query_flushes_hash')
+    hash_ = session.get(hashid, Hash)
+    hash_['a'] = 'b'
+    assert session.autopipeline.pending == 1
+    assert hash_['a'] == 'b'
+    assert session.autopipeline.pending == 0
+    zsetid = key('test_autopipeline_query_flushes_sortedset')
+    zset = session.get(zsetid, SortedSet)
+    zset.add('a')
+    zset.add('a')
+    zset['b'] = 5
+    assert session.autopipeline.pending == 3
+    assert zset.items() == [('a', 2), ('b', 5)]
+
+
+def test_transaction_is_not_pipelined():
+    session = pipelined_session(size=100, window=None)
+    keyid = key('test_autopipeline_transaction')
+    list_ = session.get(keyid, List)
+    list_.append('a')
+    def block(trial, transaction):
+        list_.append('b')
+    session.transaction(block, [keyid])
+    assert session.autopipeline.pending == 0
+    assert list(list_) == ['a', 'b']
+
+
+def test_error():
+    session = pipelined_session(size=100, window=None)
+    keyid = key('test_autopipeline_error')
+    session.set(keyid, b'string', ByteString)
+    list_ = session.get(keyid, List)
+    list_.append('a')
+    with raises(ResponseError):
+        session.autopipeline.flush()
+    assert session.autopipeline.pending == 0
+    session.autopipeline.flush()
+
+
+def test_window_error():
+    session = pipelined_session(size=100, window=0.01)
+    keyid = key('test_autopipeline_window_error')
+    session.set(keyid, b'string', ByteString)
+    list_ = session.get(keyid, List)
+    list_.append('a')
+    for _ in range(100):
+        if not session.autopipeline.pending:
+            break
+        time.sleep(0.01)
+    assert session.autopipeline.pending == 0
+    # the error isn't raised to other threads
+    errors = []
+    def flush():
+        try:
+            session.autopipeline.flush()
+        except ResponseError as e:
+            errors.append(e)
+    thread = threading.Thread(target=flush)
+    thread.start()
+    thread.join()
+    assert errors == []
+    with raises(ResponseError):
+        session.autopipeline.flush()
+    session.autopipeline.flush()
+
+
+def test_close():
+    session = pipelined_session(size=100, window=10)
+    other = get_session()
+    keyid = key('test_autopipeline_close')
+    list_ = session.get(keyid, List)
+    list_.append('a')
+    assert session.autopipeline.flusher.is_alive()
+    session.autopipeline.close()
+    assert not session.autopipeline.flusher.is_alive()
+    assert session.autopipeline.pending == 0
+    assert list(other.get(keyid, List)) == ['a']
+    with raises(RuntimeError):
+        list_.append('b')
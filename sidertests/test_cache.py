@@ -0,0 +1,217 @@
+import threading
+import time
+import warnings
+from pytest import raises
+from redis.exceptions import ResponseError
+from .env import get_client, get_session, key
+from sider.autopipeline import AutoPipeline
+from sider.cache import Cache
+from sider.session import Session
+from sider.types import Hash, Set, SortedSet, Integer
+from sider.warnings import SiderWarning
+
+
+def cached_session(**kwargs):
+    session = Session(get_client(), cache=Cache(**kwargs))
+    session.verbose_transaction_error = True
+    return session
+
+
+def test_lru():
+    cache = Cache(maxsize=2)
+    for i in range(3):
+        token = cache.reserve('k{0}'.format(i))
+        assert cache.store(token, ('k{0}'.format(i), 'get'), i)
+    assert len(cache) == 2
+    with raises(KeyError):
+        cache.get(('k0', 'get'))
+    assert cache.get(('k1', 'get')) == 1
+    token = cache.reserve('k3')
+    cache.store(token, ('k3', 'get'), 3)
+    with raises(KeyError):
+        cache.get(('k2', 'get'))
+    assert cache.get(('k1', 'get')) == 1
+    cache.invalidate(['k1'])
+    with raises(KeyError):
+        cache.get(('k1', 'get'))
+    with raises(ValueError):
+        Cache(maxsize=0)
+
+
+def test_reservation():
+    cache = Cache()
+    token = cache.reserve('a')
+    cache.invalidate(['a'])
+    assert not cache.store(token, ('a', 'get'), 1)
+    with raises(KeyError):
+        cache.get(('a', 'get'))
+
+
+def test_cached_query():
+    session = cached_session()
+    other = get_session()
+    keyid = key('test_cache_cached_query')
+    hash_ = session.set(keyid, {'a': '1', 'b': '2'}, Hash)
+    assert hash_['a'] == '1'
+    assert dict(hash_.items()) == {'a': '1', 'b': '2'}
+    other.get(keyid, Hash)['a'] = 'changed'
+    # the session doesn't know the change by the other session
+    assert hash_['a'] == '1'
+    assert dict(hash_.items()) == {'a': '1', 'b': '2'}
+    hash_['b'] = '3'
+    assert hash_['a'] == 'changed'
+    assert dict(hash_.items()) == {'a': 'changed', 'b': '3'}
+    del hash_['b']
+    assert dict(hash_.items()) == {'a': 'changed'}
+
+
+def test_cached_containers():
+    session = cached_session()
+    other = get_session()
+    setid = key('test_cache_cached_containers_set')
+    set_ = session.set(setid, set('abc'), Set)
+    assert set(set_) == set('abc')
+    other.get(setid, Set).add('d')
+    assert set(set_) == set('abc')
+    set_.discard('a')
+    assert set(set_) == set('bcd')
+    zsetid = key('test_cache_cached_containers_sortedset')
+    zset = session.set(zsetid, {'a': 1, 'b': 2}, SortedSet)
+    assert zset.items() == [('a', 1), ('b', 2)]
+    zset.add('a', 2)
+    assert zset.items() == [('b', 2), ('a', 3)]
+    intid = key('test_cache_cached_containers_int')
+    session.set(intid, 1, Integer)
+    assert session.get(intid, Integer) == 1
+    other.set(intid, 2, Integer)
+    assert session.get(intid, Integer) == 1
+    session.set(intid, 3, Integer)
+    assert session.get(intid, Integer) == 3
+
+
+def test_transaction_bypasses_cache():
+    session = cached_session()
+    other = get_session()
+    keyid = key('test_cache_transaction_bypasses_cache')
+    hash_ = session.set(keyid, {'a': '1'}, Hash)
+    assert hash_['a'] == '1'
+    other.get(keyid, Hash)['a'] = '2'
+    def block(trial, transaction):
+        hash_['b'] = hash_['a']
+    session.transaction(block, [keyid])
+    assert dict(hash_) == {'a': '2', 'b': '2'}
+    assert hash_['a'] == '2'
+
+
+def test_read_between_invalidation_and_write():
+    session = cached_session()
+    keyid = key('test_cache_read_between_invalidation_and_write')
+    hash_ = session.set(keyid, {'a': '1'}, Hash)
+    assert hash_['a'] == '1'
+    session.mark_manipulative([keyid])
+    # another thread reads the old value after the invalidation
+    # but before the write
+    reads = []
+    thread = threading.Thread(target=lambda: reads.append(hash_['a']))
+    thread.start()
+    thread.join()
+    assert reads == ['1']
+    session.client.hset(keyid, 'a', '2')
+    assert hash_['a'] == '2'
+    session.set(keyid, {'a': '3'}, Hash)
+    assert hash_['a'] == '3'
+
+
+def test_autopipeline_invalidates_written():
+    session = Session(get_client(), cache=Cache(),
+                      autopipeline=AutoPipeline(window=None))
+    keyid = key('test_cache_autopipeline_invalidates_written')
+    hash_ = session.set(keyid, {'a': '1'}, Hash)
+    assert hash_['a'] == '1'
+    hash_['a'] = '2'
+    assert session.autopipeline.pending == 1
+    # another thread starts reading before the queued write is sent
+    token = session.cache.reserve(keyid)
+    # and the queued write is sent by yet another thread
+    thread = threading.Thread(target=session.autopipeline.flush)
+    thread.start()
+    thread.join()
+    assert not session.cache.store(token, (keyid, 'hget'), '1')
+    assert session.take_written() is None
+    assert hash_['a'] == '2'
+
+
+def test_tracking():
+    session = cached_session(tracking=True)
+    other = get_session()
+    assert session.cache.listener.ready.wait(5)
+    keyid = key('test_cache_tracking')
+    hash_ = session.set(keyid, {'a': '1'}, Hash)
+    # invalidation messages of its own writes can arrive late
+    for _ in range(50):
+        assert hash_['a'] == '1'
+        if len(session.cache):
+            break
+        time.sleep(0.01)
+    assert len(session.cache) == 1
+    other.get(keyid, Hash)['a'] = '2'
+    for _ in range(50):
+        if hash_['a'] == '2':
+            break
+        time.sleep(0.01)
+    assert hash_['a'] == '2'
+    session.cache.close()
+    assert len(session.cache) == 0
+
+
+def test_tracking_refused():
+    # overlapping prefixes are refused by CLIENT TRACKING
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        session = cached_session(tracking=True, prefixes=['a', 'ab'])
+        listener = session.cache.listener
+        listener.join(5)
+    assert not listener.is_alive()
+    assert isinstance(listener.error, ResponseError)
+    assert any(issubclass(w.category, SiderWarning) for w in caught)
+    assert not session.cache.available
+    session.cache.close()
+
+
+def test_get_many():
+    session = cached_session()
+    other = get_session()
+    keys = [key('test_cache_get_many_{0}'.format(i)) for i in range(3)]
+    session.set_many(dict(zip(keys, range(3))), Integer)
+    assert session.get(keys[0], Integer) == 0
+    assert len(session.cache) == 1
+    assert session.get_many(keys, Integer) == [0, 1, 2]
+    assert len(session.cache) == 3
+    other.set_many(dict.fromkeys(keys, 5), Integer)
+    assert session.get_many(keys, Integer) == [0, 1, 2]
+    assert [session.get(k, Integer) for k in keys] == [0, 1, 2]
+    session.set(keys[1], 6, Integer)
+    assert session.get_many(keys, Integer) == [0, 6, 2]
+
+
+def test_get_many_prefetches():
+    session = cached_session()
+    keys = [key('test_cache_get_many_prefetches_{0}'.format(i))
+            for i in range(3)]
+    session.set_many(dict((k, {'a': str(i)}) for i, k in enumerate(keys)),
+                     Hash)
+    hashes = session.get_many(keys, Hash)
+    assert len(session.cache) == 3
+    get_session().get(keys[0], Hash)['a'] = 'changed'
+    assert [dict(h.items()) for h in hashes] == [{'a': '0'}, {'a': '1'},
+                                                 {'a': '2'}]
+    sets = session.get_many(keys[:2], Set)
+    assert len(session.cache) == 3
+    with raises(ResponseError):
+        set(sets[0])
+    setid = key('test_cache_get_many_prefetches_set')
+    session.set(setid, set('ab'), Set)
+    sets = session.get_many([setid], Set)
+    assert len(session.cache) == 4
+    assert sets[0] is session.get(setid, Set)
+    assert set(sets[0]) == set('ab')
@@ -0,0 +1,124 @@
+import threading
+from pytest import raises
+from redis.client import StrictRedis
+from redis.exceptions import ConnectionError, ResponseError
+from .env import get_client, key
+from sider.groupcommit import GroupCommit
+from sider.instrumentation import Stats
+from sider.session import Session
+from sider.types import Hash, List, SortedSet
+
+
+def grouped_session(**kwargs):
+    stats = Stats()
+    session = Session(get_client(), group_commit=GroupCommit(**kwargs),
+                      instruments=[stats])
+    session.verbose_transaction_error = True
+    return session, stats
+
+
+def test_group_commit():
+    session, stats = grouped_session(size=8, window=1)
+    keyid = key('test_groupcommit_group_commit')
+    hash_ = session.set(keyid, {}, Hash)
+    set_ = session.set(keyid + '_set', {}, SortedSet)
+    results = []
+    def commit(i):
+        with session.atomic():
+            hash_[str(i)] = 'x'
+            added = session.client.zincrby(set_.key, 'count', i)
+        results.append(added.result)
+    stats.reset()
+    threads = [threading.Thread(target=commit, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = stats.snapshot()
+    assert snapshot.round_trips == 1
+    assert snapshot.commands == 8 * 4
+    assert sorted(results)[-1] == sum(range(8))
+    assert dict(hash_) == dict((str(i), 'x') for i in range(8))
+    assert dict(set_) == {'count': sum(range(8))}
+    assert session.group_commit.pending == 0
+
+
+def test_window():
+    session, stats = grouped_session(size=100, window=0.01)
+    keyid = key('test_groupcommit_window')
+    list_ = session.set(keyid, [], List)
+    with session.atomic():
+        list_.append('a')
+        list_.append('b')
+    assert list(list_) == ['a', 'b']
+    with session.atomic():
+        pass
+    assert list(list_) == ['a', 'b']
+
+
+def test_errors():
+    session, stats = grouped_session(size=2, window=0.05)
+    keyid = key('test_groupcommit_errors')
+    list_ = session.set(keyid, ['a'], List)
+    hash_ = session.set(keyid + '_hash', {}, Hash)
+    errors = []
+    def fail():
+        try:
+            with session.atomic():
+                hash_['a'] = 'b'
+                session.client.hset(keyid, 'a', 'b')  # WRONGTYPE
+        except ResponseError as e:
+            errors.append(e)
+    thread = threading.Thread(target=fail)
+    thread.start()
+    with session.atomic():
+        list_.append('b')
+    thread.join()
+    assert len(errors) == 1
+    assert 'WRONGTYPE' in str(errors[0])
+    assert list(list_) == ['a', 'b']
+    # Commands before the error in the same batch are committed anyway,
+    # as Redis transactions don't roll back.
+    assert dict(hash_) == {'a': 'b'}
+    with raises(ResponseError):
+        with session.atomic():
+            session.client.execute_command('HSET', keyid)  # wrong arity
+    with raises(ValueError):
+        GroupCommit(size=0)
+    with raises(ValueError):
+        GroupCommit(window=-1)
+    with raises(RuntimeError):
+        session.group_commit.bind(get_client())
+
+
+def test_connection_error():
+    # Nothing listens on the port 1.
+    client = StrictRedis(host='localhost', port=1)
+    errors = []
+    def commit(group_commit):
+        try:
+            group_commit.commit([(('SET', key('test_groupcommit_conn'), 'a'),
+                                  {})])
+        except ConnectionError as e:
+            errors.append(e)
+    # Sent by the caller which fills the size.
+    group_commit = GroupCommit(size=2, window=10)
+    group_commit.bind(client)
+    threads = [threading.Thread(target=commit, args=(group_commit,))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+    assert len(errors) == 2
+    # Sent by the flusher, which has to survive the error.
+    group_commit = GroupCommit(size=100, window=0.01)
+    group_commit.bind(client)
+    for _ in range(2):
+        thread = threading.Thread(target=commit, args=(group_commit,))
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+    assert len(errors) == 4
+    assert group_commit.flusher.is_alive()
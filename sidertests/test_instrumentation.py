@@ -0,0 +1,127 @@
+from .env import get_client, key
+from sider.autopipeline import AutoPipeline
+from sider.instrumentation import Command, Instrument
+from sider.session import Session
+from sider.types import Hash, Integer, List
+
+
+class RecordingInstrument(Instrument):
+
+    def __init__(self):
+        self.round_trips = []
+
+    def record(self, commands, latency):
+        assert latency >= 0
+        self.round_trips.append(list(commands))
+
+
+def instrumented_session(**kwargs):
+    session = Session(get_client(), **kwargs)
+    session.verbose_transaction_error = True
+    return session
+
+
+def test_command():
+    command = Command.from_args(('hget', 'key', u'가'))
+    assert command.name == 'HGET'
+    assert command.key == 'key'
+    assert command.size == 4 + 3 + 3
+    assert Command.from_args(('PING',)).key is None
+    assert Command.from_args(('MULTI',)).caller is None
+    assert Command.from_args(('EVALSHA', 'sha', 1, 'key', 'a')).key == 'key'
+    assert Command.from_args(('EVAL', 'return 1', 0)).key is None
+
+
+def test_record():
+    instrument = RecordingInstrument()
+    session = instrumented_session(instruments=[instrument])
+    keyid = key('test_instrumentation_record')
+    hash_ = session.set(keyid, {'a': '1'}, Hash)
+    del instrument.round_trips[:]
+    assert hash_['a'] == '1'
+    [[command]] = instrument.round_trips
+    assert command[:4] == ('HGET', keyid, len('HGET') + len(keyid) + 1,
+                           'sider.hash.Hash.__getitem__')
+    assert command.site.startswith(__file__.rstrip('c') + ':')
+    assert [k for k in hash_] == ['a']
+    assert instrument.round_trips[-1][0].caller == 'sider.hash.Hash.__iter__'
+    assert session.get(keyid, Hash) is hash_
+    assert len(instrument.round_trips) == 2
+
+
+def test_stats():
+    session = instrumented_session(stats=True)
+    keyid = key('test_instrumentation_stats')
+    list_ = session.set(keyid, ['a', 'b'], List)
+    session.reset_stats()
+    list_.append('c')
+    list_.append('d')
+    assert len(list_) == 4
+    stats = session.stats
+    assert stats.round_trips == 3
+    assert stats.commands == 3
+    assert stats.operations[('sider.list.List.append', 'RPUSH')].calls == 2
+    assert stats.operations[('sider.list.List.__len__', 'LLEN')].calls == 1
+    assert stats.size == sum(s.size for s in stats.operations.values())
+    assert stats.latency > 0
+    last = session.reset_stats()
+    assert last.round_trips == 3
+    assert session.stats.round_trips == 0
+    assert instrumented_session().stats is None
+
+
+def test_pipelines_and_transactions():
+    session = instrumented_session(stats=True)
+    keyid = key('test_instrumentation_pipelines_and_transactions')
+    session.set(keyid, {'a': '1'}, Hash)
+    stats = session.reset_stats()
+    assert stats.round_trips == 1
+    assert stats.operations[('sider.session.Session.set', 'DEL')].calls == 1
+    assert stats.operations[('sider.session.Session.set', 'HMSET')].calls == 1
+    hash_ = session.get(keyid, Hash)
+    def block(trial, transaction):
+        hash_['b'] = hash_['a']
+        hash_['c'] = '3'
+    session.transaction(block, [keyid])
+    stats = session.reset_stats()
+    # WATCH/HGET, and MULTI/HSET/HSET/EXEC
+    assert stats.round_trips == 2
+    assert stats.commands == 6
+    ops = stats.operations
+    assert ops[('sider.hash.Hash.__getitem__', 'WATCH')].calls == 1
+    assert ops[('sider.hash.Hash.__setitem__', 'HSET')].calls == 2
+    assert ops[('sider.hash.Hash.__getitem__', 'HGET')].calls == 1
+    assert ops[('sider.hash.Hash.__setitem__', 'MULTI')].calls == 1
+    assert hash_.setdefault('d', '4') == '4'
+    stats = session.reset_stats()
+    assert set(ops for ops, _ in stats.operations) == set([
+        'sider.hash.Hash.setdefault'
+    ])
+    # commands sent by the application inside transactions aren't
+    # attributed to the transaction internals
+    instrument = RecordingInstrument()
+    session.instruments.append(instrument)
+    def raw_block(trial, transaction):
+        session.client.hget(keyid, 'a')
+    session.transaction(raw_block, [keyid])
+    callers = [command.caller for commands in instrument.round_trips
+               for command in commands]
+    assert callers
+    assert not any(caller and caller.startswith('sider.transaction.')
+                   for caller in callers)
+
+
+def test_autopipeline():
+    session = instrumented_session(
+        stats=True, autopipeline=AutoPipeline(size=100, window=None)
+    )
+    keyid = key('test_instrumentation_autopipeline')
+    session.set(keyid, 0, Integer)
+    session.reset_stats()
+    list_ = session.get(key('test_instrumentation_autopipeline_list'), List)
+    list_.append('a')
+    list_.append('b')
+    session.autopipeline.flush()
+    stats = session.stats
+    assert stats.round_trips == 1
+    assert stats.operations[('sider.list.List.append', 'RPUSH')].calls == 2
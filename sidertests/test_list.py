@@ -58,6 +58,9 @@ def test_slice(session):
     assert ['d', 'e', 'f', 'g'] == list(list_[3:])
     assert ['e', 'f', 'g'] == list(list_[-3:])
     assert ['a', 'b', 'c', 'd', 'e', 'f', 'g'] == list(list_[:])
+    assert [] == list(list_[:0])
+    assert [] == list(list_[0:0])
+    assert [] == list(list_[3:0])
     listx = session.set(key('test_listx_slice'), range(1, 8), List(NInt))
     assert [1] == list(listx[:1])
     assert [1, 2, 3, 4] == list(listx[:-3])
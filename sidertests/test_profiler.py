@@ -0,0 +1,60 @@
+from pytest import raises
+from .env import key
+from .env import session
+from sider.profiler import Profile
+from sider.types import Hash, List
+
+
+def test_round_trips(session):
+    hash_ = session.set(key('test_profiler_round_trips'),
+                        {'a': '1', 'b': '2'}, Hash)
+    with session.profile() as profile:
+        assert hash_['a'] == '1'
+        hash_.update({'c': '3'})
+        assert len(hash_) == 3
+    assert profile.round_trips == 3
+    assert profile.operations['sider.hash.Hash.__getitem__'] == 1
+    assert profile.operations['sider.hash.Hash.update'] == 1
+    assert profile.findings == []
+    assert profile not in session.instruments
+    hash_['d'] = '4'
+    assert profile.round_trips == 3
+    assert profile.report().startswith('3 round trips, 5 commands\n')
+
+
+def test_n_plus_one(session):
+    hash_ = session.set(key('test_profiler_n_plus_one'),
+                        dict((str(i), str(i)) for i in range(20)), Hash)
+    with session.profile() as profile:
+        values = [hash_[str(i)] for i in range(20)]
+    assert values == [str(i) for i in range(20)]
+    [finding] = profile.findings
+    assert finding.caller == 'sider.hash.Hash.__getitem__'
+    assert finding.command == 'HGET'
+    assert finding.round_trips == 20
+    assert finding.site.startswith(__file__.rstrip('c') + ':')
+    assert 'HGETALL' in finding.suggestion
+    assert str(finding) in profile.report()
+    with session.profile(threshold=30) as profile:
+        values = [hash_[str(i)] for i in range(20)]
+    assert profile.findings == []
+
+
+def test_mixin_fallback(session):
+    list_ = session.set(key('test_profiler_mixin_fallback'),
+                        [str(i) for i in range(15)], List)
+    with session.profile() as profile:
+        assert list_.index('12') == 12
+    [finding] = profile.findings
+    assert finding.caller == 'sider.list.List.index'
+    assert finding.command == 'LINDEX'
+    assert 'LRANGE' in finding.suggestion
+    with session.profile() as profile:
+        assert list(reversed(list_))[0] == '14'
+    [finding] = profile.findings
+    assert finding.caller == 'sider.list.List.__reversed__'
+
+
+def test_threshold():
+    with raises(ValueError):
+        Profile(threshold=1)
@@ -0,0 +1,141 @@
+import threading
+from pytest import raises
+from redis.client import StrictRedis
+from .env import get_client, get_session, key
+from sider.instrumentation import Stats
+from sider.replica import ReplicaRouter
+from sider.session import Session
+from sider.types import Hash, Integer, Set
+
+
+def get_replica(offset):
+    """Makes a client of another database of the test server, so that
+    it can be distinguished from the primary.
+
+    """
+    kwargs = get_client().connection_pool.connection_kwargs
+    return StrictRedis(host=kwargs['host'], port=kwargs['port'],
+                       db=kwargs['db'] + offset)
+
+
+def routed_session(replicas, **kwargs):
+    session = Session(get_client(),
+                      replicas=ReplicaRouter(replicas, **kwargs))
+    session.verbose_transaction_error = True
+    return session
+
+
+def test_round_robin():
+    replicas = [get_replica(1), get_replica(2)]
+    session = routed_session(replicas)
+    keyid = key('test_replica_round_robin')
+    for i, replica in enumerate(replicas):
+        replica.delete(keyid)
+        replica.sadd(keyid, 'replica{0}'.format(i))
+    set_ = session.set(keyid, set(['primary']), Set)
+    assert set(set_) == set(['replica0'])
+    assert set(set_) == set(['replica1'])
+    assert set(set_) == set(['replica0'])
+    assert 'replica1' in set_
+    assert set(get_session().get(keyid, Set)) == set(['primary'])
+    # unavailable replicas are skipped
+    session = routed_session([StrictRedis(port=1), replicas[1]])
+    set_ = session.get(keyid, Set)
+    assert set(set_) == set(['replica1'])
+    assert set(set_) == set(['replica1'])
+    session = routed_session([StrictRedis(port=1)])
+    assert set(session.get(keyid, Set)) == set(['primary'])
+    for replica in replicas:
+        replica.delete(keyid)
+
+
+def test_writes_and_transactions():
+    replica = get_replica(1)
+    session = routed_session([replica])
+    keyid = key('test_replica_writes_and_transactions')
+    replica.delete(keyid)
+    hash_ = session.set(keyid, {'a': '1'}, Hash)
+    hash_['b'] = '2'
+    assert dict(hash_.items()) == {}
+    assert hash_.setdefault('a', '3') == '1'
+    def block(trial, transaction):
+        hash_['c'] = hash_['a']
+    session.transaction(block, [keyid])
+    assert replica.exists(keyid) == 0
+    assert dict(get_session().get(keyid, Hash).items()) == {
+        'a': '1', 'b': '2', 'c': '1'
+    }
+    intid = key('test_replica_writes_and_transactions_int')
+    replica.set(intid, 5)
+    session.set(intid, 1, Integer)
+    assert session.get(intid, Integer) == 5
+    assert session.get_many([intid], Integer) == [5]
+    replica.delete(intid)
+
+
+def test_pin():
+    replica = get_replica(1)
+    session = routed_session([replica], pin=60)
+    keyid = key('test_replica_pin')
+    replica.delete(keyid)
+    assert not session.replicas.pinned
+    assert list(session.get(keyid, Set)) == []
+    set_ = session.set(keyid, set('a'), Set)
+    assert session.replicas.pinned
+    assert set(set_) == set('a')
+    # the pin is only for the thread which has written
+    reads = []
+    thread = threading.Thread(target=lambda: reads.append(set(set_)))
+    thread.start()
+    thread.join()
+    assert reads == [set()]
+    session.replicas.written_at -= 60
+    assert set(set_) == set()
+    set_.add('b')
+    assert set(set_) == set('ab')
+
+
+def test_latency():
+    replica = get_replica(1)
+    unreachable = StrictRedis(port=1)
+    session = routed_session([unreachable, replica], selection='latency')
+    keyid = key('test_replica_latency')
+    replica.delete(keyid)
+    set_ = session.set(keyid, set('a'), Set)
+    assert set(set_) == set()
+    latencies = session.replicas.latencies
+    assert latencies[0] == float('inf')
+    assert latencies[1] < float('inf')
+    session = routed_session([unreachable], selection='latency')
+    assert set(session.get(keyid, Set)) == set('a')
+
+
+def test_router_arguments():
+    with raises(ValueError):
+        ReplicaRouter([])
+    with raises(TypeError):
+        ReplicaRouter(['not a client'])
+    with raises(ValueError):
+        ReplicaRouter([get_replica(1)], selection='random')
+
+
+def test_shared_router():
+    replica = get_replica(1)
+    router = ReplicaRouter([replica])
+    stats = [Stats(), Stats()]
+    sessions = [Session(get_client(), replicas=router, instruments=[s])
+                for s in stats]
+    assert router.replicas == (replica,)
+    keyid = key('test_replica_shared_router')
+    replica.delete(keyid)
+    assert set(sessions[0].get(keyid, Set)) == set()
+    assert stats[0].snapshot().round_trips >= 1
+    assert stats[1].snapshot().round_trips == 0
+
+
+def test_close():
+    router = ReplicaRouter([get_replica(1)], interval=60)
+    assert router.select() is router.replicas[0]
+    assert router.monitor.is_alive()
+    router.close()
+    assert not router.monitor.is_alive()
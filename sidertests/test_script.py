@@ -0,0 +1,154 @@
+import warnings
+from pytest import fixture, raises
+from .env import get_client, get_session, key
+from sider.script import AdaptiveScripting, Script, ScriptRegistry
+from sider.session import Session
+from sider.types import Hash, List, SortedSet
+
+
+def make_session(scripting):
+    session = Session(get_client(), scripting=scripting, stats=True)
+    session.verbose_transaction_error = True
+    return session
+
+
+@fixture(params=[True, False], ids=['script', 'transaction'])
+def session(request):
+    return make_session(request.param)
+
+
+def test_script():
+    script = Script('return 1', 'one')
+    assert script.sha == 'e0e1f9fabfc9d4800c877a703b823ac0578ff8db'
+    assert repr(script) == '<sider.script.Script one>'
+    assert 'e0e1f9fa' in repr(Script(b'return 1'))
+
+
+def test_registry():
+    client = get_client()
+    registry = ScriptRegistry()
+    script = Script('return {KEYS[1], ARGV[1]}')
+    assert registry(client, script, ['k'], ['a']) == [b'k', b'a']
+    assert script.sha in registry.loaded
+    client.script_flush()
+    assert registry(client, script, ['l'], ['b']) == [b'l', b'b']
+    assert script.sha in registry.loaded
+
+
+def test_session_run_script():
+    session = make_session(True)
+    assert session.scripting_available
+    script = Script('return redis.call("INCRBY", KEYS[1], ARGV[1])')
+    keyid = key('test_script_session_run_script')
+    session.client.delete(keyid)
+    session.reset_stats()
+    assert session.run_script(script, [keyid], [2]) == 2
+    assert session.run_script(script, [keyid], [3]) == 5
+    calls = dict((name, stats.calls)
+                 for (_, name), stats in session.stats.operations.items())
+    assert calls == {'SCRIPT LOAD': 1, 'EVALSHA': 2}
+    assert not make_session(False).scripting_available
+    for trial in session.transaction:
+        assert not session.scripting_available
+
+
+def test_sortedset(session):
+    keyid = key('test_script_sortedset')
+    set_ = session.set(keyid, {'a': 3, 'b': 1.5, 'c': 1}, SortedSet)
+    set_.discard('a')
+    set_.discard('b', score=0.5, remove=1)
+    set_.discard('x')
+    assert dict(set_) == {'a': 2, 'c': 1}
+    assert set_.setdefault('a') == 2
+    assert set_.setdefault('d', 0.25) == 0.25
+    assert set_.popitem() == ('d', 0.25)
+    assert set_.popitem(desc=True, remove=None) == ('a', 2)
+    assert set_.pop('c', score=0.5, remove=None) == 1
+    assert set_.pop('x', 'default') == 'default'
+    assert dict(set_) == {}
+    with raises(KeyError):
+        set_.popitem()
+    set_.update({'a': 1, 'b': 5})
+    assert set_.pop('b', score=2) == 5
+    assert dict(set_) == {'a': 1, 'b': 3}
+    watched = set(caller for caller, name in session.stats.operations
+                  if name == 'WATCH')
+    popitem = 'sider.sortedset.SortedSet.popitem'
+    assert (popitem in watched) is not session.scripting_available
+
+
+def test_list(session):
+    keyid = key('test_script_list')
+    list_ = session.set(keyid, 'abcdef', List)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        list_.insert(2, 'x')
+        list_.insert(-1, 'y')
+        list_.insert(100, 'z')
+        list_.insert(-100, 'w')
+        assert list(list_) == list('wabxcdeyfz')
+        assert list_.pop(3) == 'x'
+        assert list_.pop(-3) == 'y'
+        assert list(list_) == list('wabcdefz')
+        with raises(IndexError):
+            list_.pop(100)
+        big = session.set(keyid, [str(i) for i in range(1000)], List)
+        big.insert(1, 'x')
+        assert big.pop(500) == '499'
+    assert big[:3] == ['0', 'x', '1']
+    assert len(big) == 1000
+
+
+def test_hash(session):
+    keyid = key('test_script_hash')
+    hash_ = session.set(keyid, {'a': 'b'}, Hash)
+    assert hash_.setdefault('a', 'x') == 'b'
+    assert hash_.setdefault('c', 'd') == 'd'
+    assert dict(hash_) == {'a': 'b', 'c': 'd'}
+
+
+def test_adaptive_scripting():
+    adaptive = AdaptiveScripting(threshold=0.3, cooldown=60, weight=0.2)
+    adaptive.record(['a', 'b'], True)
+    assert adaptive.ratios == {'a': 0.2, 'b': 0.2}
+    adaptive.record(['a', 'c'], False)
+    assert round(adaptive.ratios['a'], 2) == 0.16 and 'c' not in adaptive.ratios
+    adaptive.record(['b'], True)
+    assert adaptive.is_hot('b') and not adaptive.is_hot('a')
+    assert 'b' not in adaptive.ratios
+    adaptive.hot_keys['b'] = 0
+    assert not adaptive.is_hot('b')
+    assert adaptive.hot_keys == {}
+    with raises(ValueError):
+        AdaptiveScripting(threshold=0)
+    with raises(ValueError):
+        AdaptiveScripting(cooldown=-1)
+    with raises(ValueError):
+        AdaptiveScripting(weight=1.5)
+
+
+def test_session_adaptive_scripting():
+    adaptive = AdaptiveScripting(threshold=0.5, weight=0.5)
+    session = Session(get_client(), scripting=adaptive, stats=True)
+    session2 = get_session()
+    keyid = key('test_script_session_adaptive_scripting')
+    set_ = session.set(keyid, {'a': 1, 'b': 2, 'c': 3}, SortedSet)
+    set2 = session2.get(keyid, SortedSet)
+    def scripted():
+        return any(name == 'EVALSHA' for _, name in session.stats.operations)
+    session.reset_stats()
+    assert set_.popitem() == ('a', 1)
+    assert not scripted()
+    def block(trial, transaction):
+        len(set_)
+        if trial < 2:
+            set2.add('x', 10)
+        set_.add('y', 10)
+    session.transaction(block, [keyid])
+    assert adaptive.is_hot(keyid)
+    assert set_.popitem() == ('b', 2)
+    assert scripted()
+    adaptive.hot_keys[keyid] = 0
+    session.reset_stats()
+    assert set_.popitem() == ('b', 1)
+    assert not scripted()
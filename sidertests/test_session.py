@@ -1,3 +1,4 @@
+import gc
 import warnings
 from redis.client import StrictRedis, Redis
 from pytest import raises
@@ -137,3 +138,55 @@ def test_version_info(session):
         assert isinstance(v, int)
     version_str = '.'.join(map(str, session.server_version_info))
     assert session.server_version == version_str
+
+
+def test_identity_map(session):
+    hash_ = session.get(key('test_session_identity_map'), HashT)
+    assert session.get(key('test_session_identity_map'), HashT) is hash_
+    assert session.get(key('test_session_identity_map'), HashT()) is hash_
+    other = session.get(key('test_session_identity_map'),
+                        HashT(value_type=Integer))
+    assert other is not hash_
+    assert other.value_type == Integer()
+    assert session.get(key('test_session_identity_map'), SetT) is not hash_
+    del hash_, other
+    gc.collect()
+    assert not any(k == key('test_session_identity_map')
+                   for k, _ in session.identity_map.keys())
+    saved = session.set(key('test_session_identity_map2'), set('abc'), SetT)
+    assert session.get(key('test_session_identity_map2'), SetT) is saved
+    assert session.set(key('test_session_identity_map2'),
+                       set('def'), SetT) is saved
+    assert set(saved) == set('def')
+
+
+def test_getset_many_bulk(session):
+    keys = [key('test_session_getset_many_bulk_{0}'.format(i))
+            for i in range(3)]
+    result = session.set_many(dict(zip(keys, range(3))), Integer)
+    assert result == dict(zip(keys, range(3)))
+    assert session.get_many(keys, Integer) == [0, 1, 2]
+    assert session.get_many(keys[::-1], Integer) == [2, 1, 0]
+    assert session.get_many([], Integer) == []
+    assert session.set_many({}, Integer) == {}
+
+
+def test_getset_many_containers(session):
+    keys = [key('test_session_getset_many_containers_{0}'.format(i))
+            for i in range(2)]
+    hashes = session.set_many(zip(keys, [{'a': 1}, {'b': 2}]),
+                              HashT(value_type=Integer))
+    loaded = session.get_many(keys, HashT(value_type=Integer))
+    assert [hashes[k] for k in keys] == loaded
+    assert loaded[0] is session.get(keys[0], HashT(value_type=Integer))
+    assert dict(loaded[0]) == {'a': 1}
+    assert dict(loaded[1]) == {'b': 2}
+    zsets = session.set_many({keys[0]: {'a': 3}, keys[1]: set('b')},
+                             SortedSetT)
+    assert zsets[keys[0]].items() == [('a', 3)]
+    assert zsets[keys[1]].items() == [('b', 1)]
+    lists = session.set_many({keys[0]: ['a'], keys[1]: []}, ListT)
+    assert list(lists[keys[0]]) == ['a']
+    assert list(lists[keys[1]]) == []
+    with raises(TypeError):
+        session.set_many({keys[0]: 'not a set'}, SetT)
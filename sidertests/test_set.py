@@ -608,6 +608,8 @@ def test_intersection_update(session):
     reset()
     set_.intersection_update(set2, set3, 'acfg')
     assert set_ == S()
+    set_.intersection_update('bcde')
+    assert set_ == S()
     reset()
     set_ &= S('bcd')
     assert set_ == S('bc')
@@ -0,0 +1,47 @@
+from siderbench.cases import GROUPS, HASH
+from siderbench.runner import KEY_PREFIX, Group, format_results, measure, run
+from sider.hash import Hash
+from sider.types import Hash as HashT
+from .env import get_client
+
+
+def test_measure():
+    calls = []
+    m = measure(lambda: calls.append(1), duration=0, min_iterations=7)
+    assert m.iterations == 7 == len(calls)
+    assert m.ops > 0
+    assert 0 <= m.p50 <= m.p99
+
+
+def test_run():
+    client = get_client()
+    results = list(run(client, GROUPS, sizes=[10], duration=0,
+                       min_iterations=2,
+                       filter=lambda case: case.group is HASH or
+                                           case.name == 'types.Integer.encode'))
+    methods = set((r.group, r.method) for r in results)
+    assert ('Hash', '__getitem__') in methods
+    assert ('types.Integer', 'encode') in methods
+    assert not any(r.group == 'List' for r in results)
+    for result in results:
+        assert result.sider.iterations >= 2
+        if result.group == 'Hash':
+            assert result.size == 10
+            assert (result.raw is None) == (result.overhead is None)
+        else:
+            assert result.size is None
+        assert result.to_json()['method'] == result.method
+    assert not client.keys(KEY_PREFIX + '*')
+    table = format_results(results).splitlines()
+    assert len(table) == len(results) + 1
+    assert table[0].startswith('method')
+
+
+def test_uncovered():
+    group = Group('Hash', HashT(), cls=Hash)
+    group.case('__getitem__')(lambda c: None)
+    uncovered = group.uncovered()
+    assert '__getitem__' not in uncovered
+    assert '__setitem__' in uncovered and 'update' in uncovered
+    assert '__init__' not in uncovered and '_raw_update' not in uncovered
+    assert HASH.uncovered() == []
@@ -100,3 +100,21 @@ def test_local_dict():
         coro_test(run, (789, 0), (123, 1))
         assert_expects(result[0], 789)
         assert_expects(result[1], 123)
+
+
+def test_local_dict_release():
+    local = LocalDict(a=1)
+    local['a'] = 2
+    local['b'] = 3
+    assert len(local.idents) == 1
+    local.release()
+    assert not local.idents
+    assert dict(local) == {'a': 1}
+    def run():
+        local['a'] = 4
+        local.release()
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert len(local.idents) == 1
+    assert local['a'] == 1
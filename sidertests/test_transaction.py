@@ -1,9 +1,15 @@
+import threading
 import warnings
 from pytest import raises
+from redis.client import BasePipeline
+from redis.exceptions import ResponseError
 from .env import get_session, key
-from sider.types import List
-from sider.transaction import Transaction
-from sider.exceptions import CommitError, ConflictError, DoubleTransactionError
+from sider.types import Hash, Integer, List, Set, SortedSet
+from sider.instrumentation import Stats
+from sider.transaction import Future, KeyLocks, Transaction, RetryPolicy
+from sider.exceptions import (CommitError, ConflictError,
+                              DoubleTransactionError, NotCommittedError,
+                              RetryLimitError)
 from sider.warnings import SiderWarning
 
 
@@ -120,3 +126,353 @@ def test_double_transaction_error():
         with raises(DoubleTransactionError):
             with Transaction(session, [keyid]):
                 pass
+
+
+def test_concurrent_transactions():
+    session = get_session()
+    keyid = key('test_transaction_concurrent_transactions')
+    list_ = session.set(keyid, 'abc', List)
+    entered = threading.Event()
+    committed = threading.Event()
+    errors = []
+    def first():
+        try:
+            with Transaction(session, [keyid]):
+                entered.set()
+                committed.wait(5)
+                list_.append('d')
+        except Exception as e:
+            errors.append(e)
+    def second():
+        try:
+            entered.wait(5)
+            with Transaction(session, [keyid + '_other']):
+                session.client.set(keyid + '_other', 'x')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            committed.set()
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for thread in threads:
+        thread.start()
+    entered.wait(5)
+    assert session.current_transaction is None
+    assert not isinstance(session.client, BasePipeline)
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert list_[:] == list('abcd')
+    assert session.client.get(keyid + '_other') == b'x'
+
+
+def test_concurrent_retries():
+    session = get_session()
+    keyid = key('test_transaction_concurrent_retries')
+    hash_ = session.set(keyid, {'n': '0'}, Hash)
+    def increase():
+        for _ in range(20):
+            def block(trial, transaction):
+                n = int(hash_['n'])
+                hash_['n'] = str(n + 1)
+            session.transaction(block, [keyid])
+    threads = [threading.Thread(target=increase) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hash_['n'] == '160'
+    assert not session.context_locals.idents
+
+
+def test_retry_policy():
+    policy = RetryPolicy()
+    assert policy.delay(1, 0) == policy.delay(100, 100) == 0
+    policy = RetryPolicy(max_attempts=3, backoff=0.1, max_backoff=0.3,
+                         jitter=False)
+    assert policy.delay(1, 0) == 0.1
+    assert policy.delay(2, 0) == 0.2
+    assert policy.delay(3, 0) is None
+    policy.max_attempts = None
+    assert policy.delay(3, 0) == 0.3
+    policy.deadline = 1
+    assert policy.delay(3, 0.75) == 0.25
+    assert policy.delay(3, 1) is None
+    policy.jitter = True
+    assert all(0 <= policy.delay(i, 0) <= 0.3 for i in range(1, 10))
+    with raises(ValueError):
+        RetryPolicy(max_attempts=0)
+
+
+def test_conflicts():
+    session = get_session()
+    session2 = get_session()
+    keyid = key('test_transaction_conflicts')
+    list_ = session.set(keyid, 'abc', List)
+    list2 = session2.get(keyid, List)
+    session.reset_conflicts()
+    def block(trial, transaction):
+        len(list_)
+        if trial < 2:
+            list2.append('x')
+        list_.append('d')
+    session.transaction(block, [keyid])
+    session.transaction(lambda trial, transaction: list_.append('e'))
+    conflicts = session.conflicts
+    assert conflicts.keys == {keyid: 2}
+    assert conflicts.retries == {2: 1, 0: 1}
+    assert conflicts.failed_time > 0
+    assert conflicts.aborted == 0
+    assert list_[:] == list('abcxxde')
+    assert session.reset_conflicts() == conflicts
+    assert session.conflicts.keys == {}
+
+
+def test_retry_limit():
+    session = get_session()
+    session.retry_policy = RetryPolicy(max_attempts=3)
+    session2 = get_session()
+    keyid = key('test_transaction_retry_limit')
+    list_ = session.set(keyid, 'abc', List)
+    list2 = session2.get(keyid, List)
+    session.reset_conflicts()
+    trials = []
+    def block(trial, transaction):
+        trials.append(trial)
+        len(list_)
+        list2.append('x')
+        list_.append('d')
+    with raises(RetryLimitError):
+        session.transaction(block, [keyid])
+    assert trials == [0, 1, 2]
+    assert session.conflicts.aborted == 1
+    assert session.conflicts.retries == {2: 1}
+    with raises(ConflictError):
+        transaction = Transaction(session, [keyid],
+                                  retry_policy=RetryPolicy(max_attempts=1))
+        transaction(block)
+    assert trials == [0, 1, 2, 0]
+    assert list_[:] == list('abcxxxx')
+
+
+def test_lazy_watch():
+    session = get_session()
+    session2 = get_session()
+    stats = Stats()
+    session.instruments.append(stats)
+    keys = [key('test_transaction_lazy_watch_{0}'.format(i)) for i in range(3)]
+    lists = [session.set(k, 'abc', List) for k in keys]
+    list2 = session2.get(keys[2], List)
+    stats.reset()
+    trials = []
+    for trial in Transaction(session, keys[:2]):
+        trials.append(trial)
+        # WATCH of keys[0], keys[1] and LINDEX in a round trip
+        assert lists[0][0] == 'a'
+        # WATCH of keys[2] and LINDEX in a round trip
+        assert lists[2][0] == 'a'
+        if trial < 1:
+            list2.append('x')
+        lists[1].append('d')
+    assert trials == [0, 1]
+    snapshot = stats.snapshot()
+    assert snapshot.round_trips == 6
+    assert snapshot.operations[('sider.list.List.__getitem__', 'WATCH')] \
+                   .calls == 4
+    assert lists[1][:] == list('abcd')
+    assert lists[2][:] == list('abcx')
+
+
+def test_reads():
+    session = get_session()
+    session2 = get_session()
+    stats = Stats()
+    session.instruments.append(stats)
+    keyid = key('test_transaction_reads')
+    set_ = session.set(keyid, {'a': 3, 'b': 1}, SortedSet)
+    set2 = session2.get(keyid, SortedSet)
+    stats.reset()
+    trials = []
+    for trial in Transaction(session, [keyid]):
+        trials.append(trial)
+        assert set_['a'] == 3 + trial
+        assert set_['a'] == 3 + trial
+        items = set_.items()
+        items.append(('x', 0))
+        assert set_.items() == [('b', 1), ('a', 3 + trial)]
+        if trial < 1:
+            set2.add('a')
+        set_.discard('a')
+    assert trials == [0, 1]
+    operations = stats.snapshot().operations
+    assert operations['sider.sortedset.SortedSet.__getitem__', 'ZSCORE'] \
+                     .calls == 2
+    assert ('sider.sortedset.SortedSet.discard', 'ZSCORE') not in operations
+    assert dict(set_) == {'a': 3, 'b': 1}
+
+
+def test_futures():
+    session = get_session()
+    session2 = get_session()
+    keyid = key('test_transaction_futures')
+    list_ = session.set(keyid, 'abc', List)
+    hash_ = session.set(keyid + '_hash', {'a': '1'}, Hash)
+    list2 = session2.get(keyid, List)
+    attempts = []
+    for trial in Transaction(session, [keyid]):
+        len(list_)
+        if trial < 1:
+            list2.append('x')
+        list_.append('d')
+        pushed = session.client.rpush(keyid, 'e')
+        removed = session.client.hdel(hash_.key, 'a')
+        missing = session.client.hdel(hash_.key, 'b')
+        attempts.append(pushed)
+        assert isinstance(pushed, Future)
+        assert not pushed.done
+        with raises(NotCommittedError):
+            pushed.result
+    assert len(attempts) == 2
+    assert not attempts[0].done
+    assert pushed.done
+    assert pushed.result == 6
+    assert removed.result == 1
+    assert missing.result == 0
+    assert repr(pushed) == '<sider.transaction.Future 6>'
+    assert list_[:] == list('abcxde')
+
+
+def test_atomic():
+    session = get_session()
+    stats = Stats()
+    session.instruments.append(stats)
+    keyid = key('test_transaction_atomic')
+    hash_ = session.set(keyid, {'a': '1'}, Hash)
+    index = session.set(keyid + '_index', {'a': 1}, SortedSet)
+    stats.reset()
+    with session.atomic() as atomic:
+        hash_['b'] = '2'
+        index.add('b', 2)
+        pushed = session.client.hlen(keyid)
+        assert session.client is not session.basic_client
+    snapshot = stats.snapshot()
+    assert snapshot.round_trips == 1
+    assert set(name for _, name in snapshot.operations) == \
+           set(['MULTI', 'HSET', 'ZINCRBY', 'HLEN', 'EXEC'])
+    assert pushed.result == 2
+    assert atomic.keys == set([keyid, keyid + '_index'])
+    assert dict(hash_) == {'a': '1', 'b': '2'}
+    assert dict(index) == {'a': 1, 'b': 2}
+    with raises(CommitError):
+        with session.atomic():
+            hash_['c'] = '3'
+            hash_['a']
+    assert 'c' not in hash_
+    with raises(TypeError):
+        for _ in session.atomic():
+            pass
+    with session.atomic():
+        with raises(DoubleTransactionError):
+            with session.atomic():
+                pass
+
+
+def test_prefetch():
+    session = get_session()
+    stats = Stats()
+    session.instruments.append(stats)
+    keyid = key('test_transaction_prefetch')
+    hash_ = session.set(keyid, {'a': 'b'}, Hash)
+    list_ = session.set(keyid + '_list', ['x', 'y'], List)
+    set_ = session.set(keyid + '_set', set(['s']), Set)
+    zset = session.set(keyid + '_zset', {'z': 2}, SortedSet)
+    session.set(keyid + '_int', 3, Integer)
+    value_types = {keyid: Hash, keyid + '_list': List, keyid + '_set': Set,
+                   keyid + '_zset': SortedSet, keyid + '_int': Integer,
+                   keyid + '_none': Integer}
+    snapshots = []
+    def block(trial, transaction):
+        snapshots.append(dict(transaction.snapshot))
+        assert dict(hash_.items()) == {'a': 'b'}
+        assert set(set_) == set(['s'])
+        hash_['c'] = 'd'
+        zset.add('w')
+    stats.reset()
+    session.transaction(block, value_types)
+    snapshot = stats.snapshot()
+    assert snapshot.round_trips == 2
+    assert snapshots == [{
+        keyid: {'a': 'b'}, keyid + '_list': ['x', 'y'],
+        keyid + '_set': set(['s']), keyid + '_zset': {'z': 2},
+        keyid + '_int': 3, keyid + '_none': None
+    }]
+    assert dict(hash_) == {'a': 'b', 'c': 'd'}
+    assert dict(zset) == {'z': 2, 'w': 1}
+    # Conflicts retry the whole block with a fresh snapshot.
+    snapshots[:] = []
+    def conflicting_block(trial, transaction):
+        snapshots.append(transaction.snapshot[keyid + '_list'])
+        if trial == 0:
+            session.basic_client.rpush(keyid + '_list', 'z')
+        list_.append('w')
+    session.transaction(conflicting_block, {keyid + '_list': List})
+    assert snapshots == [['x', 'y'], ['x', 'y', 'z']]
+    assert list(list_) == ['x', 'y', 'z', 'w']
+    # Wrong types are raised by actual queries.
+    def wrong_block(trial, transaction):
+        assert keyid not in transaction.snapshot
+        list(session.get(keyid, List))
+    with raises(ResponseError) as excinfo:
+        session.transaction(wrong_block, {keyid: List})
+    assert 'WRONGTYPE' in str(excinfo.value)
+    with raises(CommitError):
+        for trial in session.transaction:
+            hash_['e'] = 'f'
+            session.current_transaction.prefetch({keyid: Hash})
+    # Nested transactions prefetch into the outer one.
+    snapshots[:] = []
+    def nested_block(trial, transaction):
+        snapshots.append(transaction.snapshot[keyid + '_int'])
+    def outer_block(trial, transaction):
+        session.transaction(nested_block, {keyid + '_int': Integer},
+                            ignore_double=True)
+        assert transaction.snapshot[keyid + '_int'] == 3
+    session.transaction(outer_block)
+    assert snapshots == [3]
+
+
+def test_key_locks():
+    locks = KeyLocks()
+    a, b = object(), object()
+    assert locks.acquire(a, ['x', 'y'])
+    assert locks.acquire(a, ['x'])
+    assert not locks.acquire(b, ['y', 'z'], blocking=False)
+    assert 'z' not in locks.owners
+    locks.release(b, ['x'])
+    assert locks.owners == {'x': a, 'y': a}
+    locks.release(a, ['x', 'y'])
+    assert locks.acquire(b, ['y', 'z'], blocking=False)
+
+
+def test_locks():
+    session = get_session()
+    session.locks = KeyLocks()
+    keyid = key('test_transaction_locks')
+    hash_ = session.set(keyid, {'n': '0'}, Hash)
+    other = session.set(keyid + '_other', {'n': '0'}, Hash)
+    session.reset_conflicts()
+    def increase():
+        for _ in range(20):
+            def block(trial, transaction):
+                n = int(hash_['n'])
+                m = int(other['n'])
+                hash_['n'] = str(n + 1)
+                other['n'] = str(m + 1)
+            session.transaction(block)
+    threads = [threading.Thread(target=increase) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hash_['n'] == other['n'] == '160'
+    assert session.conflicts.keys == {}
+    assert session.locks.owners == {}
@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 import datetime
+import pickle
+import sys
 import uuid
-from pytest import raises
-from .env import key
+from pytest import mark, raises
+from .env import NInt, key
 from .env import session
 from sider import types
-from sider.types import (Boolean, ByteString, Date, DateTime, Integer, String,
-                         Tuple, TZDateTime, UUID)
-from sider.datetime import FixedOffset
+from sider.types import (Boolean, ByteString, Compressed, Date, DateTime,
+                         Float, Float64, Hash, Int64, Integer, JSON, List,
+                         PackedTuple, Pickle, String, Tuple, TZDateTime,
+                         UnicodeString, UUID)
+from sider.datetime import FixedOffset, UTC
 
 
 try:
@@ -100,6 +104,43 @@ def test_tzdatetime(session):
         session.get(key(u'test_types_tzdatetime'), TZDateTime)
 
 
+def test_parse_datetime_time():
+    datetime_type = types.DateTime()
+    time_type = types.TZTime()
+    parse = datetime_type.parse_datetime
+    assert parse(b'2012-03-28T09:21:34') == \
+        datetime.datetime(2012, 3, 28, 9, 21, 34)
+    assert parse(b'2012-03-28T09:21:34.000123Z') == \
+        datetime.datetime(2012, 3, 28, 9, 21, 34, 123, tzinfo=UTC)
+    dt = parse(b'2012-03-28T18:21:34.638972+09:00')
+    assert dt.utcoffset() == datetime.timedelta(hours=9)
+    assert dt.tzinfo is parse(b'2012-03-28T18:21:34+09:00').tzinfo
+    assert parse(b'2012-03-28T09:21:34-09:30').utcoffset() == \
+        -datetime.timedelta(hours=9, minutes=30)
+    for malformed in [b'2012-03-28 09:21:34', b'2012-03-28T09:21:3x',
+                      b'2012-03-28T09:21:34.5', b'2012-03-28T09:21:34+0900',
+                      b'2012-03-28T09-21:34', b'2012-03-28T09:21:34+-9:00',
+                      b'2012-03-28T09:21:34+09:-0',
+                      b'2012-03-28T09:21:34++9:00',
+                      b'2012-03-28T09:21:34+ 9:00', b'2012-03-28T+9:21:34',
+                      b'2012-03-28T09:21:34.-12345Z']:
+        with raises(ValueError):
+            parse(malformed)
+    parse = time_type.parse_time
+    assert parse(b'09:21:34', False) == datetime.time(9, 21, 34)
+    assert parse(b'09:21:34.638972Z', False) == \
+        datetime.time(9, 21, 34, 638972, tzinfo=UTC)
+    assert parse(b'18:21:34+09:00', False).utcoffset() == \
+        datetime.timedelta(hours=9)
+    assert parse(b'18:21:34+09:00', True) == \
+        datetime.time(18, 21, 34)
+    for malformed in [b'18:21:34.5', b'09+21:34', b'09:21:34+-9:00',
+                      b'09:21:34+09:-0', b'09:21:34++9:00', b'09:21:34+ 9:00',
+                      b'09:-1:34', b'09:21:34.+12345']:
+        with raises(ValueError):
+            parse(malformed, False)
+
+
 def test_uuid(session):
     uuid_v4 = uuid.UUID('ed386d46-fbe2-4cbc-98ab-72e90436b4a3')
     session.set(key('test_types_uuid'), uuid_v4, UUID)
@@ -115,6 +156,47 @@ def test_uuid(session):
         session.get(key('test_types_uuid'), UUID)
 
 
+def test_float(session):
+    keyid = key('test_types_float')
+    assert session.set(keyid, 1.5, Float) == 1.5
+    assert session.get(keyid, Float) == 1.5
+    session.client.incrbyfloat(keyid, 2.25)
+    assert session.get(keyid, Float) == 3.75
+    session.set(keyid, 3, Float)
+    assert session.client.get(keyid) == b'3.0'
+    with raises(TypeError):
+        session.set(keyid, '1.5', Float)
+
+
+def test_packed(session):
+    keyid = key('test_types_packed')
+    session.set(keyid, -2 ** 63, Int64)
+    assert session.client.strlen(keyid) == 8
+    assert session.get(keyid, Int64) == -2 ** 63
+    session.set(keyid, 0.1, Float64)
+    assert session.get(keyid, Float64) == 0.1
+    point = PackedTuple('<qqd')
+    session.set(keyid, (1, -2, 0.5), point)
+    assert session.get(keyid, point) == (1, -2, 0.5)
+    assert point == PackedTuple('<qqd') and point != PackedTuple('<qqq')
+    assert hash(point) == hash(PackedTuple('<qqd'))
+    buffer_ = b''.join(Int64().encode_many(range(5)))
+    assert Int64().decode_buffer(buffer_) == [0, 1, 2, 3, 4]
+    assert Int64().decode_buffer(memoryview(buffer_)[8:24]) == [1, 2]
+    assert Int64().decode_buffer(bytearray(buffer_[:8])) == [0]
+    assert PackedTuple('<hh').decode_buffer(buffer_[:8]) == [(0, 0), (0, 0)]
+    with raises(ValueError):
+        Int64().decode_buffer(buffer_[:12])
+    with raises(TypeError):
+        Int64().encode(1.5)
+    with raises(ValueError):
+        Int64().encode(2 ** 63)
+    with raises(ValueError):
+        point.encode((1, 2))
+    with raises(ValueError):
+        Float64().decode(b'\x00' * 4)
+
+
 def test_tuple(session):
     int_str_int = Tuple(Integer, String, Integer)
     tupl = (123, 'abc\ndef', 456,)
@@ -124,3 +206,140 @@ def test_tuple(session):
     session.set(key('test_types_tuple'), tupl, int_str_int)
     t = session.get(key('test_types_tuple'), int_str_int)
     assert t == tupl
+
+
+def test_compressed(session):
+    keyid = key('test_types_compressed')
+    compressed = Compressed(UnicodeString, threshold=64)
+    long_value = u'유니코드 ' * 100
+    session.set(keyid, long_value, compressed)
+    assert session.client.strlen(keyid) < len(long_value)
+    assert session.get(keyid, compressed) == long_value
+    session.set(keyid, u'short', compressed)
+    assert session.client.get(keyid) == b'\x00short'
+    assert session.get(keyid, compressed) == u'short'
+    hash_ = session.set(keyid, {u'a': long_value, u'b': u'short'},
+                        Hash(value_type=compressed))
+    assert dict(hash_.items()) == {u'a': long_value, u'b': u'short'}
+    list_ = session.set(keyid, [long_value, u'short'], List(compressed))
+    assert list(list_) == [long_value, u'short']
+    assert compressed == Compressed(UnicodeString(), threshold=64)
+    assert compressed != Compressed(UnicodeString, threshold=32)
+    assert hash(compressed) == hash(Compressed(UnicodeString, threshold=64))
+    with raises(ValueError):
+        compressed.decode(b'short')
+    with raises(ValueError):
+        compressed.decode(b'\x01short')
+    with raises(ValueError):
+        Compressed(ByteString, level=10)
+    with raises(TypeError):
+        Compressed(1)
+
+
+@mark.skipif(sys.version_info < (3, 3), reason='zdict requires Python 3.3+')
+def test_compressed_zdict():
+    zdict = b'{"name": "", "email": "", "tags": []}'
+    value = b'{"name": "Hong", "email": "hong@example.com", "tags": ["a"]}'
+    compressed = Compressed(ByteString, threshold=0, zdict=zdict)
+    encoded = compressed.encode(value)
+    without_zdict = Compressed(ByteString, threshold=0)
+    assert len(encoded) < len(without_zdict.encode(value))
+    assert compressed.decode(encoded) == value
+    with raises(ValueError):
+        without_zdict.decode(encoded)
+
+
+def test_json(session):
+    keyid = key('test_types_json')
+    value = {u'a': [1, 2.5, None, True], u'유니코드': {u'b': u'c'}}
+    session.set(keyid, value, JSON)
+    assert session.get(keyid, JSON) == value
+    assert b' ' not in session.client.get(keyid)
+    hash_ = session.set(keyid, {u'a': [1], u'b': {u'c': None}},
+                        Hash(value_type=JSON))
+    assert hash_[u'b'] == {u'c': None}
+    with raises(TypeError):
+        JSON().encode(object())
+    with raises(ValueError):
+        JSON().decode(b'{')
+    # json never writes NaN which orjson can't read
+    with raises(ValueError):
+        JSON.encoder.encode(float('nan'))
+
+
+def test_pickle(session):
+    keyid = key('test_types_pickle')
+    value = {'a': (1, 2.5), 'b': frozenset([datetime.date(2012, 3, 28)])}
+    session.set(keyid, value, Pickle)
+    assert session.get(keyid, Pickle) == value
+    session.set(keyid, value, Pickle(2))
+    assert session.get(keyid, Pickle(2)) == value
+    assert Pickle(2) == Pickle(2) and Pickle(2) != Pickle(1)
+    assert hash(Pickle(2)) == hash(Pickle(2))
+    with raises(ValueError):
+        Pickle(pickle.HIGHEST_PROTOCOL + 1)
+    with raises(TypeError):
+        Pickle().encode(v for v in ())
+
+
+@mark.skipif(not hasattr(pickle, 'PickleBuffer'),
+             reason='out-of-band buffers require Python 3.8+')
+def test_pickle_out_of_band(session):
+    keyid = key('test_types_pickle_out_of_band')
+    payload = b'payload' * 1000
+    pickle_ = Pickle(5)
+    for value in [payload, bytearray(payload)]:
+        session.set(keyid, value, pickle_)
+        assert session.client.get(keyid)[:1] == b'\x00'
+        decoded = session.get(keyid, pickle_)
+        assert type(decoded) is type(value) and decoded == value
+    value = [memoryview(payload), memoryview(payload[:10]), 1]
+    encoded = pickle_.encode(value)
+    assert encoded.endswith(payload)
+    decoded = pickle_.decode(encoded)
+    assert [type(v) for v in decoded] == [memoryview, memoryview, int]
+    assert decoded[0].obj is encoded
+    assert bytes(decoded[0]) == payload and bytes(decoded[1]) == payload[:10]
+    assert pickle_.decode(pickle_.encode(payload[:10])) == payload[:10]
+    assert pickle_.encode(payload[:10]) == pickle.dumps(payload[:10], 5)
+
+
+def test_encode_many_decode_many():
+    uuid_v4 = uuid.UUID('ed386d46-fbe2-4cbc-98ab-72e90436b4a3')
+    samples = [
+        (Integer(), [1, -2, 30]),
+        (ByteString(), [b'a', b'', b'b\nc']),
+        (UnicodeString(), [u'a', u'유니코드']),
+        (DateTime(), [datetime.datetime(2012, 3, 28, 9, 21, 34, 638972)]),
+        (TZDateTime(), [datetime.datetime(2012, 3, 28, 9, 21, 34, 638972,
+                                          tzinfo=UTC)]),
+        (UUID(), [uuid_v4]),
+        (Boolean(), [True, False]),
+        (Float(), [1.5, -0.1, 1e100]),
+        (Int64(), [1, -2, 2 ** 63 - 1]),
+        (Float64(), [1.5, -0.1, 1e100]),
+        (PackedTuple('<qd'), [(1, 0.5), (-2, 1e100)]),
+        (Compressed(Integer, threshold=3), [1, 12, 1000, 10 ** 100]),
+        (JSON(), [{u'a': [1, None]}, u'유니코드', 1.5]),
+        (Pickle(), [{'a': (1, 2)}, b'b' * 10000, None]),
+        (NInt(), [1, 2]),
+        (Tuple(Integer, String, Tuple(Integer, Integer)),
+         [(1, u'a\nb', (2, 3)), (4, u'', (5, 6))]),
+    ]
+    for value_type, values in samples:
+        encoded = value_type.encode_many(iter(values))
+        assert encoded == [value_type.encode(v) for v in values]
+        decoded = value_type.decode_many(iter(encoded))
+        assert decoded == values
+        assert decoded == [value_type.decode(b) for b in encoded]
+    assert Integer().encode_many([]) == Integer().decode_many([]) == []
+    for value_type, value in [(Integer(), '1'), (ByteString(), 1),
+                              (UnicodeString(), 1), (UUID(), 1),
+                              (DateTime(), 1), (Tuple(Integer), (1, 2)),
+                              (Float(), '1'), (Int64(), 2 ** 64),
+                              (Float64(), '1'), (PackedTuple('<q'), (1, 2))]:
+        with raises((TypeError, ValueError)):
+            value_type.encode_many([value])
+    for value_type in [Int64(), PackedTuple('<qd')]:
+        with raises(ValueError):
+            value_type.decode_many([b'\x00' * value_type.size, b'\x00'])